@@ -2,56 +2,98 @@
 Main application setup and initialization module.
 
 This script configures and initializes the Flask application, setting up logging, extensions, and blueprints.
+
+Importing this module has no side effects: the extensions below are created unbound, and the configuration file,
+logging handlers and media directory are only set up inside `create_app()`.
 """
 
 import logging
 import os
 import sys
 import traceback
+import weakref
 
-import yaml
-from logging.handlers import TimedRotatingFileHandler
 from flask import Flask
-from flask_migrate import Migrate
 from flask_sqlalchemy import SQLAlchemy
-from flask_swagger_ui import get_swaggerui_blueprint
 
 # Configure base and media directories
 BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 sys.path.append(BASE_DIR)
 MEDIA_DIR = os.path.join(BASE_DIR, 'media')
-os.makedirs(MEDIA_DIR, exist_ok=True)
+
+# Contents of `config.yml`, populated in place by `load_config()` so modules that imported it see the loaded
+# values. Overrides passed to `create_app()` never land here; they only apply to that app's `config`.
+config_contents = {}
+
+logger = logging.getLogger(__name__)
+
+# Bound to the application in `initialize_extensions()`, which also sets up Flask-Migrate (imported there,
+# since alembic alone roughly doubles the import time of this package). The session routes eligible reads
+# to the read replicas, if any are configured (see `app.helpers.replica_routing`).
+from app.helpers.replica_routing import RoutingSession  # noqa: E402
+
+db = SQLAlchemy(session_options={'expire_on_commit': False, 'class_': RoutingSession})
+
+# Applications created in this process, so the fork hooks can reach their engines
+_applications = weakref.WeakSet()
+_fork_state = {'post_fork_pid': None}
+
 
 # Load configuration from YAML file
-def load_config():
+def load_config(config_overrides=None):
     """
-    Load configuration settings from a YAML file.
+    Load configuration settings from a YAML file into `config_contents`.
+
+    The file is only read once per process. The overrides are applied to a copy, so they never leak into
+    `config_contents` or into apps created later in the process.
+    :param config_overrides: Optional dictionary of settings that take precedence over the file.
     :return: Dictionary with configuration settings.
     """
-    config_file_path = os.path.join(BASE_DIR, 'config', 'config.yml')
-    try:
-        with open(config_file_path, 'r') as config_file:
-            return yaml.safe_load(config_file)  # Use safe_load for security
-    except Exception as e:
-        logging.error(f'Error loading configuration file: {e}')
-        raise
+    if not config_contents:
+        import yaml
+
+        config_file_path = os.path.join(BASE_DIR, 'config', 'config.yml')
+        try:
+            with open(config_file_path, 'r') as config_file:
+                config_contents.update(yaml.safe_load(config_file) or {})  # Use safe_load for security
+        except Exception as e:
+            logging.error(f'Error loading configuration file: {e}')
+            raise
+
+    return {**config_contents, **(config_overrides or {})}
 
-config_contents = load_config()
 
 # Configure logging
-def setup_logging():
+def setup_logging(config=None):
     """
     Set up logging configuration with timed rotation for log files.
+
+    The logger only enqueues records; a background listener thread writes them to the file and console
+    handlers (see `app.helpers.log_queue`). `LOGGING.FORMAT: json` writes one JSON object per line, including
+    the request id, endpoint and latency of records logged during a request.
+    Handlers are attached only once per process, however many apps are created.
+    :param config: Configuration of the app being created, defaults to `config_contents`.
     """
-    log_file_path = config_contents.get('LOG_FILE_PATH', 'app.log')  # Use config for log file path
+    if logger.handlers:
+        return logger
+
+    from logging.handlers import TimedRotatingFileHandler
+
+    from app.helpers.log_queue import JsonLineFormatter, queued_logging
+
+    config = config if config is not None else config_contents
+    log_file_path = config.get('LOG_FILE_PATH', 'app.log')  # Use config for log file path
     log_format = '%(asctime)s - %(levelname)s - %(filename)s:%(lineno)d - %(message)s'
+    logging_settings = config.get('LOGGING') or {}
 
-    # Create a logger
-    logger = logging.getLogger(__name__)
-    logger.setLevel(logging.DEBUG)  # Set default log level
+    # Set default log level
+    logger.setLevel(logging.DEBUG)
 
     # Create log formatters
-    formatter = logging.Formatter(log_format)
+    if logging_settings.get('FORMAT') == 'json':
+        formatter = JsonLineFormatter()
+    else:
+        formatter = logging.Formatter(log_format)
 
     # File handler for rotating logs daily
     file_handler = TimedRotatingFileHandler(
@@ -66,43 +108,154 @@ def setup_logging():
     console_handler = logging.StreamHandler()
     console_handler.setFormatter(formatter)
 
-    # Add handlers to the logger
-    logger.addHandler(file_handler)
-    logger.addHandler(console_handler)
+    # Queue the records on the logger, the listener thread writes them to the handlers
+    queued_logging.setup(logger, [file_handler, console_handler], logging_settings)
 
     return logger
 
-logger = setup_logging()
 
-
-def create_app():
+def create_app(config_overrides=None):
     """
     Create and configure the Flask application.
+    :param config_overrides: Optional dictionary of settings that take precedence over `config.yml`.
     :return: Configured Flask application instance.
     """
     try:
+        config = load_config(config_overrides)
+        setup_logging(config)
+        os.makedirs(MEDIA_DIR, exist_ok=True)
+
         application = Flask(__name__, instance_relative_config=True)
-        application.config.from_mapping(config_contents)
-        configure_app(application)
-        initialize_extensions(application)
+        configure_app(application, config)
+        configure_json(application)
+        initialize_extensions(application, config)
         register_blueprints(application)
+        register_commands(application)
         setup_swagger(application)
 
+        _applications.add(application)
         return application
     except Exception as e:
         logger.error(f'Failed to create Flask app instance: {e}')
         raise
 
 
-def initialize_extensions(application):
+def prepare_for_fork():
+    """
+    Get a preloaded app ready to be forked into workers. Call it in the master before the first fork.
+
+    Pending write-behind entries are written and every pooled database connection is closed, so workers
+    start without inherited connections and the master holds none while it only supervises.
+    """
+    from app.helpers.write_behind import last_login_buffer
+
+    last_login_buffer.flush()
+    for application in list(_applications):
+        with application.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+def post_fork():
+    """
+    Reset per-process state in a freshly forked worker. Call it from the server's post-fork worker hook
+    (`main.py` wires gunicorn's); it is deliberately not an `os.register_at_fork` hook, which would also run in
+    every other forked child, such as multiprocessing pool workers.
+
+    - Database pools are replaced without closing the inherited connections (`dispose(close=False)`), since
+      those sockets still belong to the parent; the worker opens its own on first use.
+    - Log files are re-opened so the worker writes through its own file descriptor, and the log listener
+      thread is restarted.
+    - Locks, background threads and process pools of the helpers are reset; they start again on first use.
+
+    Safe to call more than once; only the first call in a process does anything.
+    """
+    pid = os.getpid()
+    if _fork_state['post_fork_pid'] == pid:
+        return
+    _fork_state['post_fork_pid'] = pid
+
+    from app.helpers.async_db import async_db
+    from app.helpers.log_queue import queued_logging
+    from app.helpers.metrics import request_metrics
+    from app.helpers.password_hasher import import_password_hasher, password_hasher
+    from app.helpers.rate_limit import rate_limiter
+    from app.helpers.replica_routing import replica_router
+    from app.helpers.revocation_index import revocation_index
+    from app.helpers.token_cache import token_cache
+    from app.helpers.write_behind import last_login_buffer
+
+    for application in list(_applications):
+        with application.app_context():
+            for engine in db.engines.values():
+                engine.dispose(close=False)
+
+    reopen_log_handlers()
+    queued_logging.after_fork()
+    token_cache.after_fork()
+    password_hasher.after_fork()
+    import_password_hasher.after_fork()
+    last_login_buffer.after_fork()
+    request_metrics.after_fork()
+    revocation_index.after_fork()
+    replica_router.after_fork()
+    rate_limiter.after_fork()
+    async_db.after_fork()
+
+
+def reopen_log_handlers():
+    """
+    Re-open the file handlers behind the application logger's queue, giving this process its own file descriptors.
+    """
+    from app.helpers.log_queue import queued_logging
+
+    for handler in queued_logging.handlers:
+        if isinstance(handler, logging.FileHandler):
+            handler.acquire()
+            try:
+                if handler.stream is not None:
+                    handler.stream.close()
+                handler.stream = handler._open()
+            finally:
+                handler.release()
+
+
+def initialize_extensions(application, config=None):
     """
     Initialize extensions.
     :param application:
+    :param config: Configuration the app was created from, before `configure_app` derived the engine options.
     :return:
     """
     try:
+        from flask_migrate import Migrate
+
+        from app.helpers.async_db import async_db
+        from app.helpers.compression import response_compression
+        from app.helpers.log_queue import queued_logging
+        from app.helpers.password_hasher import import_password_hasher, password_hasher
+        from app.helpers.rate_limit import rate_limiter
+        from app.helpers.replica_routing import replica_router
+        from app.helpers.revocation_index import revocation_index
+        from app.helpers.token_cache import token_cache
+        from app.helpers.write_behind import last_login_buffer
+        from app.models.refresh_token import RefreshToken
+        from app.models.user import User
+
         db.init_app(application)
+        replica_router.init_app(application)
         migrate = Migrate(app=application, db=db, compare_type=True)
+        queued_logging.init_app(application)
+        token_cache.init_app(application)
+        password_hasher.init_app(application)
+        import_password_hasher.init_app(
+            application, overrides=(application.config.get('BULK_IMPORT') or {}).get('HASHING')
+        )
+        last_login_buffer.init_app(application, 'LAST_LOGIN_BUFFER', writer=User.bulk_update_last_login)
+        revocation_index.init_app(application, loader=RefreshToken.revoked_family_ids)
+        response_compression.init_app(application)
+        rate_limiter.init_app(application)
+        async_db.init_app(application, base_engine_options=(config or {}).get('SQLALCHEMY_ENGINE_OPTIONS'))
         return db, migrate
 
     except Exception as e:
@@ -117,22 +270,47 @@ def register_blueprints(application):
     :return: None
     """
     try:
-        from app.views import v1_blueprints
+        from app.helpers.metrics import request_metrics
+        from app.views import v1_blueprints, internal_blueprints, MetricsView
 
         application.register_blueprint(v1_blueprints, url_prefix='/api/v1')
+        if application.config.get('INTERNAL_STATS', {}).get('ENABLED'):
+            application.register_blueprint(internal_blueprints, url_prefix='/internal')
+
+        request_metrics.init_app(application)
+        if request_metrics.enabled:
+            application.add_url_rule('/metrics', view_func=MetricsView.get, methods=['GET'], endpoint='metrics')
     except Exception as e:
         log_traceback('Error registering blueprints', e)
         raise
 
 
+def register_commands(application):
+    """
+    Registers CLI command groups (e.g. `flask users import`, `flask tokens purge-expired`).
+    :param application:
+    :return: None
+    """
+    try:
+        from app.commands import tokens_cli, users_cli
+
+        application.cli.add_command(users_cli)
+        application.cli.add_command(tokens_cli)
+    except Exception as e:
+        log_traceback('Error registering CLI commands', e)
+        raise
+
+
 def setup_swagger(application):
     """
     Set up Swagger UI for API documentation.
     :param application: Flask application instance.
     """
     try:
+        from flask_swagger_ui import get_swaggerui_blueprint
+
         swagger_url = '/api-docs/'
-        api_url = f'/static/api_docs/{config_contents.get("SWAGGER_FILE_NAME", "api_docs.yaml")}'
+        api_url = f'/static/api_docs/{application.config.get("SWAGGER_FILE_NAME", "api_docs.yaml")}'
         swagger_config = {'app_name': 'My Flask Application'}
         swagger_blueprint = get_swaggerui_blueprint(
             base_url=swagger_url,
@@ -146,19 +324,43 @@ def setup_swagger(application):
         raise
 
 
-def configure_app(application):
+def configure_app(application, config=None):
     """
     Apply configuration settings to the Flask app from the provided data.
     :param application: Flask application instance.
+    :param config: Configuration settings, defaults to `config_contents`.
     """
     try:
-        for key, value in config_contents.items():
+        from app.helpers.pool_instrumentation import build_engine_options
+        from app.helpers.replica_routing import build_replica_binds
+
+        config = config if config is not None else config_contents
+        for key, value in config.items():
             application.config[key] = value
+        application.config['SQLALCHEMY_ENGINE_OPTIONS'] = build_engine_options(config)
+        application.config['SQLALCHEMY_BINDS'] = build_replica_binds(config)
     except Exception as e:
         logger.error(f'Error configuring app: {e}')
         raise
 
 
+def configure_json(application):
+    """
+    Install the fast JSON provider (orjson when available) on the app and pre-render the constant
+    error responses with it.
+    :param application: Flask application instance.
+    """
+    try:
+        from app.helpers.error_responses import prerendered_responses
+        from app.helpers.json_provider import FastJSONProvider
+
+        application.json = FastJSONProvider(application)
+        prerendered_responses.init_app(application)
+    except Exception as e:
+        logger.error(f'Error configuring JSON provider: {e}')
+        raise
+
+
 def log_traceback(context, exception):
     """
     Log detailed traceback information for debugging purposes.
@@ -173,9 +375,3 @@ def log_traceback(context, exception):
         error_message += f'    {text}\n'
     logger.error(error_message)
 
-
-app = Flask(__name__)
-app.json.sort_keys = False
-configure_app(application=app)
-db = SQLAlchemy(app, session_options={'expire_on_commit': False})
-migrate = Migrate(app=app, db=db, compare_type=True)
\ No newline at end of file
@@ -0,0 +1,129 @@
+"""
+ASGI entry point.
+
+The v1 endpoints listed in `ASYNC_VIEWS.ENDPOINTS` are served by their async views (see
+`app.views.v1.async_user_view`), which wait on the database through the async engine without holding a thread, so
+one worker keeps many of them in flight. Every other request is handed to the Flask app, which runs on a pool of
+`SERVER.THREADS` threads as under the WSGI server.
+
+Selected with `SERVER.INTERFACE: asgi` (`FLASK_ENV=production python main.py` then runs gunicorn with uvicorn
+workers), or run directly with `uvicorn --factory app.asgi:create_asgi_app`.
+"""
+
+import traceback
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+from a2wsgi import WSGIMiddleware
+
+from app import create_app, logger
+
+AsyncView = Callable[[Any], Awaitable[Any]]
+
+
+class AsgiApplication:
+    """ASGI app routing the async endpoints to their views and everything else to the Flask app."""
+
+    def __init__(self, application, routes: Dict[Tuple[str, str], Tuple[str, AsyncView]], wsgi_threads: int = 4):
+        """
+        :param application: The Flask application.
+        :param routes: (method, path) to (endpoint name, async view).
+        :param wsgi_threads: Threads serving the requests passed to the Flask app.
+        """
+        self.application = application
+        self.routes = routes
+        self.wsgi = WSGIMiddleware(application, workers=wsgi_threads)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            return await self.lifespan(receive, send)
+
+        route = self.routes.get((scope.get('method'), scope.get('path'))) if scope['type'] == 'http' else None
+        if route is None:
+            return await self.wsgi(scope, receive, send)
+        return await self.serve(route, scope, receive, send)
+
+    async def serve(self, route: Tuple[str, AsyncView], scope, receive, send) -> None:
+        """
+        Run one async view inside a Flask request context and a database session of its own.
+
+        The app's `before_request` and `after_request` hooks run around the view as for any Flask request, so
+        the request id, the metrics and the read-your-writes cookie are the same on both paths.
+
+        :param route: The endpoint name and its view.
+        :param scope: The ASGI connection scope.
+        :param receive: The ASGI receive channel.
+        :param send: The ASGI send channel.
+        """
+        from app.helpers.asgi import AsgiRequest, error_response, send_response
+        from app.helpers.async_db import async_db
+        from app.helpers.replica_routing import replica_router
+        from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+
+        endpoint, view = route
+        request = AsgiRequest(scope, receive)
+        environ = request.environ()
+        with self.application.request_context(environ):
+            try:
+                response = self.application.preprocess_request()
+                if response is None:
+                    async with async_db.scope() as session:
+                        response = (await view(request)).to_response(self.application.response_class)
+                        if session.info.get('wrote'):
+                            replica_router.note_write(session)
+                else:
+                    response = self.application.make_response(response)
+            except Exception as e:
+                logger.error('Error serving %s: %s\n%s', endpoint, str(e), traceback.format_exc())
+                response = error_response(
+                    http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                    message_key=ResponseMessageKeys.FAILED,
+                    error=ResponseErrorCodes.SERVER_ERROR
+                ).to_response(self.application.response_class)
+
+            response = self.application.process_response(response)
+        await send_response(response, environ, send)
+
+    async def lifespan(self, receive, send) -> None:
+        """
+        Answer the server's startup and shutdown events, closing the async engine's connections on shutdown.
+
+        :param receive: The ASGI receive channel.
+        :param send: The ASGI send channel.
+        """
+        from app.helpers.async_db import async_db
+
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await async_db.dispose()
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+
+def create_asgi_app(config_overrides=None):
+    """
+    Create the Flask application and wrap it in the ASGI app serving its async endpoints.
+    :param config_overrides: Optional dictionary of settings that take precedence over `config.yml`.
+    :return: The `AsgiApplication`.
+    """
+    try:
+        from app.views import v1_async_routes
+
+        application = create_app(config_overrides)
+        settings = application.config.get('ASYNC_VIEWS') or {}
+
+        routes = {}
+        for endpoint in settings.get('ENDPOINTS', list(v1_async_routes)):
+            if endpoint not in v1_async_routes:
+                raise ValueError(f'No async view for endpoint {endpoint}, expected one of {list(v1_async_routes)}')
+            method, rule, view = v1_async_routes[endpoint]
+            # Named like the Flask endpoint, so both paths report under the same metrics labels
+            routes[(method, f'/api/v1/{rule}')] = (f'v1.{endpoint}', view)
+
+        threads = int((application.config.get('SERVER') or {}).get('THREADS') or 4)
+        return AsgiApplication(application, routes, wsgi_threads=threads)
+    except Exception as e:
+        logger.error(f'Failed to create ASGI app instance: {e}')
+        raise
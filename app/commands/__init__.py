@@ -0,0 +1,8 @@
+from app.commands.token_commands import tokens_cli
+from app.commands.user_commands import users_cli
+
+
+__all__ = [
+    'tokens_cli',
+    'users_cli',
+]
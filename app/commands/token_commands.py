@@ -0,0 +1,18 @@
+import click
+from flask.cli import AppGroup
+
+from app.models.refresh_token import RefreshToken
+
+tokens_cli = AppGroup('tokens', help='Manage refresh tokens.')
+
+
+@tokens_cli.command('purge-expired')
+@click.option('--batch-size', type=int, default=1000, help='Rows deleted per statement.')
+def purge_expired(batch_size):
+    """
+    Delete expired refresh tokens.
+
+    Rotation stores one row per refresh, so run this periodically (e.g. daily from cron).
+    """
+    deleted = RefreshToken.purge_expired(batch_size=batch_size)
+    click.echo(f'Deleted {deleted} expired refresh tokens.')
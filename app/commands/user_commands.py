@@ -0,0 +1,47 @@
+import json
+import os
+
+import click
+from flask import current_app
+from flask.cli import AppGroup
+
+from app.helpers.password_hasher import HashingServiceBusy, PasswordHasher
+from app.helpers.user_import import UserImporter
+from app.views.v1.schemas import SIGN_UP_SCHEMA
+
+users_cli = AppGroup('users', help='Manage user accounts.')
+
+
+@users_cli.command('import')
+@click.argument('source', type=click.File('rb'))
+@click.option('--batch-size', type=int, default=None,
+              help='Rows per INSERT batch (defaults to BULK_IMPORT.BATCH_SIZE).')
+@click.option('--workers', type=int, default=None,
+              help='Password hashing processes (defaults to BULK_IMPORT.CLI_HASHING_WORKERS, or one per CPU).')
+def import_users(source, batch_size, workers):
+    """
+    Create users from an NDJSON file (use - for stdin).
+
+    Each line must be a JSON object with name, email and password, valid as a sign-up. Rows that fail are
+    reported and do not stop the import. Passwords are hashed by a pool of this command's own, one process
+    per CPU by default, since the command does not share the machine with request workers the way the
+    endpoint's pool does.
+    """
+    settings = current_app.config.get('BULK_IMPORT') or {}
+    workers = workers or int(settings.get('CLI_HASHING_WORKERS') or 0) or os.cpu_count() or 1
+
+    hasher = PasswordHasher()
+    hasher.init_app(current_app, overrides={'WORKERS': workers, 'MAX_PENDING': workers})
+    importer = UserImporter.from_config(current_app.config, SIGN_UP_SCHEMA)
+    importer.hasher = hasher
+    if batch_size:
+        importer.batch_size = batch_size
+
+    try:
+        summary = importer.run(source)
+    except HashingServiceBusy as e:
+        click.echo(json.dumps(importer.summary(), indent=2, default=str))
+        raise click.ClickException(f'Import stopped, password hashing did not keep up: {e}')
+    finally:
+        hasher.shutdown()
+    click.echo(json.dumps(summary, indent=2, default=str))
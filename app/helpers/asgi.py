@@ -0,0 +1,282 @@
+import asyncio
+import io
+import math
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import current_app
+from werkzeug.http import parse_options_header
+
+from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+from app.helpers.error_responses import prerendered_responses
+from app.helpers.rate_limit import rate_limiter
+from app.helpers.request_schema import RequestSchema
+from app.helpers.utility import build_response_envelope
+
+
+class AsgiRequest:
+    """The parts of an ASGI HTTP request the async views use, mirroring the `flask.request` attributes."""
+
+    __slots__ = ('method', 'path', 'headers', 'remote_addr', '_scope', '_receive')
+
+    def __init__(self, scope: Dict[str, Any], receive):
+        """
+        Args:
+            scope (Dict[str, Any]): The ASGI connection scope.
+            receive (Callable): The ASGI receive channel.
+        """
+        self.method = scope['method']
+        self.path = scope['path']
+        headers: Dict[str, str] = {}
+        for name, value in scope['headers']:
+            name, value = name.decode('latin-1').lower(), value.decode('latin-1')
+            headers[name] = f'{headers[name]}, {value}' if name in headers else value
+        self.headers = headers
+        self.remote_addr = scope['client'][0] if scope.get('client') else None
+        self._scope = scope
+        self._receive = receive
+
+    @property
+    def content_length(self) -> Optional[int]:
+        try:
+            return int(self.headers['content-length'])
+        except (KeyError, ValueError):
+            return None
+
+    @property
+    def is_json(self) -> bool:
+        mimetype = parse_options_header(self.headers.get('content-type', ''))[0]
+        return mimetype == 'application/json' or (mimetype.startswith('application/') and mimetype.endswith('+json'))
+
+    def environ(self) -> Dict[str, Any]:
+        """
+        Build the WSGI environ of the request, without its body (read through `read`).
+
+        The async views run inside a Flask request context made from it, so the app's request hooks (request
+        id, metrics, read-your-writes cookie) see them like any other request.
+
+        Returns:
+            Dict[str, Any]: The environ.
+        """
+        scope = self._scope
+        server = scope.get('server') or ('localhost', 80)
+        environ = {
+            'REQUEST_METHOD': self.method,
+            'SCRIPT_NAME': scope.get('root_path', ''),
+            'PATH_INFO': self.path,
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': server[0],
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f'HTTP/{scope.get("http_version", "1.1")}',
+            'REMOTE_ADDR': self.remote_addr or '',
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(),
+            'wsgi.errors': io.StringIO(),
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False,
+        }
+        for name, value in self.headers.items():
+            if name in ('content-type', 'content-length'):
+                environ[name.upper().replace('-', '_')] = value
+            else:
+                environ[f'HTTP_{name.upper().replace("-", "_")}'] = value
+        return environ
+
+    async def read(self, limit: int) -> bytes:
+        """
+        Read the body, stopping one byte past `limit` so oversized bodies are never buffered in full.
+
+        Args:
+            limit (int): Largest accepted body in bytes.
+
+        Returns:
+            bytes: At most `limit + 1` bytes of the body.
+        """
+        body = bytearray()
+        more_body = True
+        while more_body and len(body) <= limit:
+            message = await self._receive()
+            if message['type'] == 'http.disconnect':
+                break
+            body += message.get('body', b'')
+            more_body = message.get('more_body', False)
+        return bytes(body[:limit + 1])
+
+
+class AsgiResponse:
+    """A complete (buffered) response of an async view."""
+
+    __slots__ = ('status', 'body', 'headers')
+
+    def __init__(self, status: int, body: bytes = b'', headers: Optional[Dict[str, str]] = None,
+                 mimetype: Optional[str] = 'application/json'):
+        self.status = status
+        self.body = body
+        self.headers = dict(headers or {})
+        if mimetype and status != HttpStatusCode.NOT_MODIFIED.value:
+            self.headers.setdefault('Content-Type', mimetype)
+
+    def to_response(self, response_class) -> Any:
+        """
+        Convert to a Flask response, for the app's `after_request` hooks.
+
+        Args:
+            response_class (type): The app's `response_class`.
+
+        Returns:
+            Response: The Flask response.
+        """
+        return response_class(self.body, status=self.status, headers=self.headers)
+
+
+async def send_response(response, environ: Dict[str, Any], send) -> None:
+    """
+    Send a (buffered) Flask response on an ASGI send channel, with the headers a WSGI server would send.
+
+    Args:
+        response (Response): The response, after the app's `after_request` hooks.
+        environ (Dict[str, Any]): The request's environ (see `AsgiRequest.environ`).
+        send (Callable): The ASGI send channel.
+    """
+    body = b''.join(response.get_app_iter(environ))
+    headers: List[Tuple[bytes, bytes]] = [
+        (name.lower().encode('latin-1'), value.encode('latin-1'))
+        for name, value in response.get_wsgi_headers(environ).items() if name.lower() != 'content-length'
+    ]
+    headers.append((b'content-length', str(len(body)).encode('latin-1')))
+    await send({'type': 'http.response.start', 'status': response.status_code, 'headers': headers})
+    await send({'type': 'http.response.body', 'body': body})
+
+
+def json_response(
+        http_status: int,
+        response_status: bool,
+        message_key: Any,
+        data: Optional[Any] = None,
+        error: Optional[Any] = None
+) -> AsgiResponse:
+    """
+    Async views' counterpart of `send_json_response`, with the same envelope.
+
+    Args:
+        http_status (int): HTTP response status code.
+        response_status (bool): Boolean indicating success or failure.
+        message_key (Any): Message string (or field errors) to be included in the response.
+        data (Optional[Any]): Response data to be included.
+        error (Optional[Any]): Error details to be included if the response failed.
+
+    Returns:
+        AsgiResponse: The response.
+    """
+    envelope = build_response_envelope(response_status, message_key, data, error)
+    return AsgiResponse(http_status, current_app.json.dumps_bytes(envelope))
+
+
+def error_response(
+        http_status: HttpStatusCode,
+        message_key: ResponseMessageKeys,
+        error: Optional[ResponseErrorCodes] = None
+) -> AsgiResponse:
+    """
+    Async views' counterpart of `send_error_response`, served from the same pre-rendered bodies.
+
+    Args:
+        http_status (HttpStatusCode): HTTP response status.
+        message_key (ResponseMessageKeys): Response message.
+        error (Optional[ResponseErrorCodes]): Error code included in the response.
+
+    Returns:
+        AsgiResponse: The response.
+    """
+    return AsgiResponse(http_status.value, prerendered_responses.get(http_status, message_key, error))
+
+
+async def read_json(
+        request: AsgiRequest,
+        schema: RequestSchema
+) -> Tuple[Optional[Dict[str, Any]], Optional[AsgiResponse]]:
+    """
+    Read and validate a JSON body like the `validate_json` decorator does, with the same size limit and errors.
+
+    Args:
+        request (AsgiRequest): The request.
+        schema (RequestSchema): The schema of the body.
+
+    Returns:
+        Tuple[Optional[Dict[str, Any]], Optional[AsgiResponse]]: The validated fields, or the error response.
+    """
+    limit = schema.content_limit(current_app.config)
+    if request.content_length is not None and request.content_length > limit:
+        return None, error_response(
+            http_status=HttpStatusCode.PAYLOAD_TOO_LARGE,
+            message_key=ResponseMessageKeys.PAYLOAD_TOO_LARGE,
+            error=ResponseErrorCodes.PAYLOAD_TOO_LARGE
+        )
+
+    body = await request.read(limit) if request.is_json else b''
+    if len(body) > limit:
+        return None, error_response(
+            http_status=HttpStatusCode.PAYLOAD_TOO_LARGE,
+            message_key=ResponseMessageKeys.PAYLOAD_TOO_LARGE,
+            error=ResponseErrorCodes.PAYLOAD_TOO_LARGE
+        )
+
+    try:
+        data = current_app.json.loads(body) if body else None
+    except ValueError:
+        data = None
+    if not isinstance(data, dict):
+        return None, error_response(
+            http_status=HttpStatusCode.BAD_REQUEST,
+            message_key=ResponseMessageKeys.INVALID_JSON,
+            error=ResponseErrorCodes.INVALID_DATA
+        )
+
+    values, errors = schema.validate(data)
+    if errors and schema.fixed_error:
+        message_key, error = schema.fixed_error
+        return None, error_response(http_status=HttpStatusCode.BAD_REQUEST, message_key=message_key, error=error)
+    if errors:
+        return None, json_response(
+            http_status=HttpStatusCode.BAD_REQUEST.value,
+            response_status=False,
+            message_key=errors,
+            error=schema.error_code(data, errors).value
+        )
+    return values, None
+
+
+async def check_rate_limit(
+        request: AsgiRequest,
+        endpoint: str,
+        email: Optional[str] = None
+) -> Optional[AsgiResponse]:
+    """
+    Apply the `RATE_LIMITS.ENDPOINTS.<endpoint>` limits like the `rate_limited` decorator does.
+
+    The shared backend makes a network round trip per bucket, so that check runs in a thread instead of
+    blocking the event loop.
+
+    Args:
+        request (AsgiRequest): The request.
+        endpoint (str): The endpoint name in the config.
+        email (Optional[str]): The normalized email the request is about.
+
+    Returns:
+        Optional[AsgiResponse]: A 429 with `Retry-After` if the request is rejected, otherwise None.
+    """
+    if rate_limiter.shared:
+        retry_after = await asyncio.to_thread(rate_limiter.check, endpoint, ip=request.remote_addr, email=email)
+    else:
+        retry_after = rate_limiter.check(endpoint, ip=request.remote_addr, email=email)
+    if not retry_after:
+        return None
+
+    response = error_response(
+        http_status=HttpStatusCode.TOO_MANY_REQUESTS,
+        message_key=ResponseMessageKeys.TOO_MANY_REQUESTS,
+        error=ResponseErrorCodes.RATE_LIMITED
+    )
+    response.headers['Retry-After'] = str(max(math.ceil(retry_after), 1))
+    return response
@@ -0,0 +1,162 @@
+from contextlib import asynccontextmanager
+from contextvars import ContextVar
+from typing import Any, AsyncIterator, Dict, Optional
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
+from sqlalchemy.orm import Session
+
+from app import logger
+
+# Async driver used for each sync driver of `SQLALCHEMY_DATABASE_URI`
+ASYNC_DRIVERS = {
+    'postgresql': 'postgresql+asyncpg',
+    'postgresql+psycopg2': 'postgresql+asyncpg',
+    'sqlite': 'sqlite+aiosqlite',
+    'sqlite+pysqlite': 'sqlite+aiosqlite',
+    'mysql': 'mysql+aiomysql',
+    'mysql+pymysql': 'mysql+aiomysql',
+}
+
+# Session of the async request being served, set by `AsyncDatabase.scope`
+_session: ContextVar[Optional[AsyncSession]] = ContextVar('async_db_session', default=None)
+
+
+class WriteTrackingSession(Session):
+    """Sync session behind each `AsyncSession`, setting `info['wrote']` once it flushes or runs DML."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        if self._flushing or getattr(clause, 'is_dml', False):
+            self.info['wrote'] = True
+        return super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+
+
+class AsyncDatabase:
+    """
+    Async SQLAlchemy engine and per-request sessions for the async views (see `app.asgi`).
+
+    The engine connects to `ASYNC_VIEWS.DATABASE_URI`, or by default to `SQLALCHEMY_DATABASE_URI` with its driver
+    swapped for the async one (`ASYNC_DRIVERS`), with a pool sized by `DATABASE_POOL` like the sync engine.
+    It is created on first use, so every worker process opens its own connections from its own event loop.
+
+    Each request runs in its own `AsyncSession`, which the async model methods reach through
+    `async_db.session`, as the sync ones use `db.session`. Every query goes to the primary; read replicas are
+    only used by the sync path, and `session.info['wrote']` tells whether the request wrote (see
+    `WriteTrackingSession`), to start the client's read-your-writes window.
+    """
+
+    def __init__(self):
+        self.uri: Optional[str] = None
+        self.engine_options: Dict[str, Any] = {}
+        self._engine: Optional[AsyncEngine] = None
+
+    @property
+    def engine(self) -> AsyncEngine:
+        """The async engine, created on first use."""
+        if self._engine is None:
+            if self.uri is None:
+                raise RuntimeError('AsyncDatabase.init_app() has not been called.')
+            self._engine = create_async_engine(self.uri, **self.engine_options)
+        return self._engine
+
+    @property
+    def session(self) -> AsyncSession:
+        """
+        The session of the current async request.
+
+        Raises:
+            RuntimeError: Outside of `scope()`.
+        """
+        session = _session.get()
+        if session is None:
+            raise RuntimeError('No async database session, run the query inside AsyncDatabase.scope().')
+        return session
+
+    def init_app(self, application, base_engine_options: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Configure the engine from the `ASYNC_VIEWS` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+            base_engine_options (Optional[Dict[str, Any]]): `SQLALCHEMY_ENGINE_OPTIONS` as configured, before
+                `configure_app` replaced them with the sync engine's (whose pool class cannot serve async).
+        """
+        from app.helpers.pool_instrumentation import build_engine_options
+
+        settings = application.config.get('ASYNC_VIEWS') or {}
+        self.uri = settings.get('DATABASE_URI') or self.async_uri(
+            application.config.get('SQLALCHEMY_DATABASE_URI') or ''
+        )
+        self.engine_options = build_engine_options(
+            {
+                **application.config,
+                'SQLALCHEMY_DATABASE_URI': self.uri,
+                'SQLALCHEMY_ENGINE_OPTIONS': base_engine_options,
+            },
+            pool_name='async',
+            asynchronous=True
+        )
+        # A sync DBAPI `creator` cannot open async connections, those come from `ENGINE_OPTIONS.async_creator`
+        self.engine_options.pop('creator', None)
+        self.engine_options.update(settings.get('ENGINE_OPTIONS') or {})
+        self._engine = None
+
+    @staticmethod
+    def async_uri(uri: str) -> str:
+        """
+        Return a database URI with its driver replaced by the matching async driver.
+
+        Args:
+            uri (str): A sync SQLAlchemy URI, e.g. `postgresql+psycopg2://...`.
+
+        Returns:
+            str: The async URI, e.g. `postgresql+asyncpg://...`; unknown drivers are returned unchanged.
+        """
+        url = make_url(uri)
+        driver = ASYNC_DRIVERS.get(url.drivername)
+        return url.set(drivername=driver).render_as_string(hide_password=False) if driver else uri
+
+    @asynccontextmanager
+    async def scope(self) -> AsyncIterator[AsyncSession]:
+        """
+        Open the session of one request. Uncommitted work is rolled back when the block exits.
+
+        Returns:
+            AsyncIterator[AsyncSession]: The session, also available as `async_db.session` inside the block.
+        """
+        session = AsyncSession(self.engine, expire_on_commit=False, sync_session_class=WriteTrackingSession)
+        token = _session.set(session)
+        try:
+            yield session
+        finally:
+            _session.reset(token)
+            await session.close()
+
+    async def dispose(self) -> None:
+        """Close the pooled connections, e.g. when the server shuts down."""
+        if self._engine is not None:
+            await self._engine.dispose()
+
+    def after_fork(self) -> None:
+        """Forget the parent's engine in a freshly forked child, without closing the parent's connections."""
+        if self._engine is not None:
+            try:
+                self._engine.sync_engine.dispose(close=False)
+            except Exception as e:
+                logger.error('Error while resetting the async engine after fork: %s', str(e))
+        self._engine = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the engine state.
+
+        Returns:
+            Dict[str, Any]: The driver in use and whether this process has connected yet.
+        """
+        return {
+            'driver': make_url(self.uri).drivername if self.uri else None,
+            'connected': self._engine is not None,
+        }
+
+
+async_db = AsyncDatabase()
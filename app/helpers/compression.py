@@ -0,0 +1,253 @@
+import gzip
+import mimetypes
+import os
+import threading
+import zlib
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from flask import current_app, request
+from werkzeug.security import safe_join
+
+try:
+    import brotli
+except ImportError:  # brotli is optional, responses are only gzip-compressed without it
+    brotli = None
+
+DEFAULT_MIME_TYPES = (
+    'application/json',
+    'application/x-ndjson',
+    'application/javascript',
+    'text/javascript',
+    'application/yaml',
+    'application/x-yaml',
+    'text/yaml',
+    'text/html',
+    'text/css',
+    'text/plain',
+    'image/svg+xml',
+)
+
+
+class ResponseCompression:
+    """
+    Compresses responses with the best encoding the client accepts (`br` when brotli is installed, else `gzip`).
+
+    - Buffered responses are compressed when their body is at least `min_size` bytes, so small responses
+      (e.g. sign-in tokens, pre-rendered errors) are sent as is.
+    - Streamed responses are compressed chunk by chunk, each chunk flushed so the client still receives the
+      stream progressively.
+    - Static files are compressed once per encoding and kept in a small in-memory cache, keyed by path,
+      modification time and size, so a changed file is compressed again.
+
+    Compressible responses always carry `Vary: Accept-Encoding`. A compressed response's ETag is made weak,
+    since its bytes differ from the identity representation; conditional requests compare ETags weakly.
+    """
+
+    def __init__(self, enabled: bool = True, min_size: int = 1024, gzip_level: int = 6, brotli_quality: int = 4,
+                 static_cache_size: int = 64):
+        self.enabled = enabled
+        self.min_size = min_size
+        self.gzip_level = gzip_level
+        self.brotli_quality = brotli_quality
+        self.static_cache_size = static_cache_size
+        self.mime_types = frozenset(DEFAULT_MIME_TYPES)
+        self.streaming = True
+
+        self._static_cache: 'OrderedDict[Tuple[str, str, float, int], bytes]' = OrderedDict()
+        self._lock = threading.Lock()
+
+        self.compressed = 0
+        self.skipped_small = 0
+        self.static_hits = 0
+        self.static_misses = 0
+
+    @property
+    def encodings(self) -> Tuple[str, ...]:
+        """Supported encodings, in order of preference."""
+        return ('br', 'gzip') if brotli is not None else ('gzip',)
+
+    def init_app(self, application) -> None:
+        """
+        Configure compression from the `COMPRESSION` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        settings = application.config.get('COMPRESSION') or {}
+        self.enabled = bool(settings.get('ENABLED', self.enabled))
+        self.min_size = int(settings.get('MIN_SIZE', self.min_size))
+        self.gzip_level = int(settings.get('GZIP_LEVEL', self.gzip_level))
+        self.brotli_quality = int(settings.get('BROTLI_QUALITY', self.brotli_quality))
+        self.static_cache_size = int(settings.get('STATIC_CACHE_SIZE', self.static_cache_size))
+        self.streaming = bool(settings.get('STREAMING', self.streaming))
+        if settings.get('MIME_TYPES'):
+            self.mime_types = frozenset(settings['MIME_TYPES'])
+
+        # Python < 3.13 does not know YAML, so the Swagger spec would be served (uncompressed) as octet-stream
+        mimetypes.add_type('application/yaml', '.yaml')
+        mimetypes.add_type('application/yaml', '.yml')
+
+        if self.enabled:
+            application.after_request(self._after_request)
+
+    def compress(self, data: bytes, encoding: str) -> bytes:
+        """
+        Compress a whole body.
+
+        Args:
+            data (bytes): The body.
+            encoding (str): `br` or `gzip`.
+
+        Returns:
+            bytes: The compressed body.
+        """
+        if encoding == 'br':
+            return brotli.compress(data, quality=self.brotli_quality)
+        return gzip.compress(data, compresslevel=self.gzip_level, mtime=0)
+
+    def compress_stream(self, chunks: Iterable[bytes], encoding: str) -> Iterator[bytes]:
+        """
+        Compress a streamed body chunk by chunk, flushing after every chunk.
+
+        Args:
+            chunks (Iterable[bytes]): The body chunks.
+            encoding (str): `br` or `gzip`.
+
+        Returns:
+            Iterator[bytes]: The compressed chunks.
+        """
+        try:
+            if encoding == 'br':
+                compressor = brotli.Compressor(quality=self.brotli_quality)
+                for chunk in chunks:
+                    if chunk:
+                        yield compressor.process(chunk) + compressor.flush()
+                yield compressor.finish()
+            else:
+                # wbits=31 writes the gzip header and trailer around the deflate stream
+                compressor = zlib.compressobj(self.gzip_level, zlib.DEFLATED, 31)
+                for chunk in chunks:
+                    if chunk:
+                        yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+                yield compressor.flush()
+        finally:
+            # Closing the original iterable runs its cleanup (e.g. `stream_with_context` popping the request)
+            if hasattr(chunks, 'close'):
+                chunks.close()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the compression counters.
+
+        Returns:
+            Dict[str, Any]: Encodings in use and response counts.
+        """
+        return {
+            'encodings': list(self.encodings),
+            'compressed': self.compressed,
+            'skipped_small': self.skipped_small,
+            'static_cache_entries': len(self._static_cache),
+            'static_hits': self.static_hits,
+            'static_misses': self.static_misses,
+        }
+
+    def _after_request(self, response):
+        """Compress the response if it is compressible and the client accepts an encoding."""
+        if response.status_code == 304:
+            return self._match_validated_etag(response)
+        if (response.status_code < 200 or response.status_code in (204, 206)
+                or response.mimetype not in self.mime_types or 'Content-Encoding' in response.headers):
+            return response
+
+        response.vary.add('Accept-Encoding')
+        encoding = request.accept_encodings.best_match(self.encodings)
+        if encoding is None or request.method == 'HEAD':
+            return response
+
+        if response.direct_passthrough:
+            return self._compress_static(response, encoding)
+
+        if response.is_streamed:
+            if not self.streaming:
+                return response
+            response.response = self.compress_stream(response.response, encoding)
+            response.headers.pop('Content-Length', None)
+        else:
+            data = response.get_data()
+            if len(data) < self.min_size:
+                self.skipped_small += 1
+                return response
+            response.set_data(self.compress(data, encoding))
+
+        return self._mark_encoded(response, encoding)
+
+    def _compress_static(self, response, encoding: str):
+        """Serve a static file from the compressed cache, compressing it on first use."""
+        path = self._static_path()
+        if path is None:
+            return response
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return response
+        if stat.st_size < self.min_size:
+            self.skipped_small += 1
+            return response
+
+        key = (path, encoding, stat.st_mtime, stat.st_size)
+        with self._lock:
+            body = self._static_cache.get(key)
+            if body is not None:
+                self._static_cache.move_to_end(key)
+
+        if body is None:
+            self.static_misses += 1
+            with open(path, 'rb') as static_file:
+                body = self.compress(static_file.read(), encoding)
+            with self._lock:
+                self._static_cache[key] = body
+                while len(self._static_cache) > self.static_cache_size:
+                    self._static_cache.popitem(last=False)
+        else:
+            self.static_hits += 1
+
+        response.close()
+        response.direct_passthrough = False
+        response.set_data(body)
+        return self._mark_encoded(response, encoding)
+
+    def _mark_encoded(self, response, encoding: str):
+        """Set the encoding headers of a compressed response."""
+        response.headers['Content-Encoding'] = encoding
+        etag, weak = response.get_etag()
+        if etag and not weak:
+            response.set_etag(etag, weak=True)
+        self.compressed += 1
+        return response
+
+    @staticmethod
+    def _match_validated_etag(response):
+        """Answer a 304 with the (weak) ETag of the compressed representation the client revalidated."""
+        response.vary.add('Accept-Encoding')
+        etag, weak = response.get_etag()
+        if etag and not weak and not request.if_none_match.contains(etag) and request.if_none_match.is_weak(etag):
+            response.set_etag(etag, weak=True)
+        return response
+
+    @staticmethod
+    def _static_path() -> Optional[str]:
+        """Return the file behind the current static request, or None if this is not one."""
+        endpoint = request.endpoint or ''
+        if not request.view_args or 'filename' not in request.view_args:
+            return None
+        if endpoint == 'static':
+            folder = current_app.static_folder
+        elif endpoint.endswith('.static') and request.blueprint in current_app.blueprints:
+            folder = current_app.blueprints[request.blueprint].static_folder
+        else:
+            return None
+        return safe_join(folder, request.view_args['filename']) if folder else None
+
+
+response_compression = ResponseCompression()
@@ -10,14 +10,20 @@ class HttpStatusCode(enum.Enum):
     ACCEPTED = 202
     NO_CONTENT = 204
 
+    # 3xx Redirection
+    NOT_MODIFIED = 304
+
     # 4xx Client Errors
     BAD_REQUEST = 400
     UNAUTHORIZED = 401
     FORBIDDEN = 403
     NOT_FOUND = 404
+    PAYLOAD_TOO_LARGE = 413
+    TOO_MANY_REQUESTS = 429
 
     # 5xx Server Errors
     INTERNAL_SERVER_ERROR = 500
+    SERVICE_UNAVAILABLE = 503
 
 
 class ResponseErrorCodes(enum.Enum):
@@ -25,10 +31,16 @@ class ResponseErrorCodes(enum.Enum):
     USERNAME_EXISTS = 'USERNAME_EXISTS'
     INVALID_CREDENTIALS = 'INVALID_CREDENTIALS'
     INSUFFICIENT_DATA = 'INSUFFICIENT_DATA'
+    INVALID_DATA = 'INVALID_DATA'
+    PAYLOAD_TOO_LARGE = 'PAYLOAD_TOO_LARGE'
+    RATE_LIMITED = 'RATE_LIMITED'
     INVALID_TOKEN = 'INVALID_TOKEN'
     EXPIRED_TOKEN = 'EXPIRED_TOKEN'
+    REVOKED_TOKEN = 'REVOKED_TOKEN'
     SERVER_ERROR = 'SERVER_ERROR'
+    SERVICE_UNAVAILABLE = 'SERVICE_UNAVAILABLE'
     NOT_FOUND = 'NOT_FOUND'
+    FORBIDDEN = 'FORBIDDEN'
     SUCCESS = 'SUCCESS'
 
 
@@ -49,14 +61,20 @@ class ResponseMessageKeys(enum.Enum):
     INVALID_CREDENTIALS = 'Provided email or password is invalid.'
     INVALID_REFRESH_TOKEN = 'The provided refresh token is invalid or missing.'
     REFRESH_TOKEN_EXPIRED = 'The refresh token has expired.'
+    REFRESH_TOKEN_REVOKED = 'The refresh token has been revoked. Please sign in again.'
     TOKEN_REFRESHED = 'Access token successfully refreshed.'
     INVALID_TOKEN = 'The provided access token is invalid or missing.'
     TOKEN_EXPIRED = 'The access token has expired.'
     USER_DOES_NOT_EXIST = 'No account found with the provided credentials. Please register for an account.'
+    FORBIDDEN = 'You do not have permission to access this resource.'
+    INVALID_JSON = 'The request body must be a JSON object.'
+    PAYLOAD_TOO_LARGE = 'The request body is too large.'
+    TOO_MANY_REQUESTS = 'Too many attempts. Please try again later.'
 
     # Server Error Messages
     FAILED = 'Something went wrong. Please try again later.'
     INTERNAL_SERVER_ERROR = 'The server encountered an internal error. Please contact support.'
+    SERVICE_BUSY = 'The server is busy. Please try again shortly.'
 
 
 class ValidationMessages:
@@ -66,6 +84,17 @@ class ValidationMessages:
         'PASSWORD': 'Password is required.',
     }
 
+    rule_messages = {
+        'type': '{label} must be {type}.',
+        'min_length': '{label} must be at least {min_length} characters long.',
+        'max_length': '{label} must be at most {max_length} characters long.',
+        'email': '{label} must be a valid email address.',
+    }
+
     @classmethod
     def get_message(cls, key: str) -> str:
-        return cls.messages.get(key.upper(), f'{key.replace("_", " ").title()} is required.')
\ No newline at end of file
+        return cls.messages.get(key.upper(), f'{key.replace("_", " ").title()} is required.')
+
+    @classmethod
+    def get_rule_message(cls, key: str, rule: str, **params) -> str:
+        return cls.rule_messages[rule].format(label=key.replace('_', ' ').title(), **params)
\ No newline at end of file
@@ -1,68 +1,106 @@
+import hashlib
+import hmac
+import math
 from functools import wraps
-from typing import Callable
+from typing import Any, Callable, Optional, Sequence
 
-from flask import request
+from flask import current_app, request
 import jwt
-from app import logger, config_contents
-from app.models.user import User
+from app import logger
+from app.helpers.identity import set_identity, get_current_user
+from app.helpers.rate_limit import rate_limiter
+from app.helpers.replica_routing import replica_router
+from app.helpers.request_schema import RequestSchema
+from app.helpers.token_cache import token_cache
+from app.helpers.error_responses import send_error_response
 from app.helpers.utility import send_json_response
+from app.models.user import User
 from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
 
+# Header carrying the credential checked by `internal_key_required`
+INTERNAL_KEY_HEADER = 'X-Internal-Key'
+
+
+def token_required(f: Optional[Callable] = None, *, claims_only: bool = False) -> Callable:
+    """
+    Protect a view with JWT authentication.
+
+    Can be used bare (`@token_required`) or with options (`@token_required(claims_only=True)`).
+    The authenticated caller is recorded on `flask.g` (see `app.helpers.identity`) so the view never
+    needs to load the user again.
+
+    Args:
+        f (Optional[Callable]): The view function.
+        claims_only (bool): Serve the view from the token claims alone, with no database access.
+            The view then receives a `TokenIdentity` (id, email, uuid) as `current_user`.
+
+    Returns:
+        Callable: The wrapped view.
+    """
+    if f is None:
+        return lambda view: token_required(view, claims_only=claims_only)
 
-def token_required(f: Callable) -> Callable:
     @wraps(f)
     def decorated(*args, **kwargs):
-        """Validates the JWT token."""
+        """
+        Validates the JWT token.
+
+        `current_user` is a read-only `UserSnapshot` (from `token_cache`, or projected from the database on a
+        miss) rather than a `User` instance.
+        """
         token = request.headers.get('Authorization')
 
         if not token or not token.startswith('Bearer '):
-            return send_json_response(
-                http_status=HttpStatusCode.UNAUTHORIZED.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.INVALID_TOKEN.value,
-                data=None,
-                error=ResponseErrorCodes.INVALID_TOKEN.value
+            return send_error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.INVALID_TOKEN,
+                error=ResponseErrorCodes.INVALID_TOKEN
             )
 
         token = token.split(' ')[1]
         try:
-            # Decode the token to get the user ID
-            data = jwt.decode(token, key=config_contents['JWT']['SECRET_KEY'], algorithms=['HS256'])
-            current_user = User.get_by_id(id=data['id'])
+            cached = token_cache.get(token)
+            if cached:
+                data, current_user = cached
+                identity = set_identity(data, user=current_user)
+                if claims_only:
+                    current_user = identity
+            else:
+                # Decode the token to get the user ID
+                data = jwt.decode(token, key=current_app.config['JWT']['SECRET_KEY'], algorithms=['HS256'])
+                if data.get('type') == 'refresh':
+                    raise jwt.InvalidTokenError('Refresh tokens cannot be used as access tokens.')
+                identity = set_identity(data)
+                current_user = identity if claims_only else get_current_user()
 
-            if not current_user:
-                return send_json_response(
-                    http_status=HttpStatusCode.UNAUTHORIZED.value,
-                    response_status=False,
-                    message_key=ResponseMessageKeys.INVALID_TOKEN.value,
-                    data=None,
-                    error=ResponseErrorCodes.INVALID_TOKEN.value
-                )
+                if not current_user:
+                    return send_error_response(
+                        http_status=HttpStatusCode.UNAUTHORIZED,
+                        message_key=ResponseMessageKeys.INVALID_TOKEN,
+                        error=ResponseErrorCodes.INVALID_TOKEN
+                    )
+
+                if not claims_only:
+                    token_cache.set(token, data, current_user)
 
         except jwt.ExpiredSignatureError:
-            return send_json_response(
-                http_status=HttpStatusCode.UNAUTHORIZED.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.TOKEN_EXPIRED.value,
-                data=None,
-                error=ResponseErrorCodes.EXPIRED_TOKEN.value
+            return send_error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.TOKEN_EXPIRED,
+                error=ResponseErrorCodes.EXPIRED_TOKEN
             )
         except jwt.InvalidTokenError:
-            return send_json_response(
-                http_status=HttpStatusCode.UNAUTHORIZED.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.INVALID_TOKEN.value,
-                data=None,
+            return send_error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.INVALID_TOKEN,
                 error=None
             )
         except Exception as e:
             logger.error('Error during token validation: %s', str(e))
-            return send_json_response(
-                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.FAILED.value,
-                data=None,
-                error=ResponseErrorCodes.SERVER_ERROR.value
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
             )
 
         # Attach the user ID to the request for further use
@@ -70,3 +108,250 @@ def token_required(f: Callable) -> Callable:
         return f(current_user, *args, **kwargs)
 
     return decorated
+
+
+def allowed_ips_only(section: str) -> Callable:
+    """
+    Restrict a view to the client addresses listed in `<section>.ALLOWED_IPS`, like `/internal/stats`.
+
+    Other callers get a 403 before the view runs; an empty or missing list lets nobody in.
+
+    Args:
+        section (str): The config section holding `ALLOWED_IPS`.
+
+    Returns:
+        Callable: Decorator for the view.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            allowed_ips = (current_app.config.get(section) or {}).get('ALLOWED_IPS') or []
+            if request.remote_addr not in allowed_ips:
+                return send_error_response(
+                    http_status=HttpStatusCode.FORBIDDEN,
+                    message_key=ResponseMessageKeys.FORBIDDEN,
+                    error=ResponseErrorCodes.FORBIDDEN
+                )
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
+
+
+def internal_key_required(section: str) -> Callable:
+    """
+    Restrict a view to callers presenting one of the `<section>.API_KEYS` in the `X-Internal-Key` header.
+
+    For endpoints exposing or creating other users' accounts: a user's access token proves who the caller
+    is, not that they may act on every account, and behind a reverse proxy every caller shares the proxy's
+    address, so `allowed_ips_only` alone does not tell them apart. Other callers get a 403 before the view
+    runs; an empty or missing list lets nobody in.
+
+    Args:
+        section (str): The config section holding `API_KEYS`.
+
+    Returns:
+        Callable: Decorator for the view.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            api_keys = (current_app.config.get(section) or {}).get('API_KEYS') or []
+            presented = request.headers.get(INTERNAL_KEY_HEADER, '').encode('utf-8')
+            # Every key is compared, in constant time, so the response time does not tell which one matched
+            matched = [hmac.compare_digest(presented, str(key).encode('utf-8')) for key in api_keys if key]
+            if not presented or not any(matched):
+                return send_error_response(
+                    http_status=HttpStatusCode.FORBIDDEN,
+                    message_key=ResponseMessageKeys.FORBIDDEN,
+                    error=ResponseErrorCodes.FORBIDDEN
+                )
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
+
+
+def read_only(f: Callable) -> Callable:
+    """
+    Mark a view as read-only, so its database reads may be served by a read replica.
+
+    Apply it above `token_required` so the user lookup is routed as well. Writes made by the view still go
+    to the primary, and pin the rest of the request (and the client's read-your-writes window) to it.
+
+    Args:
+        f (Callable): The view function.
+
+    Returns:
+        Callable: The wrapped view.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        replica_router.read_only_request()
+        return f(*args, **kwargs)
+
+    return decorated
+
+
+def validate_json(schema: RequestSchema) -> Callable:
+    """
+    Validate the JSON body of a view against a compiled `RequestSchema`.
+
+    The body size is checked against the schema's `max_content_length` (or
+    `REQUEST_SCHEMAS.DEFAULT_MAX_CONTENT_LENGTH`) from the Content-Length header before anything is read,
+    and the read itself stops one byte past the limit, so oversized bodies are never buffered or parsed.
+    Field errors are returned together, in the `validate_required_fields` shape, unless the schema sets a
+    `fixed_error`. The view receives the validated fields as the `data` keyword argument.
+
+    Args:
+        schema (RequestSchema): The schema of the body.
+
+    Returns:
+        Callable: Decorator for the view.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            limit = schema.content_limit(current_app.config)
+            if request.content_length is not None and request.content_length > limit:
+                return send_error_response(
+                    http_status=HttpStatusCode.PAYLOAD_TOO_LARGE,
+                    message_key=ResponseMessageKeys.PAYLOAD_TOO_LARGE,
+                    error=ResponseErrorCodes.PAYLOAD_TOO_LARGE
+                )
+
+            body = request.stream.read(limit + 1) if request.is_json else b''
+            if len(body) > limit:
+                return send_error_response(
+                    http_status=HttpStatusCode.PAYLOAD_TOO_LARGE,
+                    message_key=ResponseMessageKeys.PAYLOAD_TOO_LARGE,
+                    error=ResponseErrorCodes.PAYLOAD_TOO_LARGE
+                )
+
+            try:
+                data = current_app.json.loads(body) if body else None
+            except ValueError:
+                data = None
+            if not isinstance(data, dict):
+                return send_error_response(
+                    http_status=HttpStatusCode.BAD_REQUEST,
+                    message_key=ResponseMessageKeys.INVALID_JSON,
+                    error=ResponseErrorCodes.INVALID_DATA
+                )
+
+            values, errors = schema.validate(data)
+            if errors and schema.fixed_error:
+                message_key, error = schema.fixed_error
+                return send_error_response(
+                    http_status=HttpStatusCode.BAD_REQUEST,
+                    message_key=message_key,
+                    error=error
+                )
+            if errors:
+                return send_json_response(
+                    http_status=HttpStatusCode.BAD_REQUEST.value,
+                    response_status=False,
+                    message_key=errors,
+                    data=None,
+                    error=schema.error_code(data, errors).value
+                )
+
+            return f(*args, data=values, **kwargs)
+
+        return decorated
+
+    return decorator
+
+
+def compute_etag(parts: Sequence[Any]) -> str:
+    """
+    Derive a strong ETag from the values a representation depends on.
+
+    Args:
+        parts (Sequence[Any]): Values that change whenever the representation changes (ids, timestamps, ...).
+
+    Returns:
+        str: The (unquoted) entity tag.
+    """
+    return hashlib.blake2b(repr(tuple(parts)).encode('utf-8'), digest_size=16).hexdigest()
+
+
+def conditional_get(etag_for: Callable[..., Optional[Sequence[Any]]]) -> Callable:
+    """
+    Serve a GET view with a strong ETag, answering a matching `If-None-Match` with 304 Not Modified.
+
+    `etag_for` receives the view's arguments and returns the values the response depends on. It runs before
+    the view: when the client already holds the current representation the view is never called, so nothing
+    is loaded or serialized and the 304 has no body. Apply it below `token_required`, whose `current_user`
+    is then the token-cached snapshot, so the decision usually needs no database query.
+
+    Args:
+        etag_for (Callable): Returns the ETag parts for the view's arguments, or None to skip the ETag.
+
+    Returns:
+        Callable: Decorator for the view.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            parts = etag_for(*args, **kwargs)
+            if parts is None:
+                return f(*args, **kwargs)
+
+            etag = compute_etag(parts)
+            if request.if_none_match.contains_weak(etag):
+                response = current_app.response_class(status=304)
+            else:
+                response = current_app.make_response(f(*args, **kwargs))
+                if response.status_code != HttpStatusCode.OK.value:
+                    return response
+
+            response.set_etag(etag)
+            # Clients keep the representation but revalidate it on every use; shared caches must not store it
+            response.headers['Cache-Control'] = 'private, no-cache'
+            return response
+
+        return decorated
+
+    return decorator
+
+
+def rate_limited(endpoint: str, email_field: Optional[str] = 'email') -> Callable:
+    """
+    Apply the `RATE_LIMITS.ENDPOINTS.<endpoint>` limits (per client IP and per email) to a view.
+
+    Apply it below `validate_json`, so the email is taken from the validated body. Rejected requests get a
+    429 with `Retry-After` before the view runs, i.e. before any password is hashed or verified.
+
+    Args:
+        endpoint (str): The endpoint name in the config.
+        email_field (Optional[str]): Body field holding the email, normalized like `User.normalize_email`.
+
+    Returns:
+        Callable: Decorator for the view.
+    """
+    def decorator(f: Callable) -> Callable:
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            email = (kwargs.get('data') or {}).get(email_field) if email_field else None
+            retry_after = rate_limiter.check(
+                endpoint,
+                ip=request.remote_addr,
+                email=User.normalize_email(email) if isinstance(email, str) else None
+            )
+            if retry_after:
+                response, status = send_error_response(
+                    http_status=HttpStatusCode.TOO_MANY_REQUESTS,
+                    message_key=ResponseMessageKeys.TOO_MANY_REQUESTS,
+                    error=ResponseErrorCodes.RATE_LIMITED
+                )
+                response.headers['Retry-After'] = str(max(math.ceil(retry_after), 1))
+                return response, status
+
+            return f(*args, **kwargs)
+
+        return decorated
+
+    return decorator
@@ -0,0 +1,105 @@
+import threading
+from typing import Dict, Optional, Tuple
+
+from flask import current_app
+
+from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+from app.helpers.utility import build_response_envelope
+
+ResponseKey = Tuple[HttpStatusCode, ResponseMessageKeys, Optional[ResponseErrorCodes]]
+
+
+class PrerenderedResponses:
+    """
+    Registry of pre-encoded error response bodies.
+
+    Every (`HttpStatusCode`, `ResponseMessageKeys`, `ResponseErrorCodes`) combination for 4xx/5xx statuses
+    is encoded once when the app is created. Rejection paths (invalid or expired tokens, bad credentials,
+    server errors) then only wrap the cached bytes in a response object and do no JSON encoding at all.
+    """
+
+    def __init__(self):
+        self._bodies: Dict[ResponseKey, bytes] = {}
+        self._lock = threading.Lock()
+
+    def init_app(self, application) -> None:
+        """
+        Encode the error bodies with the application's JSON provider.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        bodies = {}
+        error_statuses = [status for status in HttpStatusCode if status.value >= 400]
+        error_codes = [None, *ResponseErrorCodes]
+        for message_key in ResponseMessageKeys:
+            for error in error_codes:
+                body = self._encode(application, message_key, error)
+                for status in error_statuses:
+                    bodies[(status, message_key, error)] = body
+
+        with self._lock:
+            self._bodies = bodies
+
+    def get(
+            self,
+            http_status: HttpStatusCode,
+            message_key: ResponseMessageKeys,
+            error: Optional[ResponseErrorCodes] = None
+    ) -> bytes:
+        """
+        Return the encoded body for a combination, encoding and caching it if it was not pre-rendered.
+
+        Args:
+            http_status (HttpStatusCode): The response status.
+            message_key (ResponseMessageKeys): The response message.
+            error (Optional[ResponseErrorCodes]): The error code, if any.
+
+        Returns:
+            bytes: The JSON body.
+        """
+        key = (http_status, message_key, error)
+        body = self._bodies.get(key)
+        if body is None:
+            body = self._encode(current_app, message_key, error)
+            with self._lock:
+                self._bodies[key] = body
+        return body
+
+    @staticmethod
+    def _encode(
+            application,
+            message_key: ResponseMessageKeys,
+            error: Optional[ResponseErrorCodes]
+    ) -> bytes:
+        """Encode one error envelope."""
+        envelope = build_response_envelope(
+            response_status=False,
+            message_key=message_key.value,
+            data=None,
+            error=error.value if error else None
+        )
+        return application.json.dumps_bytes(envelope)
+
+
+prerendered_responses = PrerenderedResponses()
+
+
+def send_error_response(
+        http_status: HttpStatusCode,
+        message_key: ResponseMessageKeys,
+        error: Optional[ResponseErrorCodes] = None
+) -> Tuple:
+    """
+    Send one of the constant error responses from the pre-rendered registry.
+
+    Produces the same body as `send_json_response(..., response_status=False, data=None)`.
+
+    :param http_status: HTTP response status.
+    :param message_key: Response message.
+    :param error: Optional, error code included in the response (default is None).
+    :return: Tuple containing the JSON response and HTTP status code.
+    """
+    body = prerendered_responses.get(http_status, message_key, error)
+    response = current_app.response_class(body, status=http_status.value, mimetype='application/json')
+    return response, http_status.value
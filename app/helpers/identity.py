@@ -0,0 +1,79 @@
+from typing import Any, Dict, Optional
+
+from flask import g
+
+from app.models.user import User
+
+
+class TokenIdentity:
+    """
+    Identity of the caller built purely from the verified JWT claims, without touching the database.
+    """
+
+    __slots__ = ('id', 'email', 'uuid')
+
+    def __init__(self, id: int, email: Optional[str] = None, uuid: Optional[str] = None):
+        self.id = id
+        self.email = email
+        self.uuid = uuid
+
+    @classmethod
+    def from_claims(cls, claims: Dict[str, Any]) -> 'TokenIdentity':
+        """
+        Build an identity from decoded token claims.
+
+        Args:
+            claims (Dict[str, Any]): The decoded JWT payload.
+
+        Returns:
+            TokenIdentity: The caller's identity.
+        """
+        return cls(id=claims['id'], email=claims.get('email'), uuid=claims.get('uuid'))
+
+    def __repr__(self) -> str:
+        return f'<TokenIdentity(id={self.id}, email={self.email})>'
+
+
+def set_identity(claims: Dict[str, Any], user: Optional[Any] = None) -> TokenIdentity:
+    """
+    Record the authenticated caller for the current request.
+
+    Args:
+        claims (Dict[str, Any]): The decoded JWT payload.
+        user (Optional[Any]): The already loaded user (or `UserSnapshot`), if any.
+
+    Returns:
+        TokenIdentity: The identity stored on `flask.g`.
+    """
+    identity = TokenIdentity.from_claims(claims)
+    g.jwt_claims = claims
+    g.identity = identity
+    if user is not None:
+        g.current_user = user
+    return identity
+
+
+def get_identity() -> Optional[TokenIdentity]:
+    """
+    Return the claims-based identity of the current request.
+
+    Returns:
+        Optional[TokenIdentity]: The identity, or None for unauthenticated requests.
+    """
+    return g.get('identity')
+
+
+def get_current_user() -> Optional[Any]:
+    """
+    Return the authenticated user, loading it at most once per request.
+
+    The user is a read-only `UserSnapshot` of the public columns (see `User.get_snapshot`); views that need
+    to modify the user load it with `User.get_by_id`.
+
+    Returns:
+        Optional[Any]: The current user, or None if the request is unauthenticated or the user no longer exists.
+    """
+    if 'current_user' not in g:
+        identity = get_identity()
+        g.current_user = User.get_snapshot(identity.id) if identity else None
+    return g.current_user
@@ -0,0 +1,114 @@
+import dataclasses
+import decimal
+import uuid
+from datetime import date, datetime
+from typing import Any
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # orjson is optional, the standard library encoder is used without it
+    orjson = None
+
+
+def _default(value: Any) -> Any:
+    """
+    Convert values the JSON encoders do not handle natively.
+
+    Datetimes are written as ISO 8601 (not the HTTP date format Flask uses by default), so both encoders
+    produce the same output for model payloads.
+    """
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    if isinstance(value, (uuid.UUID, decimal.Decimal)):
+        return str(value)
+    if dataclasses.is_dataclass(value) and not isinstance(value, type):
+        return dataclasses.asdict(value)
+    if hasattr(value, '__html__'):
+        return str(value.__html__())
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """
+    JSON provider that encodes with orjson when it is installed.
+
+    orjson serializes datetimes, dates and UUIDs natively and writes bytes directly, so responses skip
+    both the per-value conversion and the str -> bytes copy. Key order is preserved. Calls that pass
+    stdlib-only options (e.g. `indent`) or values orjson rejects fall back to the standard library.
+    """
+
+    default = staticmethod(_default)
+    sort_keys = False
+    ensure_ascii = False
+
+    orjson_options = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+    @property
+    def fast(self) -> bool:
+        """Whether the fast encoder is in use."""
+        return orjson is not None
+
+    def dumps(self, obj: Any, **kwargs: Any) -> str:
+        """
+        Serialize data as JSON to a string.
+
+        Args:
+            obj (Any): The data to serialize.
+            **kwargs: Options for `json.dumps`, passing any forces the standard library encoder.
+
+        Returns:
+            str: The JSON document.
+        """
+        if orjson is not None and not kwargs:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self.orjson_options).decode('utf-8')
+            except TypeError:
+                pass
+        return super().dumps(obj, **kwargs)
+
+    def dumps_bytes(self, obj: Any) -> bytes:
+        """
+        Serialize data as compact UTF-8 encoded JSON.
+
+        Args:
+            obj (Any): The data to serialize.
+
+        Returns:
+            bytes: The JSON document.
+        """
+        if orjson is not None:
+            try:
+                return orjson.dumps(obj, default=self.default, option=self.orjson_options)
+            except TypeError:
+                pass
+        return super().dumps(obj, separators=(',', ':')).encode('utf-8')
+
+    def loads(self, s: Any, **kwargs: Any) -> Any:
+        """
+        Deserialize JSON from a string or bytes.
+
+        Args:
+            s (Any): Text or UTF-8 bytes.
+            **kwargs: Options for `json.loads`, passing any forces the standard library decoder.
+
+        Returns:
+            Any: The decoded data.
+        """
+        if orjson is not None and not kwargs:
+            # orjson.JSONDecodeError subclasses json.JSONDecodeError, so callers see the usual error type
+            return orjson.loads(s)
+        return super().loads(s, **kwargs)
+
+    def response(self, *args: Any, **kwargs: Any):
+        """
+        Serialize the arguments straight to bytes and wrap them in a response.
+
+        Pretty-printing in debug mode (or with `compact = False`) is kept from the default provider.
+        """
+        if (self.compact is None and self._app.debug) or self.compact is False:
+            return super().response(*args, **kwargs)
+
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.dumps_bytes(obj), mimetype=self.mimetype)
@@ -0,0 +1,208 @@
+import atexit
+import copy
+import json
+import logging
+import queue
+import random
+import time
+import uuid
+from logging.handlers import QueueHandler, QueueListener
+from typing import Any, Dict, List, Optional
+
+from flask import g, has_request_context, request
+
+REQUEST_ID_HEADER = 'X-Request-ID'
+REQUEST_FIELDS = ('request_id', 'endpoint', 'latency_ms')
+
+
+class BoundedQueueHandler(QueueHandler):
+    """
+    `QueueHandler` for a bounded queue that drops (and counts) records instead of blocking when it is full.
+
+    The message and traceback are rendered to text on the calling thread, so the record no longer references
+    the arguments or frames, while the final formatting and all I/O happen on the listener thread.
+    """
+
+    def __init__(self, log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+class LevelSampler(logging.Filter):
+    """Keep only a fraction of the records of the configured levels (e.g. a noisy error path)."""
+
+    def __init__(self, rates: Dict[int, float]):
+        super().__init__()
+        self.rates = rates
+        self.sampled_out = 0
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        rate = self.rates.get(record.levelno)
+        if rate is None or rate >= 1 or random.random() < rate:
+            return True
+        self.sampled_out += 1
+        return False
+
+
+class RequestContextFilter(logging.Filter):
+    """Attach the request id, endpoint and elapsed time to records logged while handling a request."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if has_request_context():
+            started_at = g.get('request_started_at')
+            record.request_id = g.get('request_id')
+            record.endpoint = request.endpoint
+            record.latency_ms = round((time.perf_counter() - started_at) * 1000, 3) if started_at else None
+        return True
+
+
+class JsonLineFormatter(logging.Formatter):
+    """Format each record as one JSON object per line."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'timestamp': self.formatTime(record),
+            'level': record.levelname,
+            'logger': record.name,
+            'location': f'{record.filename}:{record.lineno}',
+            'message': record.getMessage(),
+        }
+        for field in REQUEST_FIELDS:
+            value = getattr(record, field, None)
+            if value is not None:
+                entry[field] = value
+        if record.exc_info:
+            entry['exception'] = self.formatException(record.exc_info)
+        elif record.exc_text:
+            entry['exception'] = record.exc_text
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class QueuedLogging:
+    """
+    Moves log output off the calling thread.
+
+    The logger only gets a `BoundedQueueHandler`; a `QueueListener` thread hands the records to the real
+    (file and console) handlers, so disk writes and file rotation never stall a request. When the queue is
+    full new records are dropped and counted rather than blocking. Per-level sampling runs before the
+    record is queued, so sampled-out records cost almost nothing.
+    """
+
+    def __init__(self, queue_size: int = 10000):
+        self.queue_size = queue_size
+        self.handlers: List[logging.Handler] = []
+
+        self._queue_handler: Optional[BoundedQueueHandler] = None
+        self._listener: Optional[QueueListener] = None
+        self._sampler: Optional[LevelSampler] = None
+        self._atexit_registered = False
+
+    def setup(self, target_logger: logging.Logger, handlers: List[logging.Handler], settings: Dict[str, Any]) -> None:
+        """
+        Route a logger through the queue to the given handlers and start the listener thread.
+
+        Args:
+            target_logger (logging.Logger): Logger whose records are queued.
+            handlers (List[logging.Handler]): Handlers that do the actual output.
+            settings (Dict[str, Any]): The `LOGGING` config section (`QUEUE_SIZE`, `SAMPLING`).
+        """
+        self.queue_size = max(int(settings.get('QUEUE_SIZE', self.queue_size)), 1)
+        self.handlers = list(handlers)
+
+        rates = {
+            logging.getLevelName(str(level).upper()): float(rate)
+            for level, rate in (settings.get('SAMPLING') or {}).items()
+        }
+        self._sampler = LevelSampler(rates)
+
+        self._queue_handler = BoundedQueueHandler(queue.Queue(self.queue_size))
+        self._queue_handler.addFilter(self._sampler)
+        self._queue_handler.addFilter(RequestContextFilter())
+        target_logger.addHandler(self._queue_handler)
+        self._start()
+
+        if not self._atexit_registered:
+            atexit.register(self.stop)
+            self._atexit_registered = True
+
+    def init_app(self, application) -> None:
+        """
+        Assign every request an id (taken from the `X-Request-ID` header when present) and a start time,
+        used by the request fields of log records, and echo the id in the response.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        application.before_request(self._before_request)
+        application.after_request(self._after_request)
+
+    def stop(self) -> None:
+        """Write out the queued records and stop the listener thread."""
+        if self._listener is not None:
+            self._listener.stop()
+            self._listener = None
+
+    def after_fork(self) -> None:
+        """
+        Restart the listener in a freshly forked child, on a new queue.
+
+        The listener thread does not survive the fork, and the inherited queue may have been locked by it.
+        """
+        if self._queue_handler is None:
+            return
+        self._listener = None
+        self._queue_handler.queue = queue.Queue(self.queue_size)
+        self._queue_handler.dropped = 0
+        self._sampler.sampled_out = 0
+        self._start()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the queue counters.
+
+        Returns:
+            Dict[str, Any]: Queue size and the number of dropped and sampled-out records.
+        """
+        if self._queue_handler is None:
+            return {'enabled': False}
+        return {
+            'enabled': True,
+            'queued': self._queue_handler.queue.qsize(),
+            'queue_size': self.queue_size,
+            'dropped': self._queue_handler.dropped,
+            'sampled_out': self._sampler.sampled_out,
+        }
+
+    def _start(self) -> None:
+        self._listener = QueueListener(self._queue_handler.queue, *self.handlers, respect_handler_level=True)
+        self._listener.start()
+
+    @staticmethod
+    def _before_request() -> None:
+        g.request_started_at = time.perf_counter()
+        g.request_id = (request.headers.get(REQUEST_ID_HEADER) or '')[:64] or uuid.uuid4().hex
+
+    @staticmethod
+    def _after_request(response):
+        request_id = g.get('request_id')
+        if request_id:
+            response.headers.setdefault(REQUEST_ID_HEADER, request_id)
+        return response
+
+
+queued_logging = QueuedLogging()
@@ -0,0 +1,302 @@
+import atexit
+import bisect
+import fcntl
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+from flask import g, request
+
+from app import logger
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+
+class RequestMetrics:
+    """
+    Per-endpoint request counters, latency histograms and in-flight gauges.
+
+    Recording a request costs a couple of dict updates under one lock, cheap enough to leave on in
+    production. With `MULTIPROCESS_DIR` set, every worker periodically writes its totals to
+    `<dir>/metrics_<pid>.json`; `/metrics` merges all files (and its own live values) so the exposition
+    is correct whichever worker answers the scrape. Counters of exited workers are folded into an archive
+    file so they never go backwards; their in-flight gauges are dropped.
+    """
+
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = False
+        self.buckets = tuple(buckets)
+        self.multiprocess_dir: Optional[str] = None
+        self.sync_interval = 5.0
+
+        self._requests: Dict[Tuple[str, str, str], int] = {}
+        self._latency: Dict[str, List[float]] = {}
+        self._in_flight: Dict[str, int] = {}
+        self._lock = threading.Lock()
+
+        self._sync_thread: Optional[threading.Thread] = None
+        self._sync_pid: Optional[int] = None
+        self._atexit_registered = False
+
+    def init_app(self, application) -> None:
+        """
+        Configure metrics from the `METRICS` config section and install the request hooks.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        settings = application.config.get('METRICS') or {}
+        self.enabled = bool(settings.get('ENABLED', False))
+        if not self.enabled:
+            return
+
+        self.buckets = tuple(sorted(float(bucket) for bucket in settings.get('BUCKETS') or DEFAULT_BUCKETS))
+        self.multiprocess_dir = settings.get('MULTIPROCESS_DIR')
+        self.sync_interval = float(settings.get('SYNC_INTERVAL', self.sync_interval))
+        if self.multiprocess_dir:
+            os.makedirs(self.multiprocess_dir, exist_ok=True)
+            if not self._atexit_registered:
+                atexit.register(self.write_snapshot)
+                self._atexit_registered = True
+
+        application.before_request(self._before_request)
+        application.after_request(self._after_request)
+        application.teardown_request(self._teardown_request)
+
+    def observe(self, endpoint: str, method: str, status: int, duration: float) -> None:
+        """
+        Record one finished request.
+
+        Args:
+            endpoint (str): Flask endpoint name.
+            method (str): HTTP method.
+            status (int): Response status code.
+            duration (float): Handling time in seconds.
+        """
+        bucket_index = bisect.bisect_left(self.buckets, duration)
+        key = (endpoint, method, str(status))
+        with self._lock:
+            self._requests[key] = self._requests.get(key, 0) + 1
+            histogram = self._latency.get(endpoint)
+            if histogram is None:
+                # One count per bucket plus +Inf, then the running sum
+                histogram = self._latency[endpoint] = [0] * (len(self.buckets) + 1) + [0.0]
+            histogram[bucket_index] += 1
+            histogram[-1] += duration
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return this process's totals in a JSON-serializable form.
+
+        Returns:
+            Dict[str, Any]: Request counters, histograms and in-flight gauges.
+        """
+        with self._lock:
+            return {
+                'pid': os.getpid(),
+                'buckets': list(self.buckets),
+                'requests': [[*key, count] for key, count in self._requests.items()],
+                'latency': {endpoint: list(values) for endpoint, values in self._latency.items()},
+                'in_flight': dict(self._in_flight),
+            }
+
+    def write_snapshot(self) -> None:
+        """Persist this process's totals to the multiprocess directory."""
+        if not self.multiprocess_dir:
+            return
+        path = os.path.join(self.multiprocess_dir, f'metrics_{os.getpid()}.json')
+        temp_path = f'{path}.tmp'
+        try:
+            with open(temp_path, 'w') as snapshot_file:
+                json.dump(self.snapshot(), snapshot_file)
+            os.replace(temp_path, path)
+        except OSError as e:
+            logger.error('Error while writing metrics snapshot: %s', str(e))
+
+    def render(self) -> str:
+        """
+        Render the aggregated metrics of all worker processes in Prometheus text format.
+
+        Returns:
+            str: The exposition body.
+        """
+        snapshots = self._collect()
+
+        requests: Dict[Tuple[str, str, str], int] = {}
+        latency: Dict[str, List[float]] = {}
+        in_flight: Dict[str, int] = {}
+        for snapshot in snapshots:
+            for endpoint, method, status, count in snapshot['requests']:
+                key = (endpoint, method, status)
+                requests[key] = requests.get(key, 0) + count
+            if snapshot.get('buckets') == list(self.buckets):
+                for endpoint, values in snapshot['latency'].items():
+                    merged = latency.setdefault(endpoint, [0] * len(values))
+                    for index, value in enumerate(values):
+                        merged[index] += value
+            for endpoint, value in snapshot.get('in_flight', {}).items():
+                in_flight[endpoint] = in_flight.get(endpoint, 0) + value
+
+        lines = [
+            '# HELP http_requests_total Total HTTP requests by endpoint, method and status.',
+            '# TYPE http_requests_total counter',
+        ]
+        for (endpoint, method, status), count in sorted(requests.items()):
+            lines.append(f'http_requests_total{{endpoint="{endpoint}",method="{method}",status="{status}"}} {count}')
+
+        lines += [
+            '# HELP http_request_duration_seconds Request handling latency by endpoint.',
+            '# TYPE http_request_duration_seconds histogram',
+        ]
+        for endpoint, values in sorted(latency.items()):
+            cumulative = 0
+            for bound, count in zip([*self.buckets, '+Inf'], values[:-1]):
+                cumulative += count
+                lines.append(f'http_request_duration_seconds_bucket{{endpoint="{endpoint}",le="{bound}"}} {cumulative}')
+            lines.append(f'http_request_duration_seconds_sum{{endpoint="{endpoint}"}} {values[-1]}')
+            lines.append(f'http_request_duration_seconds_count{{endpoint="{endpoint}"}} {cumulative}')
+
+        lines += [
+            '# HELP http_requests_in_flight Requests currently being handled by endpoint.',
+            '# TYPE http_requests_in_flight gauge',
+        ]
+        for endpoint, value in sorted(in_flight.items()):
+            lines.append(f'http_requests_in_flight{{endpoint="{endpoint}"}} {value}')
+
+        return '\n'.join(lines) + '\n'
+
+    def after_fork(self) -> None:
+        """
+        Reset per-process state in a freshly forked child.
+
+        Counts recorded by the parent stay with the parent, so a worker's snapshot only ever holds its own
+        requests. The sync thread is started again on the first request.
+        """
+        self._requests = {}
+        self._latency = {}
+        self._in_flight = {}
+        self._lock = threading.Lock()
+        self._sync_thread = None
+        self._sync_pid = None
+
+    def _collect(self) -> List[Dict[str, Any]]:
+        """Return the live snapshot of this process plus those of the other workers."""
+        own = self.snapshot()
+        if not self.multiprocess_dir:
+            return [own]
+
+        snapshots = [own]
+        lock_path = os.path.join(self.multiprocess_dir, '.lock')
+        with open(lock_path, 'w') as lock_file:
+            fcntl.flock(lock_file, fcntl.LOCK_EX)
+            try:
+                archive = self._read(os.path.join(self.multiprocess_dir, 'metrics_archive.json'))
+                archive_changed = False
+                for name in os.listdir(self.multiprocess_dir):
+                    if not (name.startswith('metrics_') and name.endswith('.json')) or name == 'metrics_archive.json':
+                        continue
+                    path = os.path.join(self.multiprocess_dir, name)
+                    snapshot = self._read(path)
+                    if snapshot is None or snapshot.get('pid') == own['pid']:
+                        continue
+                    if self._is_alive(snapshot['pid']):
+                        snapshots.append(snapshot)
+                    else:
+                        # Fold counters of exited workers into the archive and forget their gauges
+                        archive = self._merge_counters(archive, snapshot)
+                        archive_changed = True
+                        os.remove(path)
+
+                if archive_changed:
+                    with open(os.path.join(self.multiprocess_dir, 'metrics_archive.json'), 'w') as archive_file:
+                        json.dump(archive, archive_file)
+                if archive:
+                    snapshots.append(archive)
+            finally:
+                fcntl.flock(lock_file, fcntl.LOCK_UN)
+        return snapshots
+
+    def _merge_counters(self, archive: Optional[Dict[str, Any]], snapshot: Dict[str, Any]) -> Dict[str, Any]:
+        """Add a dead worker's counters and histograms to the archive snapshot."""
+        archive = archive or {
+            'pid': None, 'buckets': list(self.buckets), 'requests': [], 'latency': {}, 'in_flight': {}
+        }
+
+        requests = {tuple(row[:3]): row[3] for row in archive['requests']}
+        for endpoint, method, status, count in snapshot['requests']:
+            key = (endpoint, method, status)
+            requests[key] = requests.get(key, 0) + count
+        archive['requests'] = [[*key, count] for key, count in requests.items()]
+
+        if snapshot.get('buckets') == archive['buckets']:
+            for endpoint, values in snapshot['latency'].items():
+                merged = archive['latency'].setdefault(endpoint, [0] * len(values))
+                for index, value in enumerate(values):
+                    merged[index] += value
+        return archive
+
+    @staticmethod
+    def _read(path: str) -> Optional[Dict[str, Any]]:
+        """Read a snapshot file, ignoring files that vanished or are half written."""
+        try:
+            with open(path) as snapshot_file:
+                return json.load(snapshot_file)
+        except (OSError, ValueError):
+            return None
+
+    @staticmethod
+    def _is_alive(pid: int) -> bool:
+        """Check whether a worker process still exists."""
+        try:
+            os.kill(pid, 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            return True
+        return True
+
+    def _ensure_sync_thread(self) -> None:
+        """Start the snapshot writer thread, once per process (including forked workers)."""
+        pid = os.getpid()
+        if not self.multiprocess_dir or (self._sync_thread is not None and self._sync_pid == pid):
+            return
+        with self._lock:
+            if self._sync_thread is None or self._sync_pid != pid:
+                self._sync_thread = threading.Thread(target=self._sync, name='metrics-sync', daemon=True)
+                self._sync_pid = pid
+                self._sync_thread.start()
+
+    def _sync(self) -> None:
+        """Background loop writing this process's snapshot."""
+        while True:
+            time.sleep(self.sync_interval)
+            self.write_snapshot()
+
+    def _before_request(self) -> None:
+        g.metrics_started_at = time.perf_counter()
+        g.metrics_endpoint = request.endpoint or 'unmatched'
+        with self._lock:
+            self._in_flight[g.metrics_endpoint] = self._in_flight.get(g.metrics_endpoint, 0) + 1
+        self._ensure_sync_thread()
+
+    def _after_request(self, response):
+        self._finish(response.status_code)
+        return response
+
+    def _teardown_request(self, exception=None) -> None:
+        # Only reached without a recorded response when the view raised an unhandled exception
+        self._finish(500)
+
+    def _finish(self, status: int) -> None:
+        started_at = g.pop('metrics_started_at', None)
+        if started_at is None:
+            return
+        endpoint = g.metrics_endpoint
+        with self._lock:
+            self._in_flight[endpoint] -= 1
+        self.observe(endpoint, request.method, status, time.perf_counter() - started_at)
+
+
+request_metrics = RequestMetrics()
@@ -0,0 +1,317 @@
+import asyncio
+import atexit
+import math
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor, TimeoutError as FutureTimeoutError
+from typing import Any, Dict, List, Optional
+
+from werkzeug.security import DEFAULT_PBKDF2_ITERATIONS, check_password_hash, generate_password_hash
+
+from app import logger
+
+# Pool processes start from a clean interpreter rather than a fork of the (threaded) app worker, so they never
+# inherit its database connections, log handlers or locks
+DEFAULT_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+
+class HashingServiceBusy(Exception):
+    """Raised when the hashing queue is full or a hash did not complete in time."""
+
+
+def _hash_batch(passwords: List[str], method: str, salt_length: int) -> List[str]:
+    """Hash several passwords inside a single worker task."""
+    return [generate_password_hash(password, method=method, salt_length=salt_length) for password in passwords]
+
+
+def _normalize_method(method: str) -> str:
+    """
+    Expand a werkzeug hash method to the full prefix it writes into stored hashes.
+
+    Args:
+        method (str): Method as configured, e.g. `pbkdf2:sha256` or `scrypt`.
+
+    Returns:
+        str: Method with its cost parameters, e.g. `pbkdf2:sha256:600000`.
+    """
+    parts = method.split(':')
+    if parts[0] == 'pbkdf2':
+        hash_name = parts[1] if len(parts) > 1 else 'sha256'
+        iterations = parts[2] if len(parts) > 2 else str(DEFAULT_PBKDF2_ITERATIONS)
+        return f'pbkdf2:{hash_name}:{iterations}'
+    if parts[0] == 'scrypt':
+        n, r, p = (parts[1:] + ['32768', '8', '1'][len(parts) - 1:])[:3]
+        return f'scrypt:{n}:{r}:{p}'
+    return method
+
+
+class PasswordHasher:
+    """
+    Password hashing service that keeps key derivation off the request thread.
+
+    Hashes run in a bounded process pool. At most `max_pending` hashes may be queued or running at once;
+    beyond that `HashingServiceBusy` is raised immediately, so callers can shed load with a 503 instead
+    of stalling every worker thread behind the CPU-bound work. With `workers` set to 0 hashing runs
+    inline, which is convenient for development and CLI use.
+    """
+
+    def __init__(
+            self,
+            method: str = 'pbkdf2:sha256',
+            salt_length: int = 16,
+            workers: int = 0,
+            max_pending: int = 32,
+            timeout: float = 10,
+            start_method: Optional[str] = DEFAULT_START_METHOD
+    ):
+        self.method = method
+        self.salt_length = salt_length
+        self.workers = workers
+        self.max_pending = max_pending
+        self.timeout = timeout
+        self.start_method = start_method
+
+        self._executor: Optional[ProcessPoolExecutor] = None
+        self._executor_pid: Optional[int] = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_pending)
+        self._atexit_registered = False
+
+        self.rejected = 0
+        self.timed_out = 0
+
+    def init_app(self, application, overrides: Optional[Dict[str, Any]] = None) -> None:
+        """
+        Configure the service from the `PASSWORD_HASHING` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+            overrides (Optional[Dict[str, Any]]): Settings taking precedence over that section, e.g. the pool
+                size of a service dedicated to bulk jobs.
+        """
+        settings = {**(application.config.get('PASSWORD_HASHING') or {}), **(overrides or {})}
+
+        self.shutdown()
+        self.method = settings.get('METHOD', self.method)
+        self.salt_length = int(settings.get('SALT_LENGTH', self.salt_length))
+        self.workers = int(settings.get('WORKERS', self.workers))
+        self.max_pending = max(int(settings.get('MAX_PENDING', self.max_pending)), 1)
+        self.timeout = float(settings.get('TIMEOUT', self.timeout))
+        self.start_method = settings.get('START_METHOD', self.start_method)
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def hash(self, password: str) -> str:
+        """
+        Hash a password with the configured method.
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The salted hash.
+
+        Raises:
+            HashingServiceBusy: If the queue is full or the hash timed out.
+        """
+        if not self.workers:
+            return generate_password_hash(password, method=self.method, salt_length=self.salt_length)
+
+        future = self._submit(generate_password_hash, password, self.method, self.salt_length)
+        return self._result(future)
+
+    def verify(self, pwhash: str, password: str) -> bool:
+        """
+        Check a password against a stored hash.
+
+        Args:
+            pwhash (str): The stored hash.
+            password (str): The plain text password to check.
+
+        Returns:
+            bool: True if the password matches.
+
+        Raises:
+            HashingServiceBusy: If the queue is full or the check timed out.
+        """
+        if not self.workers:
+            return check_password_hash(pwhash, password)
+
+        future = self._submit(check_password_hash, pwhash, password)
+        return self._result(future)
+
+    async def hash_async(self, password: str) -> str:
+        """
+        Hash a password without blocking the event loop (see `hash`).
+
+        Args:
+            password (str): The plain text password.
+
+        Returns:
+            str: The salted hash.
+
+        Raises:
+            HashingServiceBusy: If the queue is full or the hash timed out.
+        """
+        if not self.workers:
+            return await asyncio.to_thread(generate_password_hash, password, self.method, self.salt_length)
+
+        future = self._submit(generate_password_hash, password, self.method, self.salt_length)
+        return await self._result_async(future)
+
+    async def verify_async(self, pwhash: str, password: str) -> bool:
+        """
+        Check a password against a stored hash without blocking the event loop (see `verify`).
+
+        Args:
+            pwhash (str): The stored hash.
+            password (str): The plain text password to check.
+
+        Returns:
+            bool: True if the password matches.
+
+        Raises:
+            HashingServiceBusy: If the queue is full or the check timed out.
+        """
+        if not self.workers:
+            return await asyncio.to_thread(check_password_hash, pwhash, password)
+
+        future = self._submit(check_password_hash, pwhash, password)
+        return await self._result_async(future)
+
+    def hash_many(self, passwords: List[str]) -> List[str]:
+        """
+        Hash a batch of passwords in parallel, preserving order.
+
+        The batch is split into one task per worker. Unlike `hash`, this waits for free slots instead of
+        shedding load, since it is meant for bulk jobs rather than interactive requests.
+
+        Args:
+            passwords (List[str]): The plain text passwords.
+
+        Returns:
+            List[str]: The hashes, in the same order as `passwords`.
+        """
+        if not passwords:
+            return []
+        if not self.workers:
+            return _hash_batch(passwords, self.method, self.salt_length)
+
+        chunk_size = math.ceil(len(passwords) / self.workers)
+        futures = [
+            self._submit(_hash_batch, passwords[i:i + chunk_size], self.method, self.salt_length, block=True)
+            for i in range(0, len(passwords), chunk_size)
+        ]
+
+        hashes = []
+        for future in futures:
+            hashes.extend(future.result())
+        return hashes
+
+    def needs_rehash(self, pwhash: str) -> bool:
+        """
+        Check whether a stored hash was created with outdated parameters.
+
+        Args:
+            pwhash (str): The stored hash.
+
+        Returns:
+            bool: True if the hash method, cost or salt length differs from the current configuration.
+        """
+        try:
+            method, salt, _ = pwhash.split('$', 2)
+        except ValueError:
+            return True
+        return method != _normalize_method(self.method) or len(salt) != self.salt_length
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the service settings and load-shedding counters.
+
+        Returns:
+            Dict[str, Any]: Pool size, queue limit and rejection counters.
+        """
+        return {
+            'method': _normalize_method(self.method),
+            'workers': self.workers,
+            'max_pending': self.max_pending,
+            'rejected': self.rejected,
+            'timed_out': self.timed_out,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the worker processes, if any were started."""
+        with self._executor_lock:
+            if self._executor is not None and self._executor_pid == os.getpid():
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            self._executor = None
+            self._executor_pid = None
+
+    def after_fork(self) -> None:
+        """
+        Reset per-process state in a freshly forked child.
+
+        The parent's pool processes and queue slots belong to the parent; the child starts its own pool
+        on first use. The locks are recreated in case another thread held them at fork time.
+        """
+        self._executor = None
+        self._executor_pid = None
+        self._executor_lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_pending)
+
+    def _get_executor(self) -> ProcessPoolExecutor:
+        """Return the process pool, starting it lazily (and again after a fork)."""
+        pid = os.getpid()
+        if self._executor is not None and self._executor_pid == pid:
+            return self._executor
+
+        with self._executor_lock:
+            if self._executor is None or self._executor_pid != pid:
+                context = multiprocessing.get_context(self.start_method) if self.start_method else None
+                self._executor = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+                self._executor_pid = pid
+            return self._executor
+
+    def _submit(self, fn, *args, block: bool = False) -> Future:
+        """Submit a task to the pool, holding one queue slot until it completes."""
+        acquired = self._slots.acquire(timeout=self.timeout) if block else self._slots.acquire(blocking=False)
+        if not acquired:
+            self.rejected += 1
+            raise HashingServiceBusy('Password hashing queue is full.')
+
+        try:
+            future = self._get_executor().submit(fn, *args)
+        except Exception:
+            self._slots.release()
+            raise
+
+        future.add_done_callback(lambda _: self._slots.release())
+        return future
+
+    def _result(self, future: Future) -> Any:
+        """Wait for a task, converting a timeout into `HashingServiceBusy`."""
+        try:
+            return future.result(timeout=self.timeout)
+        except FutureTimeoutError:
+            self.timed_out += 1
+            logger.error('Password hashing did not complete within %s seconds.', self.timeout)
+            raise HashingServiceBusy('Password hashing timed out.')
+
+    async def _result_async(self, future: Future) -> Any:
+        """Await a task, converting a timeout into `HashingServiceBusy`."""
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except asyncio.TimeoutError:
+            self.timed_out += 1
+            logger.error('Password hashing did not complete within %s seconds.', self.timeout)
+            raise HashingServiceBusy('Password hashing timed out.')
+
+
+password_hasher = PasswordHasher()
+
+# Separate pool for bulk imports, so an import never takes the hashing slots of sign-in and sign-up
+import_password_hasher = PasswordHasher()
@@ -0,0 +1,185 @@
+import threading
+import time
+import weakref
+from collections import deque
+from typing import Any, Deque, Dict, Optional
+
+from sqlalchemy import exc as sa_exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+
+class PoolStats:
+    """Checkout counters of one connection pool."""
+
+    def __init__(self, name: str, sample_size: int = 1024):
+        self.name = name
+        self.checkouts = 0
+        self.timeouts = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._waits: Deque[float] = deque(maxlen=sample_size)
+        self._pool_ref: Optional[weakref.ReferenceType] = None
+        self._lock = threading.Lock()
+
+    def attach(self, pool: QueuePool) -> None:
+        """Track the live pool (a new one is created every time the engine is disposed)."""
+        self._pool_ref = weakref.ref(pool)
+
+    def record_checkout(self, wait: float, timed_out: bool = False) -> None:
+        """
+        Record one checkout attempt.
+
+        Args:
+            wait (float): Seconds spent waiting for (or opening) the connection.
+            timed_out (bool): Whether the attempt gave up after `pool_timeout`.
+        """
+        with self._lock:
+            if timed_out:
+                self.timeouts += 1
+            else:
+                self.checkouts += 1
+            self.wait_total += wait
+            self.wait_max = max(self.wait_max, wait)
+            self._waits.append(wait)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Return the counters together with the pool's current occupancy.
+
+        Returns:
+            Dict[str, Any]: Checkout latency (ms) and in-use/idle/overflow counts.
+        """
+        with self._lock:
+            waits = sorted(self._waits)
+            attempts = self.checkouts + self.timeouts
+            stats = {
+                'checkouts': self.checkouts,
+                'timeouts': self.timeouts,
+                'checkout_wait_ms': {
+                    'avg': round(self.wait_total / attempts * 1000, 3) if attempts else 0.0,
+                    'p50': self._percentile(waits, 0.50),
+                    'p95': self._percentile(waits, 0.95),
+                    'p99': self._percentile(waits, 0.99),
+                    'max': round(self.wait_max * 1000, 3),
+                },
+            }
+
+        pool = self._pool_ref() if self._pool_ref else None
+        if pool is not None:
+            stats.update({
+                'size': pool.size(),
+                'in_use': pool.checkedout(),
+                'idle': pool.checkedin(),
+                'overflow': max(pool.overflow(), 0),
+                'max_overflow': pool._max_overflow,
+                'timeout': pool.timeout(),
+            })
+        return stats
+
+    @staticmethod
+    def _percentile(values: list, percentile: float) -> float:
+        """Return a percentile of sorted samples, in milliseconds."""
+        if not values:
+            return 0.0
+        index = min(int(len(values) * percentile), len(values) - 1)
+        return round(values[index] * 1000, 3)
+
+
+class PoolInstrumentation:
+    """Registry of `PoolStats`, keyed by the pool's `pool_logging_name`."""
+
+    def __init__(self):
+        self._stats: Dict[str, PoolStats] = {}
+        self._lock = threading.Lock()
+
+    def stats_for(self, name: str) -> PoolStats:
+        """Return (creating if needed) the stats of a named pool."""
+        stats = self._stats.get(name)
+        if stats is None:
+            with self._lock:
+                stats = self._stats.setdefault(name, PoolStats(name))
+        return stats
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        Return the stats of every instrumented pool.
+
+        Returns:
+            Dict[str, Dict[str, Any]]: Pool name to its stats.
+        """
+        return {name: stats.snapshot() for name, stats in list(self._stats.items())}
+
+
+pool_instrumentation = PoolInstrumentation()
+
+
+class InstrumentedQueuePool(QueuePool):
+    """
+    `QueuePool` that records how long each checkout waits and how many checkouts time out.
+
+    Selected through `SQLALCHEMY_ENGINE_OPTIONS['poolclass']`; the engine's `pool_logging_name` names the
+    pool in the stats.
+    """
+
+    # Keep pool log records under the `sqlalchemy` logger rather than this module's (DEBUG-level) app logger
+    _sqla_logger_namespace = 'sqlalchemy.pool.impl.QueuePool'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats = pool_instrumentation.stats_for(self._orig_logging_name or 'default')
+        self._stats.attach(self)
+
+    def _do_get(self):
+        started_at = time.perf_counter()
+        try:
+            record = super()._do_get()
+        except sa_exc.TimeoutError:
+            self._stats.record_checkout(time.perf_counter() - started_at, timed_out=True)
+            raise
+        self._stats.record_checkout(time.perf_counter() - started_at)
+        return record
+
+
+class InstrumentedAsyncQueuePool(InstrumentedQueuePool, AsyncAdaptedQueuePool):
+    """`InstrumentedQueuePool` for async engines (see `app.helpers.async_db`)."""
+
+
+def build_engine_options(
+        config: Dict[str, Any],
+        pool_name: str = 'primary',
+        asynchronous: bool = False
+) -> Dict[str, Any]:
+    """
+    Merge the `DATABASE_POOL` settings into the SQLAlchemy engine options.
+
+    Explicit keys in `SQLALCHEMY_ENGINE_OPTIONS` win over the `DATABASE_POOL` section. In-memory SQLite
+    keeps Flask-SQLAlchemy's single-connection pool.
+
+    Args:
+        config (Dict[str, Any]): The application config.
+        pool_name (str): Name the pool is reported under.
+        asynchronous (bool): Build the options of an async engine, whose pool must be asyncio-aware.
+
+    Returns:
+        Dict[str, Any]: Engine options for `create_engine`.
+    """
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    uri = config.get('SQLALCHEMY_DATABASE_URI') or ''
+    if uri.startswith('sqlite') and (':memory:' in uri or uri.rstrip('/') in ('sqlite:', 'sqlite')):
+        return options
+
+    pool = config.get('DATABASE_POOL') or {}
+    settings = {
+        'poolclass': InstrumentedAsyncQueuePool if asynchronous else InstrumentedQueuePool,
+        'pool_logging_name': pool_name,
+        'pool_size': pool.get('SIZE'),
+        'max_overflow': pool.get('MAX_OVERFLOW'),
+        'pool_timeout': pool.get('TIMEOUT'),
+        'pool_recycle': pool.get('RECYCLE'),
+        'pool_pre_ping': pool.get('PRE_PING'),
+        'pool_use_lifo': pool.get('USE_LIFO'),
+    }
+    for key, value in settings.items():
+        if value is not None:
+            options.setdefault(key, value)
+    return options
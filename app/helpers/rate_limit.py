@@ -0,0 +1,240 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, List, Optional, Tuple
+
+from app import logger
+
+try:
+    import redis
+except ImportError:  # redis is optional, only needed for the shared backend
+    redis = None
+
+
+class LocalBackend:
+    """
+    In-process token buckets, sharded to keep lock contention low.
+
+    Keys are spread over `shards` independent dicts, each with its own lock, so concurrent requests for
+    different clients rarely wait on each other. Each shard keeps at most `max_keys_per_shard` buckets and
+    evicts the least recently used; an evicted bucket simply starts full again. Buckets are per process, so
+    with several workers each one enforces the limits on its own share of the traffic.
+
+    Has the same interface as `RedisBackend`, so it also stands in for the shared backend when none is running.
+    """
+
+    def __init__(self, shards: int = 16, max_keys_per_shard: int = 10000):
+        self.max_keys_per_shard = max_keys_per_shard
+        self._shards: List[Tuple[threading.Lock, 'OrderedDict[str, Tuple[float, float]]']] = [
+            (threading.Lock(), OrderedDict()) for _ in range(max(shards, 1))
+        ]
+
+    def hit(self, key: str, limit: int, period: float, cost: float = 1) -> float:
+        """
+        Take `cost` tokens from a bucket holding up to `limit` tokens and refilled by `limit` every `period`.
+
+        Args:
+            key (str): The bucket key.
+            limit (int): Bucket capacity (the allowed burst).
+            period (float): Seconds to refill an empty bucket.
+            cost (float): Tokens this request takes.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds until it would be.
+        """
+        rate = limit / period
+        lock, buckets = self._shards[hash(key) % len(self._shards)]
+        with lock:
+            now = time.monotonic()
+            tokens, updated_at = buckets.get(key, (limit, now))
+            tokens = min(limit, tokens + (now - updated_at) * rate)
+            if tokens >= cost:
+                tokens -= cost
+                retry_after = 0.0
+            else:
+                retry_after = (cost - tokens) / rate
+
+            buckets[key] = (tokens, now)
+            buckets.move_to_end(key)
+            if len(buckets) > self.max_keys_per_shard:
+                buckets.popitem(last=False)
+        return retry_after
+
+    def size(self) -> int:
+        """Return the number of buckets held."""
+        return sum(len(buckets) for _, buckets in self._shards)
+
+    def after_fork(self) -> None:
+        """Start with empty buckets and fresh locks in a freshly forked child."""
+        self._shards = [(threading.Lock(), OrderedDict()) for _ in self._shards]
+
+
+class RedisBackend:
+    """
+    Token buckets shared by every worker and host through Redis.
+
+    A bucket is one hash updated by a Lua script, so the refill-and-take step is atomic and costs a single
+    round trip. The Redis server clock is used, so hosts with skewed clocks agree.
+    """
+
+    SCRIPT = '''
+        local limit = tonumber(ARGV[1])
+        local period = tonumber(ARGV[2])
+        local cost = tonumber(ARGV[3])
+        local clock = redis.call('TIME')
+        local now = tonumber(clock[1]) + tonumber(clock[2]) / 1000000
+        local state = redis.call('HMGET', KEYS[1], 'tokens', 'updated_at')
+        local tokens = tonumber(state[1]) or limit
+        local updated_at = tonumber(state[2]) or now
+        local rate = limit / period
+        tokens = math.min(limit, tokens + math.max(0, now - updated_at) * rate)
+        local retry_after = 0
+        if tokens >= cost then
+            tokens = tokens - cost
+        else
+            retry_after = (cost - tokens) / rate
+        end
+        redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'updated_at', tostring(now))
+        redis.call('PEXPIRE', KEYS[1], math.ceil(period * 1000))
+        return tostring(retry_after)
+    '''
+
+    def __init__(self, url: str, key_prefix: str = 'rate-limit:'):
+        self.key_prefix = key_prefix
+        self._client = redis.Redis.from_url(url, socket_timeout=0.1, socket_connect_timeout=0.1)
+        self._script = self._client.register_script(self.SCRIPT)
+
+    def hit(self, key: str, limit: int, period: float, cost: float = 1) -> float:
+        """See `LocalBackend.hit`."""
+        return float(self._script(keys=[self.key_prefix + key], args=[limit, period, cost]))
+
+    def size(self) -> Optional[int]:
+        """Bucket counts are not tracked for the shared backend."""
+        return None
+
+    def after_fork(self) -> None:
+        """The client's connection pool detects the fork and reconnects by itself."""
+
+
+class RateLimiter:
+    """
+    Per-endpoint token bucket limits, checked before any expensive work (e.g. password hashing).
+
+    Limits come from `RATE_LIMITS.ENDPOINTS.<endpoint>`, with a `PER_IP` and/or `PER_EMAIL` bucket of
+    `LIMIT` requests per `PERIOD` seconds each. Emails are hashed before being used as keys. When the shared
+    backend fails, the request is checked against the local buckets instead, so an outage neither blocks
+    sign-ins nor lifts the limits.
+    """
+
+    def __init__(self):
+        self.enabled = False
+        self.endpoints: Dict[str, Dict[str, Dict[str, float]]] = {}
+        self.local = LocalBackend()
+        self.backend: Any = self.local
+
+        self.allowed = 0
+        self.rejected = 0
+        self.backend_errors = 0
+
+    def init_app(self, application) -> None:
+        """
+        Configure the limiter from the `RATE_LIMITS` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        settings = application.config.get('RATE_LIMITS') or {}
+        self.enabled = bool(settings.get('ENABLED', False))
+        self.endpoints = {
+            endpoint: {scope: dict(limit) for scope, limit in (limits or {}).items()}
+            for endpoint, limits in (settings.get('ENDPOINTS') or {}).items()
+        }
+        self.local = LocalBackend(
+            shards=int(settings.get('SHARDS', 16)),
+            max_keys_per_shard=int(settings.get('MAX_KEYS_PER_SHARD', 10000))
+        )
+        self.backend = self.local
+
+        if settings.get('BACKEND', 'local') == 'redis':
+            if redis is None:
+                logger.error('RATE_LIMITS.BACKEND is redis but the redis package is not installed, '
+                             'using local limits')
+            else:
+                self.backend = RedisBackend(settings.get('REDIS_URL', 'redis://localhost:6379/0'))
+
+    @property
+    def shared(self) -> bool:
+        """Whether checks go to the shared backend, i.e. make network round trips."""
+        return self.backend is not self.local
+
+    def check(self, endpoint: str, ip: Optional[str] = None, email: Optional[str] = None) -> float:
+        """
+        Take one token from each bucket that applies to the request.
+
+        Args:
+            endpoint (str): The endpoint name, as configured under `RATE_LIMITS.ENDPOINTS`.
+            ip (Optional[str]): The client address.
+            email (Optional[str]): The normalized email the request is about.
+
+        Returns:
+            float: 0 if the request is allowed, otherwise the seconds until it would be.
+        """
+        limits = self.endpoints.get(endpoint) if self.enabled else None
+        if not limits:
+            return 0.0
+
+        keys = []
+        if ip and 'PER_IP' in limits:
+            keys.append((f'{endpoint}:ip:{ip}', limits['PER_IP']))
+        if email and 'PER_EMAIL' in limits:
+            digest = hashlib.blake2b(email.encode('utf-8'), digest_size=16).hexdigest()
+            keys.append((f'{endpoint}:email:{digest}', limits['PER_EMAIL']))
+
+        retry_after = 0.0
+        for key, limit in keys:
+            retry_after = max(retry_after, self._hit(key, int(limit['LIMIT']), float(limit['PERIOD'])))
+            if retry_after:
+                # Leave the remaining buckets alone, so a blocked IP does not also drain the email's bucket
+                break
+
+        if retry_after:
+            self.rejected += 1
+        else:
+            self.allowed += 1
+        return retry_after
+
+    def after_fork(self) -> None:
+        """Reset the local buckets in a freshly forked child."""
+        self.local.after_fork()
+        self.backend.after_fork()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the limiter counters.
+
+        Returns:
+            Dict[str, Any]: Backend, bucket count and allowed/rejected requests.
+        """
+        return {
+            'enabled': self.enabled,
+            'backend': 'redis' if isinstance(self.backend, RedisBackend) else 'local',
+            'buckets': self.backend.size(),
+            'allowed': self.allowed,
+            'rejected': self.rejected,
+            'backend_errors': self.backend_errors,
+        }
+
+    def _hit(self, key: str, limit: int, period: float) -> float:
+        """Take a token from the configured backend, falling back to the local buckets if it fails."""
+        if self.backend is self.local:
+            return self.local.hit(key, limit, period)
+        try:
+            return self.backend.hit(key, limit, period)
+        except Exception as e:
+            self.backend_errors += 1
+            logger.error('Rate limit backend failed, using local limits: %s', str(e))
+            return self.local.hit(key, limit, period)
+
+
+rate_limiter = RateLimiter()
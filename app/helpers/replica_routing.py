@@ -0,0 +1,325 @@
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Callable, Dict, Iterator, List, Optional
+
+from flask import g, has_request_context, request
+from flask_sqlalchemy.session import Session
+from sqlalchemy import text
+
+from app import logger
+
+# True while a model read method runs on a replica and False while it is retried on the primary (see
+# `ReplicaRouter.read`). Read-only views set `g._db_read_only` instead, which also covers responses streamed after
+# the view returned.
+_read_scope: ContextVar[Optional[bool]] = ContextVar('db_read_scope', default=None)
+
+
+class ReplicaState:
+    """Health of one replica bind."""
+
+    __slots__ = ('bind_key', 'healthy', 'next_check_at', 'failures', 'reads', 'last_error', 'lock')
+
+    def __init__(self, bind_key: str):
+        self.bind_key = bind_key
+        self.healthy = True
+        self.next_check_at = 0.0
+        self.failures = 0
+        self.reads = 0
+        self.last_error: Optional[str] = None
+        self.lock = threading.Lock()
+
+
+class ReplicaRouter:
+    """
+    Routes reads to read replicas, and everything else to the primary.
+
+    Replicas are the binds listed under `DATABASE_REPLICAS.URIS`. A SELECT goes to a replica only when all of
+    these hold:
+
+    - it runs in a read scope: a view decorated with `read_only`, or a model read method (`Base.get_by_id`,
+      `Base.project`, `User.get_by_email`) running inside `reads()`;
+    - the session has not written yet (a flush or an INSERT/UPDATE/DELETE pins it to the primary), and the
+      client is not inside the read-your-writes window of an earlier request, signalled by a cookie;
+    - a replica is healthy. Replicas are checked with `SELECT 1` every `HEALTH_CHECK_INTERVAL` seconds, and
+      one that fails a query is skipped until its next successful check. With none healthy, reads fall back
+      to the primary.
+    """
+
+    def __init__(self, read_your_writes_window: int = 5, health_check_interval: int = 10,
+                 cookie_name: str = 'db_primary_until'):
+        self.read_your_writes_window = read_your_writes_window
+        self.health_check_interval = health_check_interval
+        self.cookie_name = cookie_name
+
+        self._replicas: List[ReplicaState] = []
+        self._cursor = 0
+        self._lock = threading.Lock()
+
+        self.primary_reads = 0
+        self.fallbacks = 0
+
+    @property
+    def enabled(self) -> bool:
+        return bool(self._replicas)
+
+    def init_app(self, application) -> None:
+        """
+        Configure the router from the `DATABASE_REPLICAS` section of the application config.
+
+        The replica engines themselves are created by Flask-SQLAlchemy from `SQLALCHEMY_BINDS`
+        (see `build_replica_binds`).
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        settings = application.config.get('DATABASE_REPLICAS') or {}
+        self.read_your_writes_window = int(settings.get('READ_YOUR_WRITES_WINDOW', self.read_your_writes_window))
+        self.health_check_interval = int(settings.get('HEALTH_CHECK_INTERVAL', self.health_check_interval))
+        self.cookie_name = settings.get('READ_YOUR_WRITES_COOKIE', self.cookie_name)
+        self._replicas = [ReplicaState(bind_key) for bind_key in (settings.get('URIS') or {})]
+
+        if self._replicas:
+            application.after_request(self._set_read_your_writes_cookie)
+
+    @contextmanager
+    def reads(self, replica: bool = True) -> Iterator[None]:
+        """
+        Let the SELECTs run in this block go to a replica, or with `replica=False` keep them on the primary.
+
+        Args:
+            replica (bool): Whether a replica may serve the reads.
+        """
+        token = _read_scope.set(replica)
+        try:
+            yield
+        finally:
+            _read_scope.reset(token)
+
+    def read_only_request(self) -> None:
+        """Let every SELECT of the current request go to a replica (used by the `read_only` decorator)."""
+        g._db_read_only = True
+
+    def read(self, query: Callable[[], Any]) -> Any:
+        """
+        Run a model read on a replica, falling back to the primary.
+
+        The primary is asked again when the replica fails or finds nothing, so a row created moments ago that
+        has not replicated yet (e.g. sign-in right after sign-up) is still found.
+
+        Args:
+            query (Callable[[], Any]): Runs the read and returns its result.
+
+        Returns:
+            Any: The result of the read.
+        """
+        if not self.enabled or _read_scope.get() is not None:
+            return query()
+
+        from app import db
+
+        db.session.info.pop('replica', None)
+        try:
+            with self.reads():
+                result = query()
+        except Exception as e:
+            replica = db.session.info.pop('replica', None)
+            if replica is None:
+                raise
+            self.mark_down(replica, e)
+            db.session.rollback()
+            result = None
+        else:
+            replica = db.session.info.pop('replica', None)
+
+        if result is None and replica is not None:
+            self.fallbacks += 1
+            with self.reads(replica=False):
+                result = query()
+        return result
+
+    def bind_for_read(self, session: 'RoutingSession') -> Optional[Any]:
+        """
+        Pick a replica engine for a SELECT of `session`.
+
+        Args:
+            session (RoutingSession): The session executing the SELECT.
+
+        Returns:
+            Optional[Engine]: A healthy replica engine, or None to use the primary.
+        """
+        if not self._replicas or not self._in_read_scope() or session.info.get('wrote'):
+            return None
+        if self._in_read_your_writes_window():
+            self.primary_reads += 1
+            return None
+
+        engines = session._db.engines
+        candidates = [replica for replica in self._replicas if self._is_healthy(replica, engines)]
+        if not candidates:
+            self.primary_reads += 1
+            return None
+
+        with self._lock:
+            self._cursor = (self._cursor + 1) % len(candidates)
+            replica = candidates[self._cursor]
+        replica.reads += 1
+        session.info['replica'] = replica.bind_key
+        return engines[replica.bind_key]
+
+    def note_write(self, session: 'RoutingSession') -> None:
+        """
+        Pin `session` to the primary after it wrote, and start the client's read-your-writes window.
+
+        Args:
+            session (RoutingSession): The session that is writing.
+        """
+        session.info['wrote'] = True
+        if has_request_context():
+            g._db_wrote = True
+
+    def mark_down(self, bind_key: str, error: Exception) -> None:
+        """
+        Skip a replica until its next successful health check.
+
+        Args:
+            bind_key (str): The replica bind.
+            error (Exception): The error the replica raised.
+        """
+        for replica in self._replicas:
+            if replica.bind_key == bind_key:
+                replica.healthy = False
+                replica.failures += 1
+                replica.last_error = str(error)
+                replica.next_check_at = time.monotonic() + self.health_check_interval
+                logger.error('Read replica %s failed, reading from the primary: %s', bind_key, str(error))
+
+    def after_fork(self) -> None:
+        """Recreate the locks and forget the parent's health checks in a freshly forked child."""
+        self._lock = threading.Lock()
+        self._replicas = [ReplicaState(replica.bind_key) for replica in self._replicas]
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the routing counters.
+
+        Returns:
+            Dict[str, Any]: Per-replica health and read counts, and reads kept on the primary.
+        """
+        return {
+            'replicas': {
+                replica.bind_key: {
+                    'healthy': replica.healthy,
+                    'reads': replica.reads,
+                    'failures': replica.failures,
+                    'last_error': replica.last_error,
+                }
+                for replica in self._replicas
+            },
+            'primary_reads': self.primary_reads,
+            'fallbacks': self.fallbacks,
+        }
+
+    def _in_read_scope(self) -> bool:
+        scope = _read_scope.get()
+        if scope is not None:
+            return scope
+        return has_request_context() and g.get('_db_read_only', False)
+
+    def _in_read_your_writes_window(self) -> bool:
+        if not has_request_context():
+            return False
+        if g.get('_db_wrote'):
+            return True
+        try:
+            return float(request.cookies.get(self.cookie_name, 0)) > time.time()
+        except ValueError:
+            return False
+
+    def _is_healthy(self, replica: ReplicaState, engines: Dict[Any, Any]) -> bool:
+        """Return the replica's health, checking it again once `health_check_interval` has passed."""
+        now = time.monotonic()
+        if now < replica.next_check_at or not replica.lock.acquire(blocking=False):
+            return replica.healthy
+
+        # Only one thread checks; the others keep using the current state meanwhile
+        try:
+            with engines[replica.bind_key].connect() as connection:
+                connection.execute(text('SELECT 1'))
+            if not replica.healthy:
+                logger.info('Read replica %s is healthy again', replica.bind_key)
+            replica.healthy = True
+        except Exception as e:
+            if replica.healthy:
+                logger.error('Read replica %s failed its health check: %s', replica.bind_key, str(e))
+            replica.healthy = False
+            replica.failures += 1
+            replica.last_error = str(e)
+        finally:
+            replica.next_check_at = time.monotonic() + self.health_check_interval
+            replica.lock.release()
+        return replica.healthy
+
+    def _set_read_your_writes_cookie(self, response):
+        """Keep the client on the primary for `read_your_writes_window` seconds after a request that wrote."""
+        if g.get('_db_wrote') and self.read_your_writes_window > 0:
+            response.set_cookie(
+                self.cookie_name,
+                str(int(time.time() + self.read_your_writes_window)),
+                max_age=self.read_your_writes_window,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
+
+
+replica_router = ReplicaRouter()
+
+
+class RoutingSession(Session):
+    """Flask-SQLAlchemy session that sends eligible SELECTs to a read replica (see `ReplicaRouter`)."""
+
+    def get_bind(self, mapper=None, clause=None, bind=None, **kwargs):
+        engine = super().get_bind(mapper=mapper, clause=clause, bind=bind, **kwargs)
+        if bind is not None or not replica_router.enabled or engine is not self._db.engines.get(None):
+            return engine
+
+        if self._flushing or getattr(clause, 'is_dml', False):
+            replica_router.note_write(self)
+        elif getattr(clause, 'is_select', False):
+            return replica_router.bind_for_read(self) or engine
+        return engine
+
+
+def build_replica_binds(config: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Add the `DATABASE_REPLICAS.URIS` to `SQLALCHEMY_BINDS`, each with its own instrumented pool.
+
+    Each replica pool is reported under its bind key, so `config` must hold `SQLALCHEMY_ENGINE_OPTIONS` as
+    configured, not the primary engine's options built by `build_engine_options`.
+
+    Args:
+        config (Dict[str, Any]): The application config.
+
+    Returns:
+        Dict[str, Any]: The binds for Flask-SQLAlchemy.
+
+    Raises:
+        ValueError: If a replica bind key is already the name of another pool.
+    """
+    from app.helpers.pool_instrumentation import build_engine_options
+
+    binds = dict(config.get('SQLALCHEMY_BINDS') or {})
+    pool_names = {'primary', 'async'}
+    for bind_key, uri in ((config.get('DATABASE_REPLICAS') or {}).get('URIS') or {}).items():
+        if bind_key in pool_names:
+            raise ValueError(f'Replica bind key {bind_key!r} is already used as a pool name.')
+        pool_names.add(bind_key)
+
+        options = build_engine_options({**config, 'SQLALCHEMY_DATABASE_URI': uri}, pool_name=bind_key)
+        # The primary's `creator` would connect the replica's pool to the primary
+        options.pop('creator', None)
+        options['pool_logging_name'] = bind_key
+        binds[bind_key] = {'url': uri, **options}
+    return binds
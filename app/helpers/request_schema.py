@@ -0,0 +1,200 @@
+import re
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from app.helpers.constants import ResponseErrorCodes, ResponseMessageKeys, ValidationMessages
+
+# Deliberately loose: one @, no whitespace and a dot in the domain; deliverability is not checked here
+EMAIL_PATTERN = re.compile(r'^[^@\s]+@[^@\s]+\.[^@\s]+$')
+
+TYPE_NAMES = {
+    str: 'a string',
+    int: 'an integer',
+    float: 'a number',
+    bool: 'true or false',
+    dict: 'an object',
+    list: 'a list',
+}
+
+
+class Field:
+    """Declaration of one field of a JSON request body."""
+
+    __slots__ = ('type', 'required', 'min_length', 'max_length', 'format', 'strip')
+
+    def __init__(
+            self,
+            type: type = str,
+            required: bool = True,
+            min_length: Optional[int] = None,
+            max_length: Optional[int] = None,
+            format: Optional[str] = None,
+            strip: bool = False
+    ):
+        """
+        Args:
+            type (type): Expected JSON type (`str`, `int`, `float`, `bool`, `dict` or `list`).
+            required (bool): Whether the field must be present and not empty.
+            min_length (Optional[int]): Minimum length of a string or list.
+            max_length (Optional[int]): Maximum length of a string or list.
+            format (Optional[str]): Named format of a string, currently only `email`.
+            strip (bool): Strip surrounding whitespace from a string before it is checked and passed on.
+        """
+        if format not in (None, 'email'):
+            raise ValueError(f'Unknown field format: {format}')
+        self.type = type
+        self.required = required
+        self.min_length = min_length
+        self.max_length = max_length
+        self.format = format
+        self.strip = strip
+
+
+class RequestSchema:
+    """
+    Schema of a JSON request body, compiled once into a validator.
+
+    Every field is turned into a single check function when the schema is created (at import time, when the
+    view is decorated), with its error messages already rendered, so validating a request is one pass over
+    the declared fields. Fields that are not declared are dropped. Used with the `validate_json` decorator,
+    which also enforces `max_content_length` before the body is read.
+
+    Routes whose error contract predates the schema set `fixed_error`: any field error is then answered with
+    that single message key and error code instead of the per-field messages.
+    """
+
+    __slots__ = ('fields', 'max_content_length', 'fixed_error', '_checks', '_stripped')
+
+    def __init__(
+            self,
+            fields: Dict[str, Field],
+            max_content_length: Optional[int] = None,
+            fixed_error: Optional[Tuple[ResponseMessageKeys, ResponseErrorCodes]] = None
+    ):
+        """
+        Args:
+            fields (Dict[str, Field]): Field name to declaration.
+            max_content_length (Optional[int]): Largest accepted body in bytes; None uses the configured default.
+            fixed_error (Optional[Tuple[ResponseMessageKeys, ResponseErrorCodes]]): Message key and error
+                code answered for any field error, instead of the per-field errors.
+        """
+        self.fields = dict(fields)
+        self.max_content_length = max_content_length
+        self.fixed_error = fixed_error
+        self._stripped = frozenset(name for name, field in self.fields.items() if field.strip)
+        self._checks: Tuple[Tuple[str, Callable[[Any], Optional[str]]], ...] = tuple(
+            (name, self._compile(name, field)) for name, field in self.fields.items()
+        )
+
+    def validate(self, data: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Validate a decoded JSON object.
+
+        Args:
+            data (Dict[str, Any]): The request body.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: The declared fields that are present, and every field error
+            keyed by field name (the `validate_required_fields` shape).
+        """
+        values = {}
+        errors = {}
+        for name, check in self._checks:
+            value = self._get(data, name)
+            error = check(value)
+            if error is not None:
+                errors[name] = error
+            elif value is not None:
+                values[name] = value
+        return values, errors
+
+    def missing(self, data: Dict[str, Any], errors: Dict[str, str]) -> List[str]:
+        """
+        Return the fields among `errors` that failed only because they are absent or empty.
+
+        Args:
+            data (Dict[str, Any]): The request body.
+            errors (Dict[str, str]): Errors returned by `validate`.
+
+        Returns:
+            List[str]: The missing field names.
+        """
+        return [name for name in errors if self._get(data, name) in (None, '')]
+
+    def error_code(self, data: Dict[str, Any], errors: Dict[str, str]) -> ResponseErrorCodes:
+        """
+        Return the error code of a failed validation.
+
+        Args:
+            data (Dict[str, Any]): The request body.
+            errors (Dict[str, str]): Errors returned by `validate`.
+
+        Returns:
+            ResponseErrorCodes: `INSUFFICIENT_DATA` when fields are only missing (the code
+            `validate_required_fields` callers returned), otherwise `INVALID_DATA`.
+        """
+        if len(self.missing(data, errors)) == len(errors):
+            return ResponseErrorCodes.INSUFFICIENT_DATA
+        return ResponseErrorCodes.INVALID_DATA
+
+    def content_limit(self, config: Dict[str, Any]) -> int:
+        """
+        Return the largest accepted body in bytes.
+
+        Args:
+            config (Dict[str, Any]): The application config, for `REQUEST_SCHEMAS.DEFAULT_MAX_CONTENT_LENGTH`.
+
+        Returns:
+            int: The limit.
+        """
+        return self.max_content_length or int(
+            (config.get('REQUEST_SCHEMAS') or {}).get('DEFAULT_MAX_CONTENT_LENGTH', 16384)
+        )
+
+    def _get(self, data: Dict[str, Any], name: str) -> Any:
+        """Return the value of a field, stripped when the field is declared with `strip`."""
+        value = data.get(name)
+        if name in self._stripped and isinstance(value, str):
+            return value.strip()
+        return value
+
+    @staticmethod
+    def _compile(name: str, field: Field) -> Callable[[Any], Optional[str]]:
+        """Build the check of one field: it returns an error message, or None when the value is valid."""
+        required_message = ValidationMessages.get_message(name)
+        type_message = ValidationMessages.get_rule_message(
+            name, 'type', type=TYPE_NAMES.get(field.type, field.type.__name__)
+        )
+        expected_type = field.type
+        # bool is a subclass of int, but `true` is not a valid integer
+        rejected_type = bool if expected_type in (int, float) else None
+        if expected_type is float:
+            expected_type = (int, float)
+
+        rules: List[Tuple[Callable[[Any], bool], str]] = []
+        if field.min_length is not None:
+            rules.append((
+                lambda value, limit=field.min_length: len(value) >= limit,
+                ValidationMessages.get_rule_message(name, 'min_length', min_length=field.min_length)
+            ))
+        if field.max_length is not None:
+            rules.append((
+                lambda value, limit=field.max_length: len(value) <= limit,
+                ValidationMessages.get_rule_message(name, 'max_length', max_length=field.max_length)
+            ))
+        if field.format == 'email':
+            rules.append((
+                lambda value: EMAIL_PATTERN.match(value) is not None,
+                ValidationMessages.get_rule_message(name, 'email')
+            ))
+
+        def check(value: Any) -> Optional[str]:
+            if value is None or value == '':
+                return required_message if field.required else None
+            if not isinstance(value, expected_type) or (rejected_type and isinstance(value, rejected_type)):
+                return type_message
+            for test, message in rules:
+                if not test(value):
+                    return message
+            return None
+
+        return check
@@ -0,0 +1,219 @@
+import hashlib
+import math
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional
+
+from app import logger
+
+
+class BloomFilter:
+    """
+    Fixed-size Bloom filter over strings.
+
+    Answers "definitely absent" or "possibly present" in O(k) with about `capacity * 1.2` bytes at a 1%
+    false positive rate. Bit positions come from one BLAKE2b digest split into two 64-bit halves
+    (double hashing), so a lookup costs a single hash computation.
+    """
+
+    __slots__ = ('size', 'hash_count', 'count', '_bits')
+
+    def __init__(self, capacity: int, error_rate: float = 0.01):
+        capacity = max(int(capacity), 1)
+        self.size = max(int(-capacity * math.log(error_rate) / (math.log(2) ** 2)), 8)
+        self.hash_count = max(int(round(self.size / capacity * math.log(2))), 1)
+        self.count = 0
+        self._bits = bytearray((self.size + 7) // 8)
+
+    def add(self, key: str) -> None:
+        """
+        Add a key to the filter.
+
+        Args:
+            key (str): The key to add.
+        """
+        for position in self._positions(key):
+            self._bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, key: str) -> bool:
+        return all(self._bits[position >> 3] & (1 << (position & 7)) for position in self._positions(key))
+
+    def _positions(self, key: str):
+        digest = hashlib.blake2b(key.encode('utf-8'), digest_size=16).digest()
+        first, second = int.from_bytes(digest[:8], 'little'), int.from_bytes(digest[8:], 'little') | 1
+        return ((first + index * second) % self.size for index in range(self.hash_count))
+
+
+class RevocationIndex:
+    """
+    In-memory index of revoked refresh token families, checked before the token store.
+
+    Every `RELOAD_INTERVAL` seconds the revoked families are loaded from the database into a Bloom filter
+    sized for them; the most recent ones, and those revoked by this process since, are also kept in an
+    exact set of bounded size.
+
+    A lookup then has three outcomes without touching the database:
+
+    - not in the filter: the family is not revoked (the common case), go on with the rotation;
+    - in the exact set: the family is revoked, reject;
+    - in the filter only: possibly a false positive, let the token store decide.
+
+    The index only short-circuits; the conditional UPDATE of the rotation stays authoritative, so
+    revocations made by other workers are still enforced before this worker's next reload.
+    """
+
+    def __init__(self, capacity: int = 100000, error_rate: float = 0.01, reload_interval: int = 300,
+                 exact_size: int = 10000):
+        self.capacity = capacity
+        self.error_rate = error_rate
+        self.reload_interval = reload_interval
+        self.exact_size = exact_size
+
+        self._loader: Optional[Callable[[], Iterable[Any]]] = None
+        self._filter = BloomFilter(capacity, error_rate)
+        self._exact: 'OrderedDict[str, None]' = OrderedDict()
+        self._loaded_at: Optional[float] = None
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.uncertain = 0
+        self.reloads = 0
+
+    def init_app(self, application, loader: Callable[[], Iterable[Any]]) -> None:
+        """
+        Configure the index from the `REFRESH_TOKENS` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+            loader (Callable): Returns the ids of all revoked, unexpired families, most recently revoked first.
+                Called within an app context.
+        """
+        settings = application.config.get('REFRESH_TOKENS') or {}
+        self.capacity = int(settings.get('INDEX_CAPACITY', self.capacity))
+        self.error_rate = float(settings.get('INDEX_ERROR_RATE', self.error_rate))
+        self.reload_interval = int(settings.get('INDEX_RELOAD_INTERVAL', self.reload_interval))
+        self.exact_size = int(settings.get('INDEX_EXACT_SIZE', self.exact_size))
+        self._loader = loader
+        self.reset()
+
+    def is_revoked(self, family_id: Any) -> Optional[bool]:
+        """
+        Check whether a token family is revoked.
+
+        Args:
+            family_id (Any): The family id (`fam` claim).
+
+        Returns:
+            Optional[bool]: False if the family is certainly not revoked, True if it certainly is, and
+            None when only the token store can tell.
+        """
+        self._reload_if_stale()
+        key = str(family_id)
+        with self._lock:
+            if key not in self._filter:
+                self.misses += 1
+                return False
+            if key in self._exact:
+                self.hits += 1
+                return True
+            self.uncertain += 1
+            return None
+
+    def needs_reload(self) -> bool:
+        """
+        Check whether the next lookup will reload the index from the database.
+
+        Lets callers that must not block (the async views) do that lookup off the event loop.
+
+        Returns:
+            bool: True if the index was never loaded or `reload_interval` has passed.
+        """
+        return self._loader is not None and (
+            self._loaded_at is None or time.monotonic() - self._loaded_at >= self.reload_interval
+        )
+
+    def add(self, family_id: Any) -> None:
+        """
+        Record a revoked family.
+
+        Args:
+            family_id (Any): The revoked family id.
+        """
+        key = str(family_id)
+        with self._lock:
+            self._filter.add(key)
+            self._exact[key] = None
+            self._exact.move_to_end(key)
+            while len(self._exact) > self.exact_size:
+                self._exact.popitem(last=False)
+
+    def reset(self) -> None:
+        """Empty the index; it is reloaded from the database on the next lookup."""
+        with self._lock:
+            self._filter = BloomFilter(self.capacity, self.error_rate)
+            self._exact.clear()
+            self._loaded_at = None
+
+    def after_fork(self) -> None:
+        """Recreate the lock in a freshly forked child, in case another thread held it at fork time."""
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the index counters.
+
+        Returns:
+            Dict[str, Any]: Filter size and lookup outcomes.
+        """
+        with self._lock:
+            return {
+                'revoked_families': self._filter.count,
+                'filter_bytes': len(self._filter._bits),
+                'exact_entries': len(self._exact),
+                'hits': self.hits,
+                'misses': self.misses,
+                'uncertain': self.uncertain,
+                'reloads': self.reloads,
+            }
+
+    def _reload_if_stale(self) -> None:
+        """Rebuild the filter from the database once `reload_interval` has passed."""
+        now = time.monotonic()
+        if self._loader is None or (self._loaded_at is not None and now - self._loaded_at < self.reload_interval):
+            return
+
+        with self._lock:
+            if self._loaded_at is not None and now - self._loaded_at < self.reload_interval:
+                return
+            # Claim the reload so concurrent lookups keep using the current filter meanwhile
+            self._loaded_at = now
+
+        try:
+            family_ids = [str(family_id) for family_id in self._loader()]
+        except Exception as e:
+            logger.error('Error while loading revoked refresh token families: %s', str(e))
+            return
+
+        bloom = BloomFilter(max(self.capacity, len(family_ids) * 2), self.error_rate)
+        for family_id in family_ids:
+            bloom.add(family_id)
+        # The loader returns the most recently revoked first; those are kept exactly as well
+        exact = OrderedDict((family_id, None) for family_id in reversed(family_ids[:self.exact_size]))
+
+        with self._lock:
+            # Keep families revoked by this process while the load was running
+            for family_id in self._exact:
+                bloom.add(family_id)
+                exact[family_id] = None
+                exact.move_to_end(family_id)
+            while len(exact) > self.exact_size:
+                exact.popitem(last=False)
+            self._filter = bloom
+            self._exact = exact
+            self.reloads += 1
+
+
+revocation_index = RevocationIndex()
@@ -0,0 +1,33 @@
+from operator import attrgetter
+from typing import Any, Dict, Sequence
+
+
+class ModelSerializer:
+    """
+    Serializer compiled once per model for a fixed list of fields.
+
+    All field values are read with a single C-level `attrgetter` call and zipped into a dict. Values are
+    left native (datetimes, UUIDs); the application's JSON provider encodes them directly, which avoids
+    the per-call `isoformat()` / `str()` work. Works for ORM instances, row objects and snapshots alike,
+    as long as they expose the fields as attributes.
+    """
+
+    __slots__ = ('fields', '_getter')
+
+    def __init__(self, fields: Sequence[str]):
+        self.fields = tuple(fields)
+        getter = attrgetter(*self.fields)
+        # attrgetter returns a bare value rather than a tuple for a single field
+        self._getter = getter if len(self.fields) > 1 else (lambda obj: (getter(obj),))
+
+    def __call__(self, obj: Any) -> Dict[str, Any]:
+        """
+        Serialize one object.
+
+        Args:
+            obj (Any): Object exposing the serializer's fields as attributes.
+
+        Returns:
+            Dict[str, Any]: Field name to (native) value.
+        """
+        return dict(zip(self.fields, self._getter(obj)))
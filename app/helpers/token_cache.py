@@ -0,0 +1,233 @@
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Dict, Optional, Set, Tuple
+
+
+class UserSnapshot:
+    """
+    Lightweight, read-only copy of the user fields needed to serve an authenticated request.
+
+    Exposes the same attribute names as `User`, so it can be passed anywhere a user is only read
+    (e.g. `User.user_to_dict`).
+    """
+
+    __slots__ = (
+        'id', 'uuid', 'name', 'email', 'last_login_at', 'deactivated_at', 'created_at', 'updated_at'
+    )
+
+    def __init__(
+            self,
+            id: int,
+            uuid: Any,
+            name: str,
+            email: str,
+            last_login_at: Optional[datetime] = None,
+            deactivated_at: Optional[datetime] = None,
+            created_at: Optional[datetime] = None,
+            updated_at: Optional[datetime] = None
+    ):
+        self.id = id
+        self.uuid = uuid
+        self.name = name
+        self.email = email
+        self.last_login_at = last_login_at
+        self.deactivated_at = deactivated_at
+        self.created_at = created_at
+        self.updated_at = updated_at
+
+    @classmethod
+    def from_user(cls, user: Any) -> 'UserSnapshot':
+        """
+        Build a snapshot from a `User` instance.
+
+        Args:
+            user (User): The user to copy.
+
+        Returns:
+            UserSnapshot: A detached copy of the user's public fields.
+        """
+        return cls(**{field: getattr(user, field) for field in cls.__slots__})
+
+    def __repr__(self) -> str:
+        return f'<UserSnapshot(id={self.id}, name={self.name})>'
+
+
+class TokenCache:
+    """
+    Bounded LRU + TTL cache of verified access tokens.
+
+    Entries are keyed on a SHA-256 digest of the raw token (the token itself is never stored) and hold
+    the decoded claims plus a `UserSnapshot`. An entry lives for at most `ttl` seconds and never past
+    the token's own `exp` claim. The cache is per process; the short TTL bounds how long another
+    worker's writes can go unnoticed.
+    """
+
+    def __init__(self, max_size: int = 10000, ttl: int = 60):
+        self.max_size = max_size
+        self.ttl = ttl
+
+        self._entries: 'OrderedDict[str, Tuple[float, Dict[str, Any], UserSnapshot]]' = OrderedDict()
+        self._keys_by_user: Dict[int, Set[str]] = {}
+        self._lock = threading.Lock()
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def init_app(self, application) -> None:
+        """
+        Configure the cache from the `TOKEN_CACHE` section of the application config.
+
+        Args:
+            application (Flask): Flask application instance.
+        """
+        settings = application.config.get('TOKEN_CACHE') or {}
+        self.max_size = int(settings.get('MAX_SIZE', self.max_size))
+        self.ttl = int(settings.get('TTL', self.ttl))
+        self.clear()
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_size > 0 and self.ttl > 0
+
+    @staticmethod
+    def digest(token: str) -> str:
+        """
+        Return the cache key for a raw token.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            str: Hex digest of the token.
+        """
+        return hashlib.sha256(token.encode('utf-8')).hexdigest()
+
+    def get(self, token: str) -> Optional[Tuple[Dict[str, Any], UserSnapshot]]:
+        """
+        Look up a previously verified token.
+
+        Args:
+            token (str): The encoded JWT.
+
+        Returns:
+            Optional[Tuple[Dict[str, Any], UserSnapshot]]: The cached claims and user snapshot, or None on a miss.
+        """
+        if not self.enabled:
+            return None
+
+        key = self.digest(token)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, claims, user = entry
+            if expires_at <= now:
+                self._remove(key, user.id)
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return claims, user
+
+    def set(self, token: str, claims: Dict[str, Any], user: UserSnapshot) -> None:
+        """
+        Store a verified token.
+
+        Args:
+            token (str): The encoded JWT.
+            claims (Dict[str, Any]): The decoded claims.
+            user (UserSnapshot): Snapshot of the user the token belongs to.
+        """
+        if not self.enabled:
+            return
+
+        expires_at = time.time() + self.ttl
+        if claims.get('exp') is not None:
+            expires_at = min(expires_at, float(claims['exp']))
+
+        key = self.digest(token)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key, self._entries[key][2].id)
+
+            self._entries[key] = (expires_at, claims, user)
+            self._keys_by_user.setdefault(user.id, set()).add(key)
+
+            while len(self._entries) > self.max_size:
+                oldest_key, (_, _, oldest_user) = next(iter(self._entries.items()))
+                self._remove(oldest_key, oldest_user.id)
+                self.evictions += 1
+
+    def invalidate_user(self, user_id: Optional[int]) -> None:
+        """
+        Drop every cached token belonging to a user.
+
+        Args:
+            user_id (Optional[int]): The user's primary key.
+        """
+        if user_id is None:
+            return
+
+        with self._lock:
+            keys = self._keys_by_user.pop(user_id, None)
+            if not keys:
+                return
+            for key in keys:
+                self._entries.pop(key, None)
+            self.invalidations += 1
+
+    def clear(self) -> None:
+        """Remove all entries and reset the counters."""
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_user.clear()
+            self.hits = self.misses = self.evictions = self.invalidations = 0
+
+    def after_fork(self) -> None:
+        """
+        Recreate the lock in a freshly forked child, in case another thread held it at fork time.
+
+        Entries inherited from the parent stay valid and are shared copy-on-write until touched.
+        """
+        self._lock = threading.Lock()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return the cache counters, used to size the cache.
+
+        Returns:
+            Dict[str, Any]: Current size, limits and hit/miss counters.
+        """
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'size': len(self._entries),
+                'max_size': self.max_size,
+                'ttl': self.ttl,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': round(self.hits / lookups, 4) if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations,
+            }
+
+    def _remove(self, key: str, user_id: int) -> None:
+        """Remove a single entry. Caller must hold the lock."""
+        self._entries.pop(key, None)
+        user_keys = self._keys_by_user.get(user_id)
+        if user_keys is not None:
+            user_keys.discard(key)
+            if not user_keys:
+                del self._keys_by_user[user_id]
+
+
+token_cache = TokenCache()
@@ -0,0 +1,201 @@
+import json
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
+
+from app import db, logger
+from app.helpers.constants import ResponseErrorCodes, ResponseMessageKeys
+from app.helpers.password_hasher import PasswordHasher, import_password_hasher
+from app.helpers.request_schema import RequestSchema
+from app.models.user import User
+
+
+class UserImporter:
+    """
+    Create users in bulk from NDJSON input.
+
+    Each line holds one JSON object with `name`, `email` and `password`, validated against the same schema
+    as a sign-up. Lines are consumed lazily and processed in batches: one set-based query finds emails that
+    already exist, passwords are hashed in parallel by `import_password_hasher` (a pool of its own, so imports
+    never compete with sign-in for hashing slots), and the remaining rows are written with a single multi-row
+    INSERT. Invalid rows are reported individually and never abort the rest of their batch.
+    """
+
+    def __init__(
+            self,
+            schema: RequestSchema,
+            batch_size: int = 1000,
+            max_rows: Optional[int] = None,
+            max_reported_errors: int = 1000,
+            hasher: PasswordHasher = import_password_hasher
+    ):
+        self.schema = schema
+        self.hasher = hasher
+        self.batch_size = max(batch_size, 1)
+        self.max_rows = max_rows
+        self.max_reported_errors = max_reported_errors
+
+        self.total = 0
+        self.created = 0
+        self.failed = 0
+        self.truncated = False
+        self.errors: List[Dict[str, Any]] = []
+
+    @classmethod
+    def from_config(cls, config: Dict[str, Any], schema: RequestSchema) -> 'UserImporter':
+        """
+        Build an importer from the `BULK_IMPORT` section of the application config.
+
+        Args:
+            config (Dict[str, Any]): The application config.
+            schema (RequestSchema): Schema every row must satisfy (the sign-up schema).
+
+        Returns:
+            UserImporter: A new importer.
+        """
+        settings = config.get('BULK_IMPORT') or {}
+        return cls(
+            schema,
+            batch_size=int(settings.get('BATCH_SIZE', 1000)),
+            max_rows=settings.get('MAX_ROWS'),
+            max_reported_errors=int(settings.get('MAX_REPORTED_ERRORS', 1000))
+        )
+
+    def run(self, lines: Iterable[Union[bytes, str]]) -> Dict[str, Any]:
+        """
+        Import every row from an NDJSON stream.
+
+        Args:
+            lines (Iterable[Union[bytes, str]]): The input, one JSON object per line.
+
+        Returns:
+            Dict[str, Any]: Summary with `total`, `created`, `failed` and the per-row `errors`.
+        """
+        batch: List[Tuple[int, Dict[str, Any]]] = []
+        for line_no, raw_line in enumerate(lines, start=1):
+            if isinstance(raw_line, bytes):
+                raw_line = raw_line.decode('utf-8', errors='replace')
+            if not raw_line.strip():
+                continue
+
+            if self.max_rows is not None and self.total >= self.max_rows:
+                self.truncated = True
+                break
+            self.total += 1
+
+            row = self._parse_line(line_no, raw_line)
+            if row is not None:
+                batch.append((line_no, row))
+
+            if len(batch) >= self.batch_size:
+                self._process_batch(batch)
+                batch = []
+
+        if batch:
+            self._process_batch(batch)
+
+        return self.summary()
+
+    def summary(self) -> Dict[str, Any]:
+        """
+        Return the import report.
+
+        Returns:
+            Dict[str, Any]: Row counters, the (possibly truncated) list of row errors and whether the input
+            was cut off at `max_rows`.
+        """
+        return {
+            'total': self.total,
+            'input_truncated': self.truncated,
+            'created': self.created,
+            'failed': self.failed,
+            'errors': self.errors,
+            'errors_truncated': self.failed > len(self.errors),
+        }
+
+    def _parse_line(self, line_no: int, raw_line: str) -> Optional[Dict[str, Any]]:
+        """Decode and validate one input line, recording an error if it is unusable."""
+        try:
+            row = json.loads(raw_line)
+        except ValueError:
+            self._add_error(line_no, None, ResponseErrorCodes.INSUFFICIENT_DATA.value, 'Line is not valid JSON.')
+            return None
+
+        if not isinstance(row, dict):
+            self._add_error(line_no, None, ResponseErrorCodes.INSUFFICIENT_DATA.value, 'Line must be a JSON object.')
+            return None
+
+        values, errors = self.schema.validate(row)
+        if errors:
+            self._add_error(line_no, row.get('email'), self.schema.error_code(row, errors).value, errors)
+            return None
+
+        return {
+            'name': values['name'],
+            'email': values['email'],
+            'email_normalized': User.normalize_email(values['email']),
+            'password': values['password'],
+        }
+
+    def _process_batch(self, batch: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Deduplicate, hash and insert one batch of valid rows."""
+        existing = self._existing_emails([row['email_normalized'] for _, row in batch])
+
+        accepted: List[Tuple[int, Dict[str, Any]]] = []
+        seen = set()
+        for line_no, row in batch:
+            if row['email_normalized'] in existing or row['email_normalized'] in seen:
+                self._add_error(line_no, row['email'], ResponseErrorCodes.EMAIL_EXISTS.value,
+                                ResponseMessageKeys.EMAIL_EXISTS.value)
+                continue
+            seen.add(row['email_normalized'])
+            accepted.append((line_no, row))
+
+        if not accepted:
+            return
+
+        hashes = self.hasher.hash_many([row['password'] for _, row in accepted])
+        for (_, row), hashed_password in zip(accepted, hashes):
+            row['password'] = hashed_password
+
+        try:
+            db.session.execute(insert(User), [row for _, row in accepted])
+            db.session.commit()
+            self.created += len(accepted)
+        except IntegrityError:
+            # A concurrent signup took one of the emails; fall back to row-by-row inserts for this batch
+            db.session.rollback()
+            self._insert_individually(accepted)
+
+    def _insert_individually(self, rows: List[Tuple[int, Dict[str, Any]]]) -> None:
+        """Insert rows one at a time so a single conflict only fails its own row."""
+        for line_no, row in rows:
+            try:
+                db.session.execute(insert(User), [row])
+                db.session.commit()
+                self.created += 1
+            except IntegrityError:
+                db.session.rollback()
+                self._add_error(line_no, row['email'], ResponseErrorCodes.EMAIL_EXISTS.value,
+                                ResponseMessageKeys.EMAIL_EXISTS.value)
+            except Exception as e:
+                db.session.rollback()
+                logger.error('Error while importing user on line %s: %s', line_no, str(e))
+                self._add_error(line_no, row['email'], ResponseErrorCodes.SERVER_ERROR.value,
+                                ResponseMessageKeys.FAILED.value)
+
+    @staticmethod
+    def _existing_emails(emails: List[str]) -> set:
+        """Return which of the given normalized emails are already registered, in one query."""
+        if not emails:
+            return set()
+        return set(db.session.scalars(
+            select(User.email_normalized).where(User.email_normalized.in_(set(emails)))
+        ))
+
+    def _add_error(self, line_no: int, email: Optional[str], error: str, message: Any) -> None:
+        """Record a failed row, keeping at most `max_reported_errors` details."""
+        self.failed += 1
+        if len(self.errors) < self.max_reported_errors:
+            self.errors.append({'line': line_no, 'email': email, 'error': error, 'message': message})
@@ -45,24 +45,22 @@ def validate_required_fields(
         'data': errors
     }
 
-def send_json_response(
-        http_status: int,
+def build_response_envelope(
         response_status: bool,
-        message_key: str,
+        message_key: Any,
         data: Optional[Any] = None,
         error: Optional[Any] = None,
         extra_fields: Optional[Dict[str, Any]] = None
-) -> Tuple:
+) -> Dict[str, Any]:
     """
-    This method sends a JSON response in a custom structure.
+    Build the custom response structure shared by every JSON response.
 
-    :param http_status: HTTP response status code.
     :param response_status: Boolean indicating success or failure.
     :param message_key: Message string to be included in the response.
     :param data: Optional, response data to be included (default is None).
     :param error: Optional, error details to be included if the response failed (default is None).
     :param extra_fields: Optional, dictionary of any additional fields you may want to include in the response.
-    :return: Tuple containing the JSON response and HTTP status code.
+    :return: The response body as a dictionary.
     """
 
     # Map the response_status to a more descriptive status value
@@ -86,6 +84,30 @@ def send_json_response(
     if extra_fields:
         response.update(extra_fields)
 
+    return response
+
+
+def send_json_response(
+        http_status: int,
+        response_status: bool,
+        message_key: str,
+        data: Optional[Any] = None,
+        error: Optional[Any] = None,
+        extra_fields: Optional[Dict[str, Any]] = None
+) -> Tuple:
+    """
+    This method sends a JSON response in a custom structure.
+
+    :param http_status: HTTP response status code.
+    :param response_status: Boolean indicating success or failure.
+    :param message_key: Message string to be included in the response.
+    :param data: Optional, response data to be included (default is None).
+    :param error: Optional, error details to be included if the response failed (default is None).
+    :param extra_fields: Optional, dictionary of any additional fields you may want to include in the response.
+    :return: Tuple containing the JSON response and HTTP status code.
+    """
+    response = build_response_envelope(response_status, message_key, data, error, extra_fields)
+
     # Return the JSON response along with the HTTP status code
     return jsonify(response), http_status
 
@@ -0,0 +1,211 @@
+import atexit
+import os
+import threading
+import time
+from typing import Any, Callable, Dict, Hashable, List, Optional, Tuple
+
+from app import logger
+
+
+class CoalescingWriteBuffer:
+    """
+    Write-behind buffer that coalesces per-key values and writes them in batches.
+
+    `record` only touches an in-memory dict, so the request never waits on the database. Repeated
+    records for the same key keep the greatest value. A background thread hands the pending entries
+    to `writer` every `flush_interval_ms`, or sooner once `max_entries` keys are waiting. Pending
+    entries are flushed on interpreter shutdown, and a failed write puts them back for the next flush.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            writer: Optional[Callable[[List[Tuple[Hashable, Any]]], None]] = None,
+            flush_interval_ms: int = 500,
+            max_entries: int = 1000,
+            enabled: bool = True
+    ):
+        self.name = name
+        self.writer = writer
+        self.flush_interval_ms = flush_interval_ms
+        self.max_entries = max_entries
+        self.enabled = enabled
+
+        self._app = None
+        self._pending: Dict[Hashable, Any] = {}
+        self._oldest_pending_at: Optional[float] = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._thread_pid: Optional[int] = None
+        self._atexit_registered = False
+
+        self.flushes = 0
+        self.flushed_entries = 0
+        self.failed_flushes = 0
+        self.last_flush_duration_ms = 0.0
+        self.last_flush_lag_ms = 0.0
+        self.max_flush_lag_ms = 0.0
+
+    def init_app(self, application, settings_key: str, writer: Callable[[List[Tuple[Hashable, Any]]], None]) -> None:
+        """
+        Configure the buffer from the application config.
+
+        Args:
+            application (Flask): Flask application instance, used to push an app context while writing.
+            settings_key (str): Config section holding `ENABLED`, `FLUSH_INTERVAL_MS` and `MAX_ENTRIES`.
+            writer (Callable): Receives a list of (key, value) pairs and persists them in one batch.
+        """
+        settings = application.config.get(settings_key) or {}
+        self.enabled = bool(settings.get('ENABLED', self.enabled))
+        self.flush_interval_ms = int(settings.get('FLUSH_INTERVAL_MS', self.flush_interval_ms))
+        self.max_entries = max(int(settings.get('MAX_ENTRIES', self.max_entries)), 1)
+        self.writer = writer
+        self._app = application
+
+        if not self._atexit_registered:
+            atexit.register(self.shutdown)
+            self._atexit_registered = True
+
+    def record(self, key: Hashable, value: Any) -> None:
+        """
+        Queue a value for write-behind, keeping the greatest value per key.
+
+        Args:
+            key (Hashable): The row key (e.g. a user id).
+            value (Any): The value to persist (e.g. a timestamp).
+        """
+        with self._lock:
+            current = self._pending.get(key)
+            if current is None or value > current:
+                self._pending[key] = value
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+            full = len(self._pending) >= self.max_entries
+
+        self._ensure_thread()
+        if full:
+            self._wake.set()
+
+    def flush(self) -> int:
+        """
+        Write all pending entries now.
+
+        Returns:
+            int: Number of entries written.
+        """
+        with self._flush_lock:
+            with self._lock:
+                pending, self._pending = self._pending, {}
+                oldest_pending_at, self._oldest_pending_at = self._oldest_pending_at, None
+
+            if not pending:
+                return 0
+
+            started_at = time.monotonic()
+            try:
+                if self._app is not None:
+                    with self._app.app_context():
+                        self.writer(list(pending.items()))
+                else:
+                    self.writer(list(pending.items()))
+            except Exception as e:
+                self.failed_flushes += 1
+                logger.error('Error while flushing %s write-behind buffer: %s', self.name, str(e))
+                self._restore(pending, oldest_pending_at)
+                return 0
+
+            finished_at = time.monotonic()
+            self.flushes += 1
+            self.flushed_entries += len(pending)
+            self.last_flush_duration_ms = (finished_at - started_at) * 1000
+            self.last_flush_lag_ms = (finished_at - oldest_pending_at) * 1000
+            self.max_flush_lag_ms = max(self.max_flush_lag_ms, self.last_flush_lag_ms)
+            return len(pending)
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Return buffer counters, including the flush lag.
+
+        `flush_lag_ms` is the age of the oldest entry still waiting to be written; `last_flush_lag_ms` is
+        how long the oldest entry of the last batch waited before it reached the database.
+
+        Returns:
+            Dict[str, Any]: Pending size and flush counters.
+        """
+        with self._lock:
+            pending = len(self._pending)
+            oldest_pending_at = self._oldest_pending_at
+
+        return {
+            'enabled': self.enabled,
+            'pending': pending,
+            'flush_lag_ms': round((time.monotonic() - oldest_pending_at) * 1000, 3) if oldest_pending_at else 0.0,
+            'last_flush_lag_ms': round(self.last_flush_lag_ms, 3),
+            'max_flush_lag_ms': round(self.max_flush_lag_ms, 3),
+            'last_flush_duration_ms': round(self.last_flush_duration_ms, 3),
+            'flushes': self.flushes,
+            'flushed_entries': self.flushed_entries,
+            'failed_flushes': self.failed_flushes,
+        }
+
+    def shutdown(self) -> None:
+        """Stop the background thread and write whatever is still pending."""
+        self._stop.set()
+        self._wake.set()
+        if self._thread is not None and self._thread_pid == os.getpid():
+            self._thread.join(timeout=max(self.flush_interval_ms / 1000, 1) * 2)
+        self._thread = None
+        self.flush()
+
+    def after_fork(self) -> None:
+        """
+        Reset per-process state in a freshly forked child.
+
+        Entries inherited from the parent are dropped, since the parent flushes them itself. The locks and
+        events are recreated in case another thread held them at fork time; the flush thread is started
+        again on the next `record`.
+        """
+        self._pending = {}
+        self._oldest_pending_at = None
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self._thread_pid = None
+
+    def _ensure_thread(self) -> None:
+        """Start the flush thread on first use, and again in a forked child where it does not exist."""
+        pid = os.getpid()
+        if self._thread is not None and self._thread_pid == pid:
+            return
+
+        with self._lock:
+            if self._thread is None or self._thread_pid != pid:
+                self._stop.clear()
+                self._thread = threading.Thread(target=self._run, name=f'{self.name}-write-behind', daemon=True)
+                self._thread_pid = pid
+                self._thread.start()
+
+    def _run(self) -> None:
+        """Flush loop of the background thread."""
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval_ms / 1000)
+            self._wake.clear()
+            self.flush()
+
+    def _restore(self, pending: Dict[Hashable, Any], oldest_pending_at: Optional[float]) -> None:
+        """Merge entries from a failed flush back into the buffer."""
+        with self._lock:
+            for key, value in pending.items():
+                current = self._pending.get(key)
+                if current is None or value > current:
+                    self._pending[key] = value
+            if oldest_pending_at is not None:
+                self._oldest_pending_at = min(filter(None, [self._oldest_pending_at, oldest_pending_at]))
+
+
+last_login_buffer = CoalescingWriteBuffer(name='last-login')
@@ -1,6 +1,12 @@
-from typing import Optional, Any
+from contextlib import asynccontextmanager, contextmanager
+from typing import Any, AsyncIterator, Callable, Dict, Iterator, List, Optional, Sequence
+
+from sqlalchemy import insert, select
+from sqlalchemy.exc import IntegrityError
 
 from app import db, logger
+from app.helpers.async_db import async_db
+from app.helpers.replica_routing import replica_router
 
 
 class Base(db.Model):
@@ -20,14 +26,245 @@ class Base(db.Model):
             logger.error(f'Error while saving instance: {e}')
             raise
 
+    async def save_async(self):
+        """
+        Save the instance through the async session (see `app.helpers.async_db`).
+        """
+        try:
+            async_db.session.add(self)
+            await async_db.session.commit()
+            return self
+        except Exception as e:
+            logger.error(f'Error while saving instance: {e}')
+            raise
+
+    @classmethod
+    @contextmanager
+    def atomic(cls) -> Iterator[None]:
+        """
+        Run the session work of the block as one database transaction, committed when the block exits and
+        rolled back if it raises.
+
+        The engine may run in AUTOCOMMIT (see `SQLALCHEMY_ENGINE_OPTIONS`), where every statement commits on
+        its own, so the transaction takes its connection at the database's default isolation level instead.
+        The isolation level can only be chosen when a transaction begins, so the session's current
+        transaction is committed first.
+        """
+        db.session.commit()
+        bind = db.session.get_bind(mapper=cls)
+        db.session.connection(
+            bind_arguments={'mapper': cls},
+            execution_options={'isolation_level': bind.dialect.default_isolation_level}
+        )
+        try:
+            yield
+            db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    @classmethod
+    @asynccontextmanager
+    async def atomic_async(cls) -> AsyncIterator[None]:
+        """Async variant of `atomic`."""
+        session = async_db.session
+        await session.commit()
+        await session.connection(
+            execution_options={'isolation_level': async_db.engine.dialect.default_isolation_level}
+        )
+        try:
+            yield
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+
     @classmethod
     def get_by_id(cls, id: int) -> Any:
         """Retrieve a record by its primary key.
 
+        Served from the session's identity map when the instance is already loaded, otherwise read from a
+        replica when one is configured (see `app.helpers.replica_routing`).
+
         Args:
             id (int): The primary key of the record to retrieve.
 
         Returns:
             Any: The record if found, otherwise None.
         """
-        return cls.query.get(id)
+        return replica_router.read(lambda: db.session.get(cls, id))
+
+    @classmethod
+    async def get_by_id_async(cls, id: int) -> Any:
+        """Async variant of `get_by_id`, always reading from the primary."""
+        return await async_db.session.get(cls, id)
+
+    @classmethod
+    def project(
+            cls,
+            columns: Sequence[Any],
+            *criteria: Any,
+            into: Optional[Callable[..., Any]] = None,
+            limit: Optional[int] = None
+    ) -> List[Any]:
+        """
+        Read only the given columns, without building tracked ORM instances.
+
+        Rows are returned as lightweight named tuples (attribute access by column name), or passed to `into`
+        as keyword arguments, e.g. to build a slotted read-only object. Reads from a replica when one is
+        configured.
+
+        Args:
+            columns (Sequence[Any]): Column names or mapped attributes to select.
+            *criteria (Any): WHERE clauses, e.g. `cls.id == 1`.
+            into (Optional[Callable[..., Any]]): Called with each row's columns as keyword arguments.
+            limit (Optional[int]): Maximum number of rows.
+
+        Returns:
+            List[Any]: The rows, or the objects built by `into`.
+        """
+        query = cls._projection_query(columns, criteria, limit)
+        rows = replica_router.read(lambda: db.session.execute(query).all())
+        if into is None:
+            return rows
+        return [into(**row._mapping) for row in rows]
+
+    @classmethod
+    async def project_async(
+            cls,
+            columns: Sequence[Any],
+            *criteria: Any,
+            into: Optional[Callable[..., Any]] = None,
+            limit: Optional[int] = None
+    ) -> List[Any]:
+        """Async variant of `project`, always reading from the primary."""
+        rows = (await async_db.session.execute(cls._projection_query(columns, criteria, limit))).all()
+        if into is None:
+            return rows
+        return [into(**row._mapping) for row in rows]
+
+    @classmethod
+    def _projection_query(cls, columns: Sequence[Any], criteria: Sequence[Any], limit: Optional[int]) -> Any:
+        """Build the SELECT of `project`."""
+        selected = [getattr(cls, column) if isinstance(column, str) else column for column in columns]
+        query = select(*selected).where(*criteria)
+        if limit is not None:
+            query = query.limit(limit)
+        return query
+
+    @classmethod
+    def project_by_id(cls, id: int, columns: Sequence[Any], into: Optional[Callable[..., Any]] = None) -> Any:
+        """
+        Read only the given columns of one record, see `project`.
+
+        Args:
+            id (int): The primary key of the record.
+            columns (Sequence[Any]): Column names or mapped attributes to select.
+            into (Optional[Callable[..., Any]]): Called with the row's columns as keyword arguments.
+
+        Returns:
+            Any: The row (or the object built by `into`) if found, otherwise None.
+        """
+        return replica_router.read(lambda: next(iter(cls.project(columns, cls.id == id, into=into, limit=1)), None))
+
+    @classmethod
+    async def project_by_id_async(
+            cls,
+            id: int,
+            columns: Sequence[Any],
+            into: Optional[Callable[..., Any]] = None
+    ) -> Any:
+        """Async variant of `project_by_id`, always reading from the primary."""
+        return next(iter(await cls.project_async(columns, cls.id == id, into=into, limit=1)), None)
+
+    @classmethod
+    def insert_or_ignore(
+            cls,
+            values: Dict[str, Any],
+            returning: Sequence[Any],
+            conflict_columns: Optional[Sequence[str]] = None
+    ) -> Optional[Any]:
+        """
+        Insert one row and return some of its columns, or nothing if it violates a unique constraint.
+
+        On PostgreSQL and SQLite this is a single `INSERT ... ON CONFLICT DO NOTHING RETURNING` statement, so
+        there is no check-then-insert race and no extra round trip. Other databases fall back to an INSERT in
+        a savepoint that is rolled back on an integrity error. Python-side column defaults are applied, ORM
+        validators and events are not.
+
+        Args:
+            values (Dict[str, Any]): Column values of the new row.
+            returning (Sequence[Any]): Columns to return, e.g. `[cls.id, cls.created_at]`.
+            conflict_columns (Optional[Sequence[str]]): Columns of the unique index to arbitrate on; by default
+                a conflict on any unique constraint is ignored.
+
+        Returns:
+            Optional[Any]: A row with the returned columns, or None if the row already existed.
+        """
+        try:
+            dialect = db.session.get_bind(mapper=cls).dialect.name
+            statement = cls._insert_or_ignore_statement(dialect, values, returning, conflict_columns)
+            if statement is not None:
+                row = db.session.execute(statement).first()
+            else:
+                try:
+                    with db.session.begin_nested():
+                        row = db.session.execute(insert(cls).values(**values).returning(*returning)).first()
+                except IntegrityError:
+                    row = None
+
+            db.session.commit()
+            return row
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f'Error while inserting {cls.__name__}: {e}')
+            raise
+
+    @classmethod
+    async def insert_or_ignore_async(
+            cls,
+            values: Dict[str, Any],
+            returning: Sequence[Any],
+            conflict_columns: Optional[Sequence[str]] = None
+    ) -> Optional[Any]:
+        """Async variant of `insert_or_ignore`."""
+        session = async_db.session
+        try:
+            statement = cls._insert_or_ignore_statement(
+                async_db.engine.dialect.name, values, returning, conflict_columns
+            )
+            if statement is not None:
+                row = (await session.execute(statement)).first()
+            else:
+                try:
+                    async with session.begin_nested():
+                        row = (await session.execute(insert(cls).values(**values).returning(*returning))).first()
+                except IntegrityError:
+                    row = None
+
+            await session.commit()
+            return row
+        except Exception as e:
+            await session.rollback()
+            logger.error(f'Error while inserting {cls.__name__}: {e}')
+            raise
+
+    @classmethod
+    def _insert_or_ignore_statement(
+            cls,
+            dialect: str,
+            values: Dict[str, Any],
+            returning: Sequence[Any],
+            conflict_columns: Optional[Sequence[str]]
+    ) -> Optional[Any]:
+        """Build the upsert of `insert_or_ignore`, or return None if the dialect has no ON CONFLICT."""
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert as dialect_insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert as dialect_insert
+        else:
+            return None
+
+        return dialect_insert(cls).values(**values).on_conflict_do_nothing(
+            index_elements=conflict_columns
+        ).returning(*returning)
@@ -0,0 +1,297 @@
+import uuid
+from datetime import datetime, timedelta
+from typing import Any, List, Optional
+
+from sqlalchemy import UUID, BigInteger, delete, func, select, update
+from sqlalchemy.orm import aliased
+
+from app import db
+from app.helpers.async_db import async_db
+from app.helpers.revocation_index import revocation_index
+from app.models.base import Base
+
+
+class RefreshToken(Base):
+    """
+    An issued refresh token.
+
+    The JWT handed to the client carries the row's `jti` and `family_id`. Every refresh rotates the token:
+    the presented row is marked `rotated_at` and a successor in the same family is issued. Presenting a
+    rotated token again means it leaked, so the whole family is revoked.
+    """
+
+    __tablename__ = 'refresh_tokens'
+
+    jti = db.Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    family_id = db.Column(UUID(as_uuid=True), nullable=False, index=True)
+    user_id = db.Column(
+        BigInteger().with_variant(db.Integer, 'sqlite'),
+        db.ForeignKey('users.id', ondelete='CASCADE'),
+        nullable=False,
+        index=True
+    )
+
+    expires_at = db.Column(db.DateTime, nullable=False, index=True)
+    rotated_at = db.Column(db.DateTime, nullable=True)
+    revoked_at = db.Column(db.DateTime, nullable=True)
+
+    created_at = db.Column(db.DateTime, default=datetime.utcnow)
+
+    def __repr__(self) -> str:
+        """
+        Provide a string representation of the RefreshToken instance for debugging.
+
+        Returns:
+            str: A string representation of the RefreshToken instance.
+        """
+        return f'<RefreshToken(jti={self.jti}, user_id={self.user_id}, family_id={self.family_id})>'
+
+    @classmethod
+    def issue(cls, user_id: int, expiration_minutes: int, family_id: Optional[uuid.UUID] = None) -> 'RefreshToken':
+        """
+        Store a new refresh token, starting a new family unless one is given.
+
+        Args:
+            user_id (int): The owner of the token.
+            expiration_minutes (int): Lifetime of the token in minutes.
+            family_id (Optional[UUID]): Family to add the token to.
+
+        Returns:
+            RefreshToken: The stored token.
+        """
+        return cls._new_token(user_id, expiration_minutes, family_id).save()
+
+    @classmethod
+    async def issue_async(
+            cls,
+            user_id: int,
+            expiration_minutes: int,
+            family_id: Optional[uuid.UUID] = None
+    ) -> 'RefreshToken':
+        """
+        Async variant of `issue`.
+        """
+        return await cls._new_token(user_id, expiration_minutes, family_id).save_async()
+
+    @classmethod
+    def _new_token(
+            cls,
+            user_id: int,
+            expiration_minutes: int,
+            family_id: Optional[uuid.UUID] = None,
+            issued_at: Optional[datetime] = None
+    ) -> 'RefreshToken':
+        """Build an unsaved token, starting a new family unless one is given."""
+        return cls(
+            jti=uuid.uuid4(),
+            family_id=family_id or uuid.uuid4(),
+            user_id=user_id,
+            expires_at=(issued_at or datetime.utcnow()) + timedelta(minutes=expiration_minutes)
+        )
+
+    @classmethod
+    def rotate(
+            cls,
+            jti: uuid.UUID,
+            family_id: uuid.UUID,
+            user_id: int,
+            expiration_minutes: int
+    ) -> Optional['RefreshToken']:
+        """
+        Exchange a refresh token for its successor.
+
+        A single conditional UPDATE marks the token rotated only if it is unexpired, not yet rotated and its
+        family has no revoked token, so two concurrent refreshes with the same token cannot both succeed. The
+        UPDATE and the INSERT of the successor commit together: if the INSERT fails, the presented token is
+        left unrotated and can be used again.
+
+        Args:
+            jti (UUID): The presented token id.
+            family_id (UUID): The presented token family.
+            user_id (int): The user the token was issued to.
+            expiration_minutes (int): Lifetime of the successor in minutes.
+
+        Returns:
+            Optional[RefreshToken]: The successor, or None if the token cannot be rotated.
+        """
+        now = datetime.utcnow()
+        with cls.atomic():
+            result = db.session.execute(cls._rotation_statement(jti, family_id, user_id, now))
+            if result.rowcount != 1:
+                return None
+
+            successor = cls._new_token(user_id, expiration_minutes, family_id, issued_at=now)
+            db.session.add(successor)
+        return successor
+
+    @classmethod
+    async def rotate_async(
+            cls,
+            jti: uuid.UUID,
+            family_id: uuid.UUID,
+            user_id: int,
+            expiration_minutes: int
+    ) -> Optional['RefreshToken']:
+        """
+        Async variant of `rotate`.
+        """
+        now = datetime.utcnow()
+        async with cls.atomic_async():
+            result = await async_db.session.execute(cls._rotation_statement(jti, family_id, user_id, now))
+            if result.rowcount != 1:
+                return None
+
+            successor = cls._new_token(user_id, expiration_minutes, family_id, issued_at=now)
+            async_db.session.add(successor)
+        return successor
+
+    @classmethod
+    def _rotation_statement(cls, jti: uuid.UUID, family_id: uuid.UUID, user_id: int, now: datetime) -> Any:
+        """Build the conditional UPDATE of `rotate`."""
+        sibling = aliased(cls)
+        family_revoked = select(sibling.jti).where(
+            sibling.family_id == family_id,
+            sibling.revoked_at.isnot(None)
+        ).exists()
+
+        return update(cls).where(
+            cls.jti == jti,
+            cls.family_id == family_id,
+            cls.user_id == user_id,
+            cls.rotated_at.is_(None),
+            cls.revoked_at.is_(None),
+            cls.expires_at > now,
+            ~family_revoked
+        ).values(rotated_at=now).execution_options(synchronize_session=False)
+
+    @classmethod
+    def revoke_family_if_reused(cls, jti: uuid.UUID, family_id: uuid.UUID) -> bool:
+        """
+        Revoke a token family when an already rotated token of it is presented.
+
+        Args:
+            jti (UUID): The presented token id.
+            family_id (UUID): The presented token family.
+
+        Returns:
+            bool: True if the token had been rotated before (and its family is now revoked).
+        """
+        rotated_at = db.session.execute(
+            select(cls.rotated_at).where(cls.jti == jti, cls.family_id == family_id)
+        ).scalar()
+        if rotated_at is None:
+            return False
+
+        cls.revoke_family(family_id)
+        return True
+
+    @classmethod
+    async def revoke_family_if_reused_async(cls, jti: uuid.UUID, family_id: uuid.UUID) -> bool:
+        """
+        Async variant of `revoke_family_if_reused`.
+        """
+        rotated_at = (await async_db.session.execute(
+            select(cls.rotated_at).where(cls.jti == jti, cls.family_id == family_id)
+        )).scalar()
+        if rotated_at is None:
+            return False
+
+        await cls.revoke_family_async(family_id)
+        return True
+
+    @classmethod
+    def revoke_family(cls, family_id: uuid.UUID) -> None:
+        """
+        Revoke every token of a family.
+
+        Args:
+            family_id (UUID): The family to revoke.
+        """
+        db.session.execute(cls._family_revocation_statement(family_id))
+        db.session.commit()
+        revocation_index.add(family_id)
+
+    @classmethod
+    async def revoke_family_async(cls, family_id: uuid.UUID) -> None:
+        """
+        Async variant of `revoke_family`.
+        """
+        await async_db.session.execute(cls._family_revocation_statement(family_id))
+        await async_db.session.commit()
+        revocation_index.add(family_id)
+
+    @classmethod
+    def _family_revocation_statement(cls, family_id: uuid.UUID) -> Any:
+        """Build the UPDATE of `revoke_family`."""
+        return update(cls).where(
+            cls.family_id == family_id,
+            cls.revoked_at.is_(None)
+        ).values(revoked_at=datetime.utcnow()).execution_options(synchronize_session=False)
+
+    @classmethod
+    def revoke_user(cls, user_id: int) -> None:
+        """
+        Revoke every refresh token of a user, e.g. on deactivation.
+
+        Args:
+            user_id (int): The user whose tokens are revoked.
+        """
+        now = datetime.utcnow()
+        family_ids = db.session.execute(
+            select(cls.family_id).where(
+                cls.user_id == user_id,
+                cls.revoked_at.is_(None),
+                cls.expires_at > now
+            ).distinct()
+        ).scalars().all()
+
+        db.session.execute(
+            update(cls).where(
+                cls.user_id == user_id,
+                cls.revoked_at.is_(None)
+            ).values(revoked_at=now).execution_options(synchronize_session=False)
+        )
+        db.session.commit()
+        for family_id in family_ids:
+            revocation_index.add(family_id)
+
+    @classmethod
+    def revoked_family_ids(cls) -> List[Any]:
+        """
+        List the families that still have unexpired revoked tokens, most recently revoked first.
+
+        Used to load the revocation index.
+
+        Returns:
+            List[Any]: The family ids.
+        """
+        latest_revocation = func.max(cls.revoked_at)
+        return db.session.execute(
+            select(cls.family_id).where(
+                cls.revoked_at.isnot(None),
+                cls.expires_at > datetime.utcnow()
+            ).group_by(cls.family_id).order_by(latest_revocation.desc())
+        ).scalars().all()
+
+    @classmethod
+    def purge_expired(cls, batch_size: int = 1000) -> int:
+        """
+        Delete expired tokens in batches, keeping each transaction short.
+
+        Args:
+            batch_size (int): Rows deleted per statement.
+
+        Returns:
+            int: Number of deleted rows.
+        """
+        deleted = 0
+        now = datetime.utcnow()
+        while True:
+            expired = select(cls.jti).where(cls.expires_at <= now).limit(batch_size).scalar_subquery()
+            result = db.session.execute(
+                delete(cls).where(cls.jti.in_(expired)).execution_options(synchronize_session=False)
+            )
+            db.session.commit()
+            deleted += result.rowcount
+            if result.rowcount < batch_size:
+                return deleted
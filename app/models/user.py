@@ -1,11 +1,20 @@
+import operator
 import uuid
 from datetime import datetime
-from typing import Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
-from sqlalchemy import UUID
+from sqlalchemy import UUID, BigInteger, DateTime, bindparam, column, or_, select, update, values
+from sqlalchemy.orm import deferred, undefer, validates
+from sqlalchemy.orm.attributes import set_committed_value
 
-from app import db, logger
+from app import db
+from app.helpers.async_db import async_db
+from app.helpers.replica_routing import replica_router
+from app.helpers.serialization import ModelSerializer
+from app.helpers.token_cache import token_cache, UserSnapshot
+from app.helpers.write_behind import last_login_buffer
 from app.models.base import Base
+from app.models.refresh_token import RefreshToken
 
 class User(Base):
     """
@@ -14,12 +23,16 @@ class User(Base):
 
     __tablename__ = 'users'
 
-    id = db.Column(db.BigInteger, primary_key=True, autoincrement=True)
+    # SQLite only autoincrements INTEGER primary keys; the variant lets the benchmarks run against SQLite
+    id = db.Column(BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True, autoincrement=True)
     uuid = db.Column(UUID(as_uuid=True), unique=True, default=uuid.uuid4, nullable=False)
 
     name = db.Column(db.String, nullable=False)
     email = db.Column(db.String, nullable=False, unique=True)
-    password = db.Column(db.String, nullable=False)
+    # Lower-cased, trimmed copy of `email` that every lookup and the uniqueness check go through
+    email_normalized = db.Column(db.String, nullable=False, unique=True, index=True)
+    # Only loaded when asked for (see `get_by_email(with_password=True)`), authenticated reads never need it
+    password = deferred(db.Column(db.String, nullable=False))
 
     last_login_at = db.Column(db.DateTime, nullable=True)
     deactivated_at = db.Column(db.DateTime, nullable=True)
@@ -60,46 +73,297 @@ class User(Base):
         """
         return f'<User(id={self.id}, name={self.name})>'
 
+    def save(self) -> 'User':
+        """
+        Save the user and drop any cached tokens that hold a stale copy of it.
+        """
+        super().save()
+        token_cache.invalidate_user(self.id)
+        return self
+
+    async def save_async(self) -> 'User':
+        """
+        Async variant of `save`.
+        """
+        await super().save_async()
+        token_cache.invalidate_user(self.id)
+        return self
+
+    @validates('email')
+    def _sync_email_normalized(self, key: str, email: str) -> str:
+        """
+        Keep `email_normalized` in step whenever `email` is assigned.
+        """
+        self.email_normalized = self.normalize_email(email)
+        return email
+
+    @staticmethod
+    def normalize_email(email: str) -> str:
+        """
+            Normalize an email address for lookups and uniqueness checks.
+
+            Args:
+                email (str): The email as entered.
+
+            Returns:
+                str: The trimmed, lower-cased email.
+        """
+        return email.strip().lower()
+
+    @classmethod
+    def create_if_absent(cls, name: str, email: str, password: str) -> Optional[Any]:
+        """
+            Create a user in a single statement unless the email is already registered.
+
+            Concurrent sign-ups with the same email cannot both succeed; the loser gets None rather than an
+            integrity error. Only a conflict on the email is ignored, any other one (e.g. on the uuid) raises.
+
+            Args:
+                name (str): The user's name.
+                email (str): The user's email address.
+                password (str): The user's hashed password.
+
+            Returns:
+                Optional[Any]: A row with the public user fields, or None if the email is taken.
+        """
+        return cls.insert_or_ignore(
+            values=cls._creation_values(name, email, password),
+            returning=[getattr(cls, field) for field in cls.serializer.fields],
+            conflict_columns=['email_normalized']
+        )
+
+    @classmethod
+    async def create_if_absent_async(cls, name: str, email: str, password: str) -> Optional[Any]:
+        """
+            Async variant of `create_if_absent`.
+        """
+        return await cls.insert_or_ignore_async(
+            values=cls._creation_values(name, email, password),
+            returning=[getattr(cls, field) for field in cls.serializer.fields],
+            conflict_columns=['email_normalized']
+        )
+
     @classmethod
-    def get_by_email(cls, email: str) -> 'User':
+    def _creation_values(cls, name: str, email: str, password: str) -> Dict[str, Any]:
+        """
+            Column values of a new user.
         """
-            Filter records by email.
+        return {
+            'name': name,
+            'email': email,
+            'email_normalized': cls.normalize_email(email),
+            'password': password,
+        }
+
+    @classmethod
+    def get_by_email(cls, email: str, with_password: bool = False) -> 'User':
+        """
+            Filter records by email, ignoring case and surrounding whitespace.
+
+            Reads from a replica when one is configured, asking the primary again if the replica has no match.
 
             Args:
                 email (str): The email of the user to filter by.
+                with_password (bool): Load the (deferred) password hash in the same query.
 
             Returns:
                 Any: The User object corresponding to the given email.
         """
-        return db.session.query(
-            User
-        ).filter(
-            User.email == email
-        ).first()
+        query = cls._email_query(email, with_password)
+        return replica_router.read(lambda: db.session.execute(query).scalars().first())
 
     @classmethod
-    def user_to_dict(cls, user: 'User') -> dict:
-        return {
-            'id': user.id,
-            'uuid': str(user.uuid),
-            'name': user.name,
-            'email': user.email,
-            'last_login_at': user.last_login_at.isoformat() if user.last_login_at else None,
-            'deactivated_at': user.deactivated_at.isoformat() if user.deactivated_at else None,
-            'created_at': user.created_at.isoformat(),
-            'updated_at': user.updated_at.isoformat() if user.updated_at else None,
+    async def get_by_email_async(cls, email: str, with_password: bool = False) -> 'User':
+        """
+            Async variant of `get_by_email`, always reading from the primary.
+        """
+        return (await async_db.session.execute(cls._email_query(email, with_password))).scalars().first()
+
+    @classmethod
+    def _email_query(cls, email: str, with_password: bool) -> Any:
+        """
+            Build the SELECT of `get_by_email`.
+        """
+        query = select(User).where(User.email_normalized == cls.normalize_email(email)).limit(1)
+        if with_password:
+            query = query.options(undefer(User.password))
+        return query
+
+    @classmethod
+    def get_snapshot(cls, id: int) -> Optional[UserSnapshot]:
+        """
+            Load the public fields of a user into a read-only `UserSnapshot`.
+
+            Selects only those columns (never the password hash) and builds no tracked ORM instance.
+
+            Args:
+                id (int): The user's primary key.
+
+            Returns:
+                Optional[UserSnapshot]: The snapshot, or None if the user does not exist.
+        """
+        return cls.project_by_id(id, cls.serializer.fields, into=UserSnapshot)
+
+    @classmethod
+    async def get_snapshot_async(cls, id: int) -> Optional[UserSnapshot]:
+        """
+            Async variant of `get_snapshot`, always reading from the primary.
+        """
+        return await cls.project_by_id_async(id, cls.serializer.fields, into=UserSnapshot)
+
+    @classmethod
+    def iter_page(
+            cls,
+            after_id: int = 0,
+            limit: int = 100,
+            filters: Optional[Dict[str, Any]] = None,
+            yield_per: int = 1000
+    ) -> Iterator[Any]:
+        """
+            Stream one keyset-paginated page of users ordered by id.
+
+            Rows are fetched with a server-side cursor in chunks of `yield_per`, and only the public columns
+            are selected (no password, no ORM instances), so memory stays flat regardless of the page size.
+
+            Args:
+                after_id (int): Return users with an id greater than this cursor.
+                limit (int): Maximum number of users to return.
+                filters (Optional[Dict[str, Any]]): Optional bounds, any of `created_after`, `created_before`,
+                    `last_login_after`, `last_login_before`, `deactivated_after`, `deactivated_before`
+                    (datetimes) and `deactivated` (bool).
+                yield_per (int): Number of rows fetched per round trip.
+
+            Returns:
+                Iterator[Any]: Row objects exposing the same attributes as `User` minus `password`.
+        """
+        filters = filters or {}
+        columns = [cls.id, cls.uuid, cls.name, cls.email, cls.last_login_at, cls.deactivated_at,
+                   cls.created_at, cls.updated_at]
+        bounds = {
+            'created_after': (cls.created_at, operator.ge),
+            'created_before': (cls.created_at, operator.lt),
+            'last_login_after': (cls.last_login_at, operator.ge),
+            'last_login_before': (cls.last_login_at, operator.lt),
+            'deactivated_after': (cls.deactivated_at, operator.ge),
+            'deactivated_before': (cls.deactivated_at, operator.lt),
         }
 
+        query = select(*columns).where(cls.id > after_id)
+        for key, (attribute, compare) in bounds.items():
+            if filters.get(key) is not None:
+                query = query.where(compare(attribute, filters[key]))
+        if filters.get('deactivated') is not None:
+            deactivated = cls.deactivated_at.isnot(None) if filters['deactivated'] else cls.deactivated_at.is_(None)
+            query = query.where(deactivated)
+
+        query = query.order_by(cls.id).limit(limit).execution_options(yield_per=yield_per)
+        return iter(db.session.execute(query))
+
+    serializer = ModelSerializer(
+        ('id', 'uuid', 'name', 'email', 'last_login_at', 'deactivated_at', 'created_at', 'updated_at')
+    )
+
+    @classmethod
+    def user_to_dict(cls, user: 'User') -> dict:
+        """
+        Serialize the public fields of a user.
+
+        Datetimes and the UUID are kept native and encoded by the application's JSON provider.
+
+        Args:
+            user (User): A user, `UserSnapshot` or row exposing the same attributes.
+
+        Returns:
+            dict: The user's public fields.
+        """
+        return cls.serializer(user)
+
+    @staticmethod
+    def etag_parts(user: Any) -> Tuple[Any, ...]:
+        """
+        Return the values a user's serialized representation depends on, for its ETag.
+
+        Every change of the public fields sets `updated_at`, and logins set `last_login_at`.
+
+        Args:
+            user (User): A user, `UserSnapshot` or row exposing the same attributes.
+
+        Returns:
+            Tuple[Any, ...]: The ETag parts.
+        """
+        return user.id, user.updated_at, user.last_login_at
+
     def update_last_login(self) -> None:
         """
         Update the last login timestamp to the current time.
+
+        With `LAST_LOGIN_BUFFER.ENABLED` the timestamp is handed to `last_login_buffer` and written later in
+        a batched UPDATE (see `bulk_update_last_login`), so the login request does no write transaction.
+        """
+        last_login_at = datetime.utcnow()
+        if last_login_buffer.enabled:
+            # Set without marking the instance dirty, so a later commit does not write it synchronously
+            set_committed_value(self, 'last_login_at', last_login_at)
+            last_login_buffer.record(self.id, last_login_at)
+            return
+
+        self.last_login_at = last_login_at
+        db.session.commit()
+        token_cache.invalidate_user(self.id)
+
+    async def update_last_login_async(self) -> None:
         """
+        Async variant of `update_last_login`; a buffered timestamp needs no I/O and is recorded as there.
+        """
+        if last_login_buffer.enabled:
+            self.update_last_login()
+            return
+
         self.last_login_at = datetime.utcnow()
+        await async_db.session.commit()
+        token_cache.invalidate_user(self.id)
+
+    @classmethod
+    def bulk_update_last_login(cls, entries: List[Tuple[int, datetime]]) -> None:
+        """
+            Write buffered login timestamps in a single UPDATE statement.
+
+            A timestamp never moves `last_login_at` backwards, so batches flushed by different workers
+            can be applied in any order.
+
+            Args:
+                entries (List[Tuple[int, datetime]]): (user id, login timestamp) pairs.
+        """
+        if not entries:
+            return
+
+        table = cls.__table__
+        if db.session.get_bind().dialect.name == 'postgresql':
+            # UPDATE users SET last_login_at = v.last_login_at FROM (VALUES ...) AS v WHERE users.id = v.id
+            pending = values(
+                column('id', BigInteger), column('last_login_at', DateTime), name='pending_logins'
+            ).data(entries)
+            statement = update(table).where(
+                table.c.id == pending.c.id,
+                or_(table.c.last_login_at.is_(None), table.c.last_login_at < pending.c.last_login_at)
+            ).values(last_login_at=pending.c.last_login_at)
+            db.session.execute(statement)
+        else:
+            statement = update(table).where(
+                table.c.id == bindparam('user_id'),
+                or_(table.c.last_login_at.is_(None), table.c.last_login_at < bindparam('login_at'))
+            ).values(last_login_at=bindparam('login_at'))
+            db.session.execute(statement, [{'user_id': user_id, 'login_at': login_at} for user_id, login_at in entries])
         db.session.commit()
 
+        for user_id, _ in entries:
+            token_cache.invalidate_user(user_id)
+
     def deactivate(self) -> None:
         """
-        Mark the user as deactivated and update the deactivation timestamp.
+        Mark the user as deactivated and update the deactivation timestamp, revoking its refresh tokens.
         """
         self.deactivated_at = datetime.utcnow()
         db.session.commit()
+        token_cache.invalidate_user(self.id)
+        RefreshToken.revoke_user(self.id)
@@ -1,6 +1,10 @@
-from app.views.v1 import v1_blueprints
+from app.views.internal import internal_blueprints, MetricsView
+from app.views.v1 import v1_async_routes, v1_blueprints
 
 
 __all__ = [
+    'internal_blueprints',
+    'MetricsView',
+    'v1_async_routes',
     'v1_blueprints',
 ]
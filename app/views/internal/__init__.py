@@ -0,0 +1,19 @@
+from flask import Blueprint
+
+from app.views.internal.metrics_view import MetricsView
+from app.views.internal.stats_view import StatsView
+
+# Define blueprints
+internal_blueprints = Blueprint('internal', __name__)
+
+
+# Runtime statistics
+internal_blueprints.add_url_rule(
+    'stats', view_func=StatsView.get, methods=['GET'], endpoint='stats'
+)
+
+
+__all__ = [
+    'internal_blueprints',
+    'MetricsView',
+]
@@ -0,0 +1,38 @@
+import traceback
+
+from flask import current_app
+from flask.views import View
+
+from app import logger
+from app.helpers.decorators import allowed_ips_only
+from app.helpers.error_responses import send_error_response
+from app.helpers.metrics import request_metrics
+from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+
+
+class MetricsView(View):
+    @staticmethod
+    @allowed_ips_only('METRICS')
+    def get():
+        """
+        Expose request metrics of all worker processes in Prometheus text format.
+
+        Only served to the addresses listed in `METRICS.ALLOWED_IPS`.
+        """
+        try:
+            return current_app.response_class(
+                request_metrics.render(),
+                status=HttpStatusCode.OK.value,
+                mimetype='text/plain; version=0.0.4'
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while rendering metrics: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
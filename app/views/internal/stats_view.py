@@ -0,0 +1,71 @@
+import os
+import traceback
+
+from flask.views import View
+
+from app import logger
+from app.helpers.decorators import allowed_ips_only
+from app.helpers.async_db import async_db
+from app.helpers.compression import response_compression
+from app.helpers.error_responses import send_error_response
+from app.helpers.log_queue import queued_logging
+from app.helpers.password_hasher import import_password_hasher, password_hasher
+from app.helpers.pool_instrumentation import pool_instrumentation
+from app.helpers.rate_limit import rate_limiter
+from app.helpers.replica_routing import replica_router
+from app.helpers.revocation_index import revocation_index
+from app.helpers.token_cache import token_cache
+from app.helpers.utility import send_json_response
+from app.helpers.write_behind import last_login_buffer
+from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+
+
+class StatsView(View):
+    @staticmethod
+    @allowed_ips_only('INTERNAL_STATS')
+    def get():
+        """
+        Return the runtime statistics of this worker process.
+
+        Only served to the addresses listed in `INTERNAL_STATS.ALLOWED_IPS`. Each worker reports its own
+        pools and caches, so scrape every worker (or compare several responses) when tuning pool sizes.
+
+        Returns:
+            JSON response with connection pool, read replica routing, async engine, token cache, password hashing
+            (interactive and bulk import), write-behind, logging queue, refresh token revocation index, compression
+            and rate limit stats.
+        """
+        try:
+            stats = {
+                'pid': os.getpid(),
+                'database_pools': pool_instrumentation.snapshot(),
+                'database_replicas': replica_router.stats(),
+                'async_database': async_db.stats(),
+                'token_cache': token_cache.stats(),
+                'password_hashing': password_hasher.stats(),
+                'bulk_import_hashing': import_password_hasher.stats(),
+                'last_login_buffer': last_login_buffer.stats(),
+                'logging': queued_logging.stats(),
+                'refresh_token_revocations': revocation_index.stats(),
+                'compression': response_compression.stats(),
+                'rate_limits': rate_limiter.stats(),
+            }
+
+            return send_json_response(
+                http_status=HttpStatusCode.OK.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.SUCCESS.value,
+                data=stats,
+                error=None
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while collecting stats: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
@@ -1,5 +1,6 @@
 from flask import Blueprint
 
+from app.views.v1.async_user_view import AsyncUserView, AsyncTokenManagementView
 from app.views.v1.user_view import UserView, TokenManagementView
 
 # Define blueprints
@@ -23,4 +24,18 @@ v1_blueprints.add_url_rule(
 )
 v1_blueprints.add_url_rule(
     'user/details', view_func=UserView.get, methods=['GET'], endpoint='get_user_details'
-)
\ No newline at end of file
+)
+v1_blueprints.add_url_rule(
+    'users', view_func=UserView.list_users, methods=['GET'], endpoint='list_users'
+)
+v1_blueprints.add_url_rule(
+    'user/bulk', view_func=UserView.bulk_import, methods=['POST'], endpoint='bulk_import_users'
+)
+
+# Async variants served by the ASGI entry point (see `app.asgi`): endpoint -> (method, rule, handler)
+v1_async_routes = {
+    'refresh_token': ('POST', 'token/refresh-token', AsyncTokenManagementView.refresh_access_token),
+    'sign_up': ('POST', 'user/signup', AsyncUserView.sign_up),
+    'sign_in': ('POST', 'user/signin', AsyncUserView.sign_in),
+    'get_user_details': ('GET', 'user/details', AsyncUserView.get),
+}
@@ -0,0 +1,371 @@
+import asyncio
+import traceback
+import uuid
+from typing import Optional, Tuple
+
+import jwt
+from flask import current_app
+from werkzeug.http import parse_etags
+
+from app import logger
+from app.helpers.asgi import AsgiRequest, AsgiResponse, check_rate_limit, error_response, json_response, read_json
+from app.helpers.decorators import compute_etag
+from app.helpers.password_hasher import password_hasher, HashingServiceBusy
+from app.helpers.revocation_index import revocation_index
+from app.helpers.token_cache import token_cache, UserSnapshot
+from app.models.refresh_token import RefreshToken
+from app.models.user import User
+from app.views.v1.schemas import REFRESH_TOKEN_SCHEMA, SIGN_IN_SCHEMA, SIGN_UP_SCHEMA
+from app.views.v1.user_view import TokenManagementView
+from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
+
+
+async def authenticate(request: AsgiRequest) -> Tuple[Optional[UserSnapshot], Optional[AsgiResponse]]:
+    """
+    Validate the bearer token of a request, like `token_required` does for the sync views.
+
+    The user comes from `token_cache`, or is projected from the database on a miss.
+
+    Args:
+        request (AsgiRequest): The request.
+
+    Returns:
+        Tuple[Optional[UserSnapshot], Optional[AsgiResponse]]: The current user, or the error response.
+    """
+    token = request.headers.get('authorization')
+    if not token or not token.startswith('Bearer '):
+        return None, error_response(
+            http_status=HttpStatusCode.UNAUTHORIZED,
+            message_key=ResponseMessageKeys.INVALID_TOKEN,
+            error=ResponseErrorCodes.INVALID_TOKEN
+        )
+
+    token = token.split(' ')[1]
+    try:
+        cached = token_cache.get(token)
+        if cached:
+            return cached[1], None
+
+        data = jwt.decode(token, key=current_app.config['JWT']['SECRET_KEY'], algorithms=['HS256'])
+        if data.get('type') == 'refresh':
+            raise jwt.InvalidTokenError('Refresh tokens cannot be used as access tokens.')
+        current_user = await User.get_snapshot_async(data['id'])
+        if not current_user:
+            return None, error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.INVALID_TOKEN,
+                error=ResponseErrorCodes.INVALID_TOKEN
+            )
+
+        token_cache.set(token, data, current_user)
+        return current_user, None
+    except jwt.ExpiredSignatureError:
+        return None, error_response(
+            http_status=HttpStatusCode.UNAUTHORIZED,
+            message_key=ResponseMessageKeys.TOKEN_EXPIRED,
+            error=ResponseErrorCodes.EXPIRED_TOKEN
+        )
+    except jwt.InvalidTokenError:
+        return None, error_response(
+            http_status=HttpStatusCode.UNAUTHORIZED,
+            message_key=ResponseMessageKeys.INVALID_TOKEN,
+            error=None
+        )
+    except Exception as e:
+        logger.error('Error during token validation: %s', str(e))
+        return None, error_response(
+            http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+            message_key=ResponseMessageKeys.FAILED,
+            error=ResponseErrorCodes.SERVER_ERROR
+        )
+
+
+class AsyncTokenManagementView:
+    """Async variant of `TokenManagementView`, served by the ASGI entry point (see `app.asgi`)."""
+
+    @staticmethod
+    async def refresh_access_token(request: AsgiRequest) -> AsgiResponse:
+        """
+        Exchange a refresh token for a new access token and a new refresh token.
+
+        Same contract as `TokenManagementView.refresh_access_token`.
+        """
+        data, error = await read_json(request, REFRESH_TOKEN_SCHEMA)
+        if error:
+            return error
+
+        try:
+            decoded_token = jwt.decode(
+                data['refresh_token'], key=current_app.config['JWT']['SECRET_KEY'], algorithms=['HS256']
+            )
+            if decoded_token.get('type') != 'refresh':
+                raise jwt.InvalidTokenError('Not a refresh token.')
+            try:
+                jti, family_id = uuid.UUID(decoded_token['jti']), uuid.UUID(decoded_token['fam'])
+            except (KeyError, TypeError, ValueError):
+                raise jwt.InvalidTokenError('Refresh token without a valid jti/family.')
+
+            # Reloading the index queries the database synchronously, so that lookup runs in a thread
+            if revocation_index.needs_reload():
+                revoked = await asyncio.to_thread(revocation_index.is_revoked, family_id)
+            else:
+                revoked = revocation_index.is_revoked(family_id)
+            if revoked:
+                return error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.REFRESH_TOKEN_REVOKED,
+                    error=ResponseErrorCodes.REVOKED_TOKEN
+                )
+
+            successor = await RefreshToken.rotate_async(
+                jti=jti,
+                family_id=family_id,
+                user_id=decoded_token['id'],
+                expiration_minutes=current_app.config['JWT']['REFRESH_TOKEN_EXPIRE']
+            )
+            if successor is None:
+                if await RefreshToken.revoke_family_if_reused_async(jti, family_id):
+                    logger.warning('Refresh token reuse detected for user %s, family revoked.', decoded_token['id'])
+                    return error_response(
+                        http_status=HttpStatusCode.UNAUTHORIZED,
+                        message_key=ResponseMessageKeys.REFRESH_TOKEN_REVOKED,
+                        error=ResponseErrorCodes.REVOKED_TOKEN
+                    )
+                return error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN,
+                    error=ResponseErrorCodes.INVALID_TOKEN
+                )
+
+            new_access_token = TokenManagementView.create_token(
+                user_id=decoded_token['id'],
+                email=decoded_token['email'],
+                expiration_minutes=current_app.config['JWT']['ACCESS_TOKEN_EXPIRE'],
+                user_uuid=decoded_token.get('uuid')
+            )
+            new_refresh_token = TokenManagementView.create_refresh_token(
+                user_id=decoded_token['id'],
+                email=decoded_token['email'],
+                refresh_token=successor,
+                user_uuid=decoded_token.get('uuid')
+            )
+
+            return json_response(
+                http_status=HttpStatusCode.OK.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.TOKEN_REFRESHED.value,
+                data={'access_token': new_access_token, 'refresh_token': new_refresh_token}
+            )
+        except jwt.ExpiredSignatureError:
+            return error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.REFRESH_TOKEN_EXPIRED,
+                error=ResponseErrorCodes.EXPIRED_TOKEN
+            )
+        except jwt.InvalidTokenError:
+            return error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN,
+                error=ResponseErrorCodes.INVALID_TOKEN
+            )
+        except Exception as e:
+            logger.error(
+                'Error refreshing token: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+
+class AsyncUserView:
+    """
+    Async variant of the `UserView` endpoints that wait on the database, served by the ASGI entry point.
+
+    Responses (envelopes, status codes, error bodies, ETags) are the same as the sync views'. While a query
+    is in flight the event loop serves other requests, so concurrency is bounded by the connection pool
+    rather than by the worker's threads.
+    """
+
+    @staticmethod
+    async def create_auth_response(user: User) -> dict:
+        """
+        Async variant of `UserView.create_auth_response`.
+
+        Args:
+            user (User): The user object for whom the authentication response is created.
+
+        Returns:
+            dict: A dictionary containing 'access_token', 'refresh_token', and 'details' (user details).
+        """
+        access_token = TokenManagementView.create_token(
+            user_id=user.id,
+            email=user.email,
+            expiration_minutes=current_app.config['JWT']['ACCESS_TOKEN_EXPIRE'],
+            user_uuid=user.uuid
+        )
+        refresh_token = TokenManagementView.create_refresh_token(
+            user_id=user.id,
+            email=user.email,
+            refresh_token=await RefreshToken.issue_async(user.id, current_app.config['JWT']['REFRESH_TOKEN_EXPIRE']),
+            user_uuid=user.uuid
+        )
+
+        user_details = User.user_to_dict(user=user)
+        return {'access_token': access_token, 'refresh_token': refresh_token, 'details': user_details}
+
+    @staticmethod
+    async def rehash_password(user: User, password: str) -> None:
+        """
+        Async variant of `UserView.rehash_password`; failures are logged and ignored.
+
+        Args:
+            user (User): The user whose stored hash is outdated.
+            password (str): The verified plain text password.
+        """
+        try:
+            user.password = await password_hasher.hash_async(password)
+            await user.save_async()
+        except Exception as e:
+            logger.error('Error while re-hashing password for user %s: %s', user.id, str(e))
+
+    @staticmethod
+    async def sign_up(request: AsgiRequest) -> AsgiResponse:
+        """
+        Handle user registration, see `UserView.sign_up`.
+        """
+        data, error = await read_json(request, SIGN_UP_SCHEMA)
+        if error:
+            return error
+        error = await check_rate_limit(request, 'sign_up', email=User.normalize_email(data['email']))
+        if error:
+            return error
+
+        try:
+            hashed_password = await password_hasher.hash_async(data['password'])
+            user = await User.create_if_absent_async(name=data['name'], email=data['email'], password=hashed_password)
+            if user is None:
+                return error_response(
+                    http_status=HttpStatusCode.BAD_REQUEST,
+                    message_key=ResponseMessageKeys.EMAIL_EXISTS,
+                    error=ResponseErrorCodes.EMAIL_EXISTS
+                )
+
+            return json_response(
+                http_status=HttpStatusCode.CREATED.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.CREATED.value,
+                data=User.user_to_dict(user=user)
+            )
+        except HashingServiceBusy:
+            return error_response(
+                http_status=HttpStatusCode.SERVICE_UNAVAILABLE,
+                message_key=ResponseMessageKeys.SERVICE_BUSY,
+                error=ResponseErrorCodes.SERVICE_UNAVAILABLE
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while registering user. Exception details: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+    @staticmethod
+    async def sign_in(request: AsgiRequest) -> AsgiResponse:
+        """
+        Handle user sign-in, see `UserView.sign_in`.
+        """
+        data, error = await read_json(request, SIGN_IN_SCHEMA)
+        if error:
+            return error
+        error = await check_rate_limit(request, 'sign_in', email=User.normalize_email(data['email']))
+        if error:
+            return error
+
+        try:
+            email = data['email']
+            password = data['password']
+
+            user = await User.get_by_email_async(email=email, with_password=True)
+            if not user or not await password_hasher.verify_async(user.password, password):
+                return error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.INVALID_CREDENTIALS,
+                    error=ResponseErrorCodes.INVALID_CREDENTIALS
+                )
+
+            if password_hasher.needs_rehash(user.password):
+                await AsyncUserView.rehash_password(user=user, password=password)
+
+            user_data = await AsyncUserView.create_auth_response(user=user)
+            await user.update_last_login_async()
+
+            return json_response(
+                http_status=HttpStatusCode.OK.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.LOGIN_SUCCESS.value,
+                data=user_data,
+                error=ResponseErrorCodes.SUCCESS.value
+            )
+        except HashingServiceBusy:
+            return error_response(
+                http_status=HttpStatusCode.SERVICE_UNAVAILABLE,
+                message_key=ResponseMessageKeys.SERVICE_BUSY,
+                error=ResponseErrorCodes.SERVICE_UNAVAILABLE
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while logging the user in. Exception details: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+    @staticmethod
+    async def get(request: AsgiRequest) -> AsgiResponse:
+        """
+        Get user details for the authenticated user, see `UserView.get`.
+
+        Served with the same ETag; a request whose `If-None-Match` matches gets an empty 304.
+        """
+        user, error = await authenticate(request)
+        if error:
+            return error
+
+        etag = compute_etag(User.etag_parts(user))
+        headers = {'ETag': f'"{etag}"', 'Cache-Control': 'private, no-cache'}
+        if parse_etags(request.headers.get('if-none-match')).contains_weak(etag):
+            return AsgiResponse(HttpStatusCode.NOT_MODIFIED.value, headers=headers)
+
+        try:
+            response = json_response(
+                http_status=HttpStatusCode.OK.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.SUCCESS.value,
+                data=User.user_to_dict(user=user)
+            )
+            response.headers.update(headers)
+            return response
+        except Exception as e:
+            logger.error(
+                'Error occurred while fetching user details: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
@@ -0,0 +1,31 @@
+from app.helpers.constants import ResponseErrorCodes, ResponseMessageKeys
+from app.helpers.request_schema import Field, RequestSchema
+
+# Password limits bound the hashing cost of a single request; the email length is the SMTP path limit.
+# Emails are stripped before the format check, as `User.normalize_email` would strip them anyway.
+SIGN_UP_SCHEMA = RequestSchema(
+    {
+        'name': Field(str, max_length=255),
+        'email': Field(str, max_length=254, format='email', strip=True),
+        'password': Field(str, max_length=1024),
+    },
+    max_content_length=4096
+)
+
+# No email format check on sign-in, so accounts created before it was enforced can still sign in
+SIGN_IN_SCHEMA = RequestSchema(
+    {
+        'email': Field(str, max_length=254, strip=True),
+        'password': Field(str, max_length=1024),
+    },
+    max_content_length=4096
+)
+
+# A missing or malformed token gets the same error as an invalid one, as before the schema was added
+REFRESH_TOKEN_SCHEMA = RequestSchema(
+    {
+        'refresh_token': Field(str, max_length=2048),
+    },
+    max_content_length=4096,
+    fixed_error=(ResponseMessageKeys.INVALID_REFRESH_TOKEN, ResponseErrorCodes.INVALID_TOKEN)
+)
@@ -1,22 +1,31 @@
 import traceback
+import uuid
 from datetime import datetime, timedelta
+from typing import Any, Dict, Iterator, Tuple
 
 import jwt
-from flask import request
+from flask import request, current_app, stream_with_context
 from flask.views import View
 
-from werkzeug.security import generate_password_hash, check_password_hash
-
-from app import logger, config_contents
-from app.helpers.decorators import token_required
+from app import logger
+from app.helpers.decorators import (
+    allowed_ips_only, conditional_get, internal_key_required, rate_limited, read_only, token_required, validate_json
+)
+from app.helpers.identity import get_current_user
+from app.helpers.password_hasher import password_hasher, HashingServiceBusy
+from app.helpers.revocation_index import revocation_index
+from app.helpers.user_import import UserImporter
+from app.models.refresh_token import RefreshToken
 from app.models.user import User
-from app.helpers.utility import send_json_response, validate_required_fields
+from app.views.v1.schemas import REFRESH_TOKEN_SCHEMA, SIGN_IN_SCHEMA, SIGN_UP_SCHEMA
+from app.helpers.error_responses import send_error_response
+from app.helpers.utility import send_json_response
 from app.helpers.constants import HttpStatusCode, ResponseMessageKeys, ResponseErrorCodes
 
 
 class TokenManagementView(View):
     @staticmethod
-    def create_token(user_id, email, expiration_minutes):
+    def create_token(user_id, email, expiration_minutes, user_uuid=None):
         """
         Helper method to create a JWT token.
 
@@ -24,6 +33,7 @@ class TokenManagementView(View):
             user_id (int): The ID of the user.
             email (str): The email of the user.
             expiration_minutes (int): The expiration time in minutes.
+            user_uuid (Optional[UUID]): The public UUID of the user, carried so claims-only views need no lookup.
 
         Returns:
             str: The encoded JWT token.
@@ -32,68 +42,117 @@ class TokenManagementView(View):
         return jwt.encode({
             'id': user_id,
             'email': email,
+            'uuid': str(user_uuid) if user_uuid else None,
             'exp': exp_time
-        }, key=config_contents['JWT']['SECRET_KEY'])
+        }, key=current_app.config['JWT']['SECRET_KEY'])
 
     @staticmethod
-    def refresh_access_token():
+    def create_refresh_token(user_id, email, refresh_token, user_uuid=None):
         """
-        Refresh the access token using a valid refresh token.
+        Helper method to encode a stored refresh token as a JWT.
+
+        Args:
+            user_id (int): The ID of the user.
+            email (str): The email of the user.
+            refresh_token (RefreshToken): The stored token, providing the `jti`, family and expiry.
+            user_uuid (Optional[UUID]): The public UUID of the user.
+
+        Returns:
+            str: The encoded JWT token.
         """
-        data = request.get_json()
-        refresh_token = data.get('refresh_token')
+        return jwt.encode({
+            'id': user_id,
+            'email': email,
+            'uuid': str(user_uuid) if user_uuid else None,
+            'jti': str(refresh_token.jti),
+            'fam': str(refresh_token.family_id),
+            'type': 'refresh',
+            'exp': refresh_token.expires_at
+        }, key=current_app.config['JWT']['SECRET_KEY'])
 
-        if not refresh_token:
-            return send_json_response(
-                http_status=HttpStatusCode.BAD_REQUEST.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN.value,
-                data=None,
-                error=ResponseErrorCodes.INVALID_TOKEN.value
-            )
+    @staticmethod
+    @validate_json(REFRESH_TOKEN_SCHEMA)
+    def refresh_access_token(data: Dict[str, Any]):
+        """
+        Exchange a refresh token for a new access token and a new refresh token.
+
+        The presented token is rotated: it cannot be used again, and presenting it again revokes its whole
+        family. The new tokens are built from the claims, so no user is loaded.
+
+        Request Body:
+            - refresh_token (str): The refresh token.
+        """
+        refresh_token = data['refresh_token']
 
         try:
             # Decode the refresh token
-            decoded_token = jwt.decode(refresh_token, key=config_contents['JWT']['SECRET_KEY'], algorithms=['HS256'])
-            user_id = decoded_token['id']
+            decoded_token = jwt.decode(refresh_token, key=current_app.config['JWT']['SECRET_KEY'], algorithms=['HS256'])
+            if decoded_token.get('type') != 'refresh':
+                raise jwt.InvalidTokenError('Not a refresh token.')
+            try:
+                jti, family_id = uuid.UUID(decoded_token['jti']), uuid.UUID(decoded_token['fam'])
+            except (KeyError, TypeError, ValueError):
+                raise jwt.InvalidTokenError('Refresh token without a valid jti/family.')
+
+            # Revoked families are usually rejected from memory, without a database round trip
+            if revocation_index.is_revoked(family_id):
+                return send_error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.REFRESH_TOKEN_REVOKED,
+                    error=ResponseErrorCodes.REVOKED_TOKEN
+                )
 
-            # Fetch user and generate new access token
-            user = User.get_by_id(user_id)
-            if not user:
-                return send_json_response(
-                    http_status=HttpStatusCode.UNAUTHORIZED.value,
-                    response_status=False,
-                    message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN.value,
-                    data=None,
-                    error=ResponseErrorCodes.INVALID_TOKEN.value
+            successor = RefreshToken.rotate(
+                jti=jti,
+                family_id=family_id,
+                user_id=decoded_token['id'],
+                expiration_minutes=current_app.config['JWT']['REFRESH_TOKEN_EXPIRE']
+            )
+            if successor is None:
+                if RefreshToken.revoke_family_if_reused(jti, family_id):
+                    logger.warning('Refresh token reuse detected for user %s, family revoked.', decoded_token['id'])
+                    return send_error_response(
+                        http_status=HttpStatusCode.UNAUTHORIZED,
+                        message_key=ResponseMessageKeys.REFRESH_TOKEN_REVOKED,
+                        error=ResponseErrorCodes.REVOKED_TOKEN
+                    )
+                return send_error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN,
+                    error=ResponseErrorCodes.INVALID_TOKEN
                 )
 
             new_access_token = TokenManagementView.create_token(
-                user_id=user.id, email=user.email, expiration_minutes=config_contents['JWT']['ACCESS_TOKEN_EXPIRE']
+                user_id=decoded_token['id'],
+                email=decoded_token['email'],
+                expiration_minutes=current_app.config['JWT']['ACCESS_TOKEN_EXPIRE'],
+                user_uuid=decoded_token.get('uuid')
+            )
+            new_refresh_token = TokenManagementView.create_refresh_token(
+                user_id=decoded_token['id'],
+                email=decoded_token['email'],
+                refresh_token=successor,
+                user_uuid=decoded_token.get('uuid')
             )
 
             return send_json_response(
                 http_status=HttpStatusCode.OK.value,
                 response_status=True,
                 message_key=ResponseMessageKeys.TOKEN_REFRESHED.value,
-                data={'access_token': new_access_token},
+                data={'access_token': new_access_token, 'refresh_token': new_refresh_token},
                 error=None
             )
         except jwt.ExpiredSignatureError:
-            return send_json_response(
-                http_status=HttpStatusCode.UNAUTHORIZED.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.REFRESH_TOKEN_EXPIRED.value,
-                data=None,
-                error=ResponseErrorCodes.EXPIRED_TOKEN.value
+            return send_error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.REFRESH_TOKEN_EXPIRED,
+                error=ResponseErrorCodes.EXPIRED_TOKEN
             )
         except jwt.InvalidTokenError:
-            return send_json_response(
-                http_status=HttpStatusCode.UNAUTHORIZED.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN.value,
-                data=None,
-                error=ResponseErrorCodes.INVALID_TOKEN.value
+            return send_error_response(
+                http_status=HttpStatusCode.UNAUTHORIZED,
+                message_key=ResponseMessageKeys.INVALID_REFRESH_TOKEN,
+                error=ResponseErrorCodes.INVALID_TOKEN
             )
         except Exception as e:
             logger.error(
@@ -101,16 +160,19 @@ class TokenManagementView(View):
                 str(e),
                 traceback.format_exc()
             )
-            return send_json_response(
-                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.FAILED.value,
-                data=None,
-                error=ResponseErrorCodes.SERVER_ERROR.value
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
             )
 
 
 class UserView(View):
+    listing_datetime_filters = (
+        'created_after', 'created_before', 'last_login_after', 'last_login_before',
+        'deactivated_after', 'deactivated_before',
+    )
+
     @staticmethod
     def create_auth_response(user: User) -> dict:
         """
@@ -123,10 +185,16 @@ class UserView(View):
             dict: A dictionary containing 'access_token', 'refresh_token', and 'details' (user details).
         """
         access_token = TokenManagementView.create_token(
-            user_id=user.id, email=user.email, expiration_minutes=config_contents['JWT']['ACCESS_TOKEN_EXPIRE']
+            user_id=user.id,
+            email=user.email,
+            expiration_minutes=current_app.config['JWT']['ACCESS_TOKEN_EXPIRE'],
+            user_uuid=user.uuid
         )
-        refresh_token = TokenManagementView.create_token(
-            user_id=user.id, email=user.email, expiration_minutes=config_contents['JWT']['REFRESH_TOKEN_EXPIRE']
+        refresh_token = TokenManagementView.create_refresh_token(
+            user_id=user.id,
+            email=user.email,
+            refresh_token=RefreshToken.issue(user.id, current_app.config['JWT']['REFRESH_TOKEN_EXPIRE']),
+            user_uuid=user.uuid
         )
 
         user_details = User.user_to_dict(user=user)
@@ -134,51 +202,49 @@ class UserView(View):
 
 
     @staticmethod
-    def sign_up():
+    def rehash_password(user: User, password: str) -> None:
+        """
+        Re-hash a password with the current hashing parameters and store it.
+
+        Failures are logged and ignored, the user keeps the old hash and is upgraded on a later login.
+
+        Args:
+            user (User): The user whose stored hash is outdated.
+            password (str): The verified plain text password.
+        """
+        try:
+            user.password = password_hasher.hash(password)
+            user.save()
+        except Exception as e:
+            logger.error('Error while re-hashing password for user %s: %s', user.id, str(e))
+
+    @staticmethod
+    @validate_json(SIGN_UP_SCHEMA)
+    @rate_limited('sign_up')
+    def sign_up(data: Dict[str, Any]):
         """
         Handle user registration.
 
-        Request Body:
+        Request Body (validated by `SIGN_UP_SCHEMA`):
             - name (str): The name of the user.
             - email (str): The email address of the user.
             - password (str): The password for the user account.
         """
         try:
-            data = request.get_json()
-
-            # Required fields
-            required_fields = ['name', 'email', 'password']
-
-            # Validate input fields
-            validation_result = validate_required_fields(data, required_fields)
-            if validation_result['is_error']:
-                return send_json_response(
-                    http_status=HttpStatusCode.BAD_REQUEST.value,
-                    response_status=False,
-                    message_key=validation_result['data'],
-                    data=None,
-                    error=ResponseErrorCodes.INSUFFICIENT_DATA.value
-                )
-
             name = data['name']
             email = data['email']
             password = data['password']
 
-            # Check if user already exists
-            if User.get_by_email(email=email):
-                return send_json_response(
-                    http_status=HttpStatusCode.BAD_REQUEST.value,
-                    response_status=False,
-                    message_key=ResponseMessageKeys.EMAIL_EXISTS.value,
-                    data=None,
-                    error=ResponseErrorCodes.EMAIL_EXISTS.value
+            # Create the user in one INSERT ... ON CONFLICT DO NOTHING; an existing email returns no row
+            hashed_password = password_hasher.hash(password)
+            user = User.create_if_absent(name=name, email=email, password=hashed_password)
+            if user is None:
+                return send_error_response(
+                    http_status=HttpStatusCode.BAD_REQUEST,
+                    message_key=ResponseMessageKeys.EMAIL_EXISTS,
+                    error=ResponseErrorCodes.EMAIL_EXISTS
                 )
 
-            # Create and save the new user
-            hashed_password = generate_password_hash(password, method='pbkdf2:sha256')
-            user = User(name=name, email=email, password=hashed_password)
-            user.save()
-
             user_data = User.user_to_dict(user=user)
 
             return send_json_response(
@@ -188,58 +254,52 @@ class UserView(View):
                 data=user_data,
                 error=None
             )
+        except HashingServiceBusy:
+            return send_error_response(
+                http_status=HttpStatusCode.SERVICE_UNAVAILABLE,
+                message_key=ResponseMessageKeys.SERVICE_BUSY,
+                error=ResponseErrorCodes.SERVICE_UNAVAILABLE
+            )
         except Exception as e:
             logger.error(
                 'Error occurred while registering user. Exception details: %s\n%s',
                 str(e),
                 traceback.format_exc()
             )
-            return send_json_response(
-                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.FAILED.value,
-                data=None,
-                error=ResponseErrorCodes.SERVER_ERROR.value
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
             )
 
     @staticmethod
-    def sign_in():
+    @validate_json(SIGN_IN_SCHEMA)
+    @rate_limited('sign_in')
+    def sign_in(data: Dict[str, Any]):
         """
         Handle user sign-in.
 
-        Request Body:
+        Request Body (validated by `SIGN_IN_SCHEMA`):
             - email (str): The email address of the user.
             - password (str): The password for the user account.
         """
         try:
-            data = request.get_json()
-            required_fields = ['email', 'password']
-
-            # Validate input fields
-            validation_result = validate_required_fields(data, required_fields)
-            if validation_result['is_error']:
-                return send_json_response(
-                    http_status=HttpStatusCode.BAD_REQUEST.value,
-                    response_status=False,
-                    message_key=validation_result['data'],
-                    data=None,
-                    error=ResponseErrorCodes.INSUFFICIENT_DATA.value
-                )
-
             email = data['email']
             password = data['password']
 
             # Fetch the user by email
-            user = User.get_by_email(email=email)
-            if not user or not check_password_hash(user.password, password):
-                return send_json_response(
-                    http_status=HttpStatusCode.UNAUTHORIZED.value,
-                    response_status=False,
-                    message_key=ResponseMessageKeys.INVALID_CREDENTIALS.value,
-                    data=None,
-                    error=ResponseErrorCodes.INVALID_CREDENTIALS.value
+            user = User.get_by_email(email=email, with_password=True)
+            if not user or not password_hasher.verify(user.password, password):
+                return send_error_response(
+                    http_status=HttpStatusCode.UNAUTHORIZED,
+                    message_key=ResponseMessageKeys.INVALID_CREDENTIALS,
+                    error=ResponseErrorCodes.INVALID_CREDENTIALS
                 )
 
+            # Upgrade hashes created with outdated parameters while the plain password is at hand
+            if password_hasher.needs_rehash(user.password):
+                UserView.rehash_password(user=user, password=password)
+
             user_data = UserView.create_auth_response(user=user)
 
             # Update last login time
@@ -252,43 +312,46 @@ class UserView(View):
                 data=user_data,
                 error=ResponseErrorCodes.SUCCESS.value
             )
+        except HashingServiceBusy:
+            return send_error_response(
+                http_status=HttpStatusCode.SERVICE_UNAVAILABLE,
+                message_key=ResponseMessageKeys.SERVICE_BUSY,
+                error=ResponseErrorCodes.SERVICE_UNAVAILABLE
+            )
         except Exception as e:
             logger.error(
                 'Error occurred while logging the user in. Exception details: %s\n%s',
                 str(e),
                 traceback.format_exc()
             )
-            return send_json_response(
-                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.FAILED.value,
-                data=None,
-                error=ResponseErrorCodes.SERVER_ERROR.value
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
             )
 
     @staticmethod
+    @read_only
     @token_required
+    @conditional_get(lambda current_user: User.etag_parts(current_user))
     def get(current_user: User):
         """
         Get user details for the authenticated user.
 
+        Served with an ETag; a request whose `If-None-Match` matches gets an empty 304.
+
         Returns:
             JSON response containing user details.
         """
         try:
-            # Get the current user's identity from the JWT
-            current_user_id = current_user.id
-
-            # Fetch user from the database
-            user = User.get_by_id(current_user_id)
+            # token_required has already loaded the user for this request
+            user = get_current_user()
 
             if not user:
-                return send_json_response(
-                    http_status=HttpStatusCode.NOT_FOUND.value,
-                    response_status=False,
-                    message_key=ResponseMessageKeys.USER_DOES_NOT_EXIST.value,
-                    data=None,
-                    error=ResponseErrorCodes.NOT_FOUND.value
+                return send_error_response(
+                    http_status=HttpStatusCode.NOT_FOUND,
+                    message_key=ResponseMessageKeys.USER_DOES_NOT_EXIST,
+                    error=ResponseErrorCodes.NOT_FOUND
                 )
 
             user_data = User.user_to_dict(user=user)
@@ -306,10 +369,203 @@ class UserView(View):
                 str(e),
                 traceback.format_exc()
             )
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+    @staticmethod
+    @allowed_ips_only('BULK_IMPORT')
+    @internal_key_required('BULK_IMPORT')
+    @token_required(claims_only=True)
+    def bulk_import(current_user):
+        """
+        Create users in bulk.
+
+        Only served to the addresses listed in `BULK_IMPORT.ALLOWED_IPS` presenting one of the
+        `BULK_IMPORT.API_KEYS`, and to at most `BULK_IMPORT.MAX_ROWS_PER_REQUEST` rows; larger imports go
+        through `flask users import`.
+
+        Request Body:
+            NDJSON (`application/x-ndjson`), one object per line with name, email and password, each validated
+            like a sign-up. The body is streamed and imported batch by batch, so it is never held in memory at once.
+
+        Returns:
+            JSON response with the import summary and per-row errors.
+        """
+        try:
+            importer = UserImporter.from_config(current_app.config, SIGN_UP_SCHEMA)
+            importer.max_rows = int((current_app.config.get('BULK_IMPORT') or {}).get('MAX_ROWS_PER_REQUEST', 50))
+            summary = importer.run(request.stream)
+
             return send_json_response(
-                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR.value,
-                response_status=False,
-                message_key=ResponseMessageKeys.FAILED.value,
-                data=None,
-                error=ResponseErrorCodes.SERVER_ERROR.value
-            )
\ No newline at end of file
+                http_status=HttpStatusCode.OK.value,
+                response_status=True,
+                message_key=ResponseMessageKeys.SUCCESS.value,
+                data=summary,
+                error=None
+            )
+        except HashingServiceBusy:
+            return send_error_response(
+                http_status=HttpStatusCode.SERVICE_UNAVAILABLE,
+                message_key=ResponseMessageKeys.SERVICE_BUSY,
+                error=ResponseErrorCodes.SERVICE_UNAVAILABLE
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while importing users: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+    @staticmethod
+    def parse_listing_args(args: Dict[str, Any]) -> Tuple[Dict[str, Any], Dict[str, str]]:
+        """
+        Parse and validate the query string of the user listing.
+
+        Args:
+            args (Dict[str, Any]): The request query arguments.
+
+        Returns:
+            Tuple[Dict[str, Any], Dict[str, str]]: The parsed parameters and a dict of field errors.
+        """
+        settings = current_app.config.get('USER_LISTING') or {}
+        max_page_size = int(settings.get('MAX_PAGE_SIZE', 1000))
+        params = {'after_id': 0, 'limit': int(settings.get('DEFAULT_PAGE_SIZE', 100)), 'filters': {}}
+        errors = {}
+
+        for field in ('after_id', 'limit'):
+            if args.get(field) in [None, '']:
+                continue
+            try:
+                params[field] = int(args[field])
+            except ValueError:
+                errors[field] = f'{field.replace("_", " ").title()} must be an integer.'
+
+        if params['after_id'] < 0:
+            errors['after_id'] = 'After Id must not be negative.'
+        if not 1 <= params['limit'] <= max_page_size:
+            errors['limit'] = f'Limit must be between 1 and {max_page_size}.'
+
+        for field in UserView.listing_datetime_filters:
+            if args.get(field) in [None, '']:
+                continue
+            try:
+                params['filters'][field] = datetime.fromisoformat(args[field])
+            except ValueError:
+                errors[field] = f'{field.replace("_", " ").title()} must be an ISO 8601 datetime.'
+
+        deactivated = args.get('deactivated')
+        if deactivated not in [None, '']:
+            if deactivated.lower() not in ('true', 'false'):
+                errors['deactivated'] = 'Deactivated must be true or false.'
+            else:
+                params['filters']['deactivated'] = deactivated.lower() == 'true'
+
+        return params, errors
+
+    @staticmethod
+    @allowed_ips_only('USER_LISTING')
+    @internal_key_required('USER_LISTING')
+    @read_only
+    @token_required(claims_only=True)
+    def list_users(current_user):
+        """
+        List users with keyset pagination.
+
+        Only served to the addresses listed in `USER_LISTING.ALLOWED_IPS` presenting one of the
+        `USER_LISTING.API_KEYS`, since it exposes every account.
+
+        Query Parameters:
+            - after_id (int): Cursor, only users with a greater id are returned (the `next_cursor` of the
+              previous page).
+            - limit (int): Page size, up to `USER_LISTING.MAX_PAGE_SIZE`.
+            - created_after / created_before (datetime): Bounds on `created_at`.
+            - last_login_after / last_login_before (datetime): Bounds on `last_login_at`.
+            - deactivated_after / deactivated_before (datetime): Bounds on `deactivated_at`.
+            - deactivated (bool): Only deactivated (true) or only active (false) users.
+
+        Returns:
+            Streamed JSON response in the usual envelope, with `next_cursor` set to null on the last page.
+        """
+        try:
+            params, errors = UserView.parse_listing_args(request.args)
+            if errors:
+                return send_json_response(
+                    http_status=HttpStatusCode.BAD_REQUEST.value,
+                    response_status=False,
+                    message_key=errors,
+                    data=None,
+                    error=ResponseErrorCodes.INVALID_DATA.value
+                )
+
+            settings = current_app.config.get('USER_LISTING') or {}
+            rows = User.iter_page(
+                after_id=params['after_id'],
+                limit=params['limit'],
+                filters=params['filters'],
+                yield_per=int(settings.get('YIELD_PER', 1000))
+            )
+
+            return current_app.response_class(
+                stream_with_context(UserView.stream_user_page(rows, limit=params['limit'])),
+                status=HttpStatusCode.OK.value,
+                mimetype='application/json'
+            )
+        except Exception as e:
+            logger.error(
+                'Error occurred while listing users: %s\n%s',
+                str(e),
+                traceback.format_exc()
+            )
+            return send_error_response(
+                http_status=HttpStatusCode.INTERNAL_SERVER_ERROR,
+                message_key=ResponseMessageKeys.FAILED,
+                error=ResponseErrorCodes.SERVER_ERROR
+            )
+
+    @staticmethod
+    def stream_user_page(rows: Iterator[Any], limit: int, rows_per_chunk: int = 500) -> Iterator[bytes]:
+        """
+        Encode a page of users as a JSON envelope, one chunk of rows at a time.
+
+        Args:
+            rows (Iterator[Any]): The users to encode, ordered by id.
+            limit (int): The requested page size, used to decide whether another page may exist.
+            rows_per_chunk (int): Number of users encoded per yielded chunk.
+
+        Returns:
+            Iterator[bytes]: Pieces of the response body.
+        """
+        dumps = current_app.json.dumps_bytes
+        yield b'{"status":"success","message":' + dumps(ResponseMessageKeys.SUCCESS.value) + b',"data":['
+
+        count = 0
+        last_id = None
+        separator = b''
+        chunk = []
+        try:
+            for row in rows:
+                chunk.append(dumps(User.user_to_dict(user=row)))
+                count += 1
+                last_id = row.id
+                if len(chunk) >= rows_per_chunk:
+                    yield separator + b','.join(chunk)
+                    separator = b','
+                    chunk = []
+        except Exception as e:
+            # Headers are already sent, so the only option left is to log and end the body early
+            logger.error('Error occurred while streaming users: %s\n%s', str(e), traceback.format_exc())
+            raise
+
+        if chunk:
+            yield separator + b','.join(chunk)
+
+        next_cursor = last_id if count == limit else None
+        yield b'],"next_cursor":' + dumps(next_cursor) + b'}'
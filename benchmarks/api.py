@@ -0,0 +1,334 @@
+"""
+Load test for the v1 API.
+
+Starts the app from `create_app()` in a separate process, behind a threaded HTTP server and against a local
+database stand-in (a temporary SQLite file unless `--database-uri` is given), seeds `--users` accounts and then
+drives these endpoints in order, each with `--requests` requests at a fixed `--concurrency`:
+
+    user/signup -> user/signin -> user/details -> token/refresh-token
+
+Sign-in uses the seeded accounts; details and refresh use the tokens returned by sign-in. For every endpoint
+the throughput and p50/p95/p99 latency are reported as JSON.
+
+Usage:
+    python -m benchmarks.api --users 1000 --requests 500 --concurrency 8 --output api.json
+    python -m benchmarks.api --baseline api.json --max-regression 0.15
+    python -m benchmarks.api --compare before.json after.json --max-regression 0.15
+"""
+
+import argparse
+import http.client
+import json
+import multiprocessing
+import os
+import random
+import statistics
+import sys
+import tempfile
+import threading
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SEED_PASSWORD = 'benchmark-password'
+
+
+def serve(database_uri, users, hash_method, ready, stop):
+    """
+    Server process: create the app, seed the users and serve it until `stop` is set.
+
+    :param database_uri: Database the app is configured with.
+    :param users: Number of accounts to seed.
+    :param hash_method: Optional password hash method overriding `PASSWORD_HASHING.METHOD`.
+    :param ready: Queue receiving the port (or an error message) once the server is listening.
+    :param stop: Event ending the server.
+    """
+    sys.path.insert(0, BASE_DIR)
+    try:
+        from sqlalchemy import insert
+        from werkzeug.serving import make_server
+
+        from app import create_app, db
+        from app.helpers.password_hasher import password_hasher
+        from app.helpers.write_behind import last_login_buffer
+        from app.models.user import User
+
+        # Every request comes from 127.0.0.1, so the per-IP sign-in/sign-up limits would reject most of the run
+        config_overrides = {'SQLALCHEMY_DATABASE_URI': database_uri, 'RATE_LIMITS': {'ENABLED': False}}
+        if database_uri.startswith('sqlite'):
+            config_overrides['SQLALCHEMY_ENGINE_OPTIONS'] = {}
+        application = create_app(config_overrides)
+        if hash_method:
+            password_hasher.method = hash_method
+
+        with application.app_context():
+            db.create_all()
+            # Every seeded account shares one hash, so seeding does not pay for N key derivations
+            password_hash = password_hasher.hash(SEED_PASSWORD)
+            rows = [
+                {
+                    'name': f'Benchmark User {index}',
+                    'email': f'bench-{index}@example.com',
+                    'email_normalized': f'bench-{index}@example.com',
+                    'password': password_hash,
+                }
+                for index in range(users)
+            ]
+            for start in range(0, len(rows), 1000):
+                db.session.execute(insert(User), rows[start:start + 1000])
+            db.session.commit()
+
+        server = make_server('127.0.0.1', 0, application, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        ready.put(server.server_port)
+        stop.wait()
+
+        # Process targets skip atexit, so stop the hashing pool and write-behind thread explicitly
+        server.shutdown()
+        password_hasher.shutdown()
+        last_login_buffer.shutdown()
+    except Exception as e:
+        ready.put(f'{type(e).__name__}: {e}')
+        raise
+
+
+class Client:
+    """Keep-alive HTTP/JSON client for one driver thread."""
+
+    def __init__(self, port):
+        self.connection = http.client.HTTPConnection('127.0.0.1', port, timeout=60)
+
+    def request(self, method, path, body=None, token=None):
+        """
+        Send one request and read the whole response.
+
+        :return: Tuple of (status, decoded JSON body or None).
+        """
+        headers = {'Content-Type': 'application/json'}
+        if token:
+            headers['Authorization'] = f'Bearer {token}'
+        try:
+            self.connection.request(method, f'/api/v1/{path}', body=json.dumps(body) if body else None, headers=headers)
+            response = self.connection.getresponse()
+            payload = response.read()
+        except (http.client.HTTPException, OSError):
+            self.connection.close()
+            return 0, None
+        try:
+            return response.status, json.loads(payload)
+        except ValueError:
+            return response.status, None
+
+
+def run_endpoint(port, concurrency, make_request):
+    """
+    Run a list of requests with a fixed number of concurrent clients.
+
+    :param port: Server port.
+    :param concurrency: Number of client threads.
+    :param make_request: List of callables `(client) -> (status, body)`, one per request.
+    :return: Tuple of (latencies in seconds, responses, elapsed wall time in seconds).
+    """
+    latencies = [0.0] * len(make_request)
+    responses = [None] * len(make_request)
+    next_index = iter(range(len(make_request)))
+    index_lock = threading.Lock()
+
+    def worker():
+        client = Client(port)
+        while True:
+            with index_lock:
+                index = next(next_index, None)
+            if index is None:
+                return
+            started_at = time.perf_counter()
+            responses[index] = make_request[index](client)
+            latencies[index] = time.perf_counter() - started_at
+
+    threads = [threading.Thread(target=worker) for _ in range(concurrency)]
+    started_at = time.perf_counter()
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return latencies, responses, time.perf_counter() - started_at
+
+
+def percentile(sorted_values, fraction):
+    """Return a percentile of sorted samples, in milliseconds."""
+    if not sorted_values:
+        return 0.0
+    index = min(int(len(sorted_values) * fraction), len(sorted_values) - 1)
+    return round(sorted_values[index] * 1000, 3)
+
+
+def summarize(latencies, responses, elapsed, ok_status):
+    """
+    Reduce one endpoint run to throughput and latency percentiles.
+
+    :return: Dictionary with request/error counts, requests per second and latency statistics (ms).
+    """
+    values = sorted(latencies)
+    errors = sum(1 for status, _ in responses if status != ok_status)
+    return {
+        'requests': len(values),
+        'errors': errors,
+        'throughput_rps': round(len(values) / elapsed, 2) if elapsed else 0.0,
+        'latency_ms': {
+            'p50': percentile(values, 0.50),
+            'p95': percentile(values, 0.95),
+            'p99': percentile(values, 0.99),
+            'mean': round(statistics.mean(values) * 1000, 3) if values else 0.0,
+            'max': round(values[-1] * 1000, 3) if values else 0.0,
+        },
+    }
+
+
+def run_benchmark(port, users, requests, concurrency, seed):
+    """
+    Drive the endpoints in order and collect their results.
+
+    :return: Dictionary of endpoint name to its summary.
+    """
+    rng = random.Random(seed)
+    run_id = f'{int(time.time())}-{os.getpid()}'
+    results = {}
+
+    signups = [
+        (lambda client, index=index: client.request('POST', 'user/signup', {
+            'name': f'Signup {index}', 'email': f'signup-{run_id}-{index}@example.com', 'password': SEED_PASSWORD,
+        }))
+        for index in range(requests)
+    ]
+    latencies, responses, elapsed = run_endpoint(port, concurrency, signups)
+    results['user/signup'] = summarize(latencies, responses, elapsed, 201)
+
+    signins = [
+        (lambda client, index=rng.randrange(users): client.request('POST', 'user/signin', {
+            'email': f'bench-{index}@example.com', 'password': SEED_PASSWORD,
+        }))
+        for _ in range(requests)
+    ]
+    latencies, responses, elapsed = run_endpoint(port, concurrency, signins)
+    results['user/signin'] = summarize(latencies, responses, elapsed, 200)
+
+    tokens = [body['data'] for status, body in responses if status == 200 and body]
+    if not tokens:
+        raise RuntimeError('No sign-in succeeded, cannot benchmark the authenticated endpoints.')
+
+    details = [
+        (lambda client, token=tokens[index % len(tokens)]['access_token']: client.request(
+            'GET', 'user/details', token=token
+        ))
+        for index in range(requests)
+    ]
+    latencies, responses, elapsed = run_endpoint(port, concurrency, details)
+    results['user/details'] = summarize(latencies, responses, elapsed, 200)
+
+    refreshes = [
+        (lambda client, token=tokens[index % len(tokens)]['refresh_token']: client.request(
+            'POST', 'token/refresh-token', {'refresh_token': token}
+        ))
+        for index in range(requests)
+    ]
+    latencies, responses, elapsed = run_endpoint(port, concurrency, refreshes)
+    results['token/refresh-token'] = summarize(latencies, responses, elapsed, 200)
+
+    return results
+
+
+def compare(result, baseline, max_regression):
+    """
+    Compare a result against a baseline.
+
+    A regression is a latency percentile that grew, or a throughput that shrank, by more than `max_regression`.
+
+    :param result: The current result.
+    :param baseline: A previous result.
+    :param max_regression: Allowed change as a fraction (0.15 = 15%).
+    :return: List of human-readable regressions, empty if none.
+    """
+    regressions = []
+    for endpoint, current in result['endpoints'].items():
+        previous = baseline['endpoints'].get(endpoint)
+        if previous is None:
+            continue
+        for metric in ('p50', 'p95', 'p99'):
+            before, after = previous['latency_ms'][metric], current['latency_ms'][metric]
+            if before and after > before * (1 + max_regression):
+                increase = (after / before - 1) * 100
+                regressions.append(f'{endpoint} {metric}: {before} ms -> {after} ms (+{increase:.1f}%)')
+        before, after = previous['throughput_rps'], current['throughput_rps']
+        if before and after < before * (1 - max_regression):
+            regressions.append(f'{endpoint} throughput: {before} -> {after} req/s ({(after / before - 1) * 100:.1f}%)')
+        if current['errors'] > previous['errors']:
+            regressions.append(f'{endpoint} errors: {previous["errors"]} -> {current["errors"]}')
+    return regressions
+
+
+def report_regressions(regressions):
+    """Print the regressions and exit non-zero if there are any."""
+    if regressions:
+        print('Performance regressed:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+        sys.exit(1)
+    print('No regressions.', file=sys.stderr)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test the v1 API.')
+    parser.add_argument('--users', type=int, default=1000, help='Accounts seeded before the run.')
+    parser.add_argument('--requests', type=int, default=500, help='Requests sent to each endpoint.')
+    parser.add_argument('--concurrency', type=int, default=8, help='Concurrent clients.')
+    parser.add_argument('--seed', type=int, default=1, help='Seed choosing which accounts sign in.')
+    parser.add_argument('--database-uri', help='Database to run against (default: a temporary SQLite file).')
+    parser.add_argument('--hash-method', help='Override PASSWORD_HASHING.METHOD, e.g. "pbkdf2:sha256:1000".')
+    parser.add_argument('--output', help='Write the JSON result to this file.')
+    parser.add_argument('--baseline', help='Previous result to compare against.')
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'RESULT'), help='Only compare two result files.')
+    parser.add_argument('--max-regression', type=float, default=0.15, help='Allowed change of a metric (fraction).')
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as baseline_file, open(args.compare[1]) as result_file:
+            report_regressions(compare(json.load(result_file), json.load(baseline_file), args.max_regression))
+        return
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_uri = args.database_uri or f'sqlite:///{os.path.join(temp_dir, "benchmark.db")}'
+        context = multiprocessing.get_context('spawn')
+        ready, stop = context.Queue(), context.Event()
+        server = context.Process(target=serve, args=(database_uri, args.users, args.hash_method, ready, stop))
+        server.start()
+        try:
+            port = ready.get(timeout=300)
+            if not isinstance(port, int):
+                raise RuntimeError(f'Server failed to start: {port}')
+            endpoints = run_benchmark(port, args.users, args.requests, args.concurrency, args.seed)
+        finally:
+            stop.set()
+            server.join(timeout=30)
+            if server.is_alive():
+                server.terminate()
+
+    result = {
+        'users': args.users,
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'database': database_uri.split(':', 1)[0],
+        'hash_method': args.hash_method,
+        'python': sys.version.split()[0],
+        'endpoints': endpoints,
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(result, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            report_regressions(compare(result, json.load(baseline_file), args.max_regression))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,258 @@
+"""
+Concurrency benchmark of the sync (WSGI) and async (ASGI) views at a given database latency.
+
+For each interface, one gunicorn worker is started through `main.run_production_server`, exactly as in production:
+`gthread` with `--threads` threads serving `create_app()`, then a uvicorn worker serving `app.asgi`. Both run against
+the same temporary SQLite file, whose connections wait `--latency-ms` before every statement to stand in for the
+network round trip to a database server: the sync driver blocks its thread for that long, the async driver awaits
+it. The token cache is disabled, so every `user/details` request runs its user lookup against the database.
+
+`--requests` requests are then sent to `user/details` by `--concurrency` concurrent clients, and the throughput and
+latency of both interfaces are reported as JSON, together with the throughput ratio. The sync worker can only have
+`--threads` queries in flight, the async one up to its connection pool (sized to `--concurrency`).
+
+Usage:
+    python -m benchmarks.async_views --latency-ms 5 20 50 --concurrency 64 --threads 4 --output async.json
+"""
+
+import argparse
+import asyncio
+import json
+import multiprocessing
+import os
+import socket
+import sqlite3
+import sys
+import tempfile
+import time
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+from benchmarks.api import SEED_PASSWORD, Client, run_endpoint, summarize  # noqa: E402
+
+SEED_EMAIL = 'bench@example.com'
+
+
+class LatencyCursor(sqlite3.Cursor):
+    """sqlite3 cursor that blocks for the configured latency before each statement."""
+
+    latency = 0.0
+
+    def execute(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().execute(*args, **kwargs)
+
+    def executemany(self, *args, **kwargs):
+        time.sleep(self.latency)
+        return super().executemany(*args, **kwargs)
+
+
+class LatencyConnection(sqlite3.Connection):
+    """sqlite3 connection handing out `LatencyCursor`s."""
+
+    def cursor(self, factory=None):
+        return super().cursor(factory or LatencyCursor)
+
+
+def async_latency_classes(latency):
+    """
+    Build aiosqlite connection/cursor classes that await `latency` seconds before each statement.
+
+    Defined on demand, so the sync run does not need aiosqlite.
+    :param latency: Seconds to wait.
+    :return: The connection class.
+    """
+    import aiosqlite
+
+    class AsyncLatencyCursor(aiosqlite.Cursor):
+        async def execute(self, *args, **kwargs):
+            await asyncio.sleep(latency)
+            return await super().execute(*args, **kwargs)
+
+        async def executemany(self, *args, **kwargs):
+            await asyncio.sleep(latency)
+            return await super().executemany(*args, **kwargs)
+
+    class AsyncLatencyConnection(aiosqlite.Connection):
+        async def cursor(self):
+            return AsyncLatencyCursor(self, await self._execute(self._conn.cursor))
+
+    return AsyncLatencyConnection
+
+
+def serve(interface, database_path, port, latency, threads, pool_size, log_path):
+    """
+    Server process: run one gunicorn worker of `interface` until terminated.
+
+    :param interface: `wsgi` or `asgi`.
+    :param database_path: SQLite file, already seeded.
+    :param port: Port to listen on.
+    :param latency: Seconds every statement waits.
+    :param threads: Threads of the worker (for `asgi`, those serving the routes passed to Flask).
+    :param pool_size: Connections of each engine's pool.
+    :param log_path: Application log file.
+    """
+    sys.path.insert(0, BASE_DIR)
+    from main import build_server_options, run_production_server
+
+    LatencyCursor.latency = latency
+    async_connection_class = async_latency_classes(latency) if interface == 'asgi' else None
+
+    async def async_connect():
+        return await async_connection_class(lambda: sqlite3.connect(database_path, check_same_thread=False), 64)
+
+    config_overrides = {
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {
+            'creator': lambda: sqlite3.connect(database_path, factory=LatencyConnection, check_same_thread=False)
+        },
+        'DATABASE_POOL': {'SIZE': pool_size, 'MAX_OVERFLOW': 0, 'TIMEOUT': 60},
+        'ASYNC_VIEWS': {'ENGINE_OPTIONS': {'async_creator': async_connect}},
+        'TOKEN_CACHE': {'MAX_SIZE': 0},
+        'RATE_LIMITS': {'ENABLED': False},
+        'METRICS': {'ENABLED': False},
+        'LOG_FILE_PATH': log_path,
+    }
+
+    def app_factory():
+        if interface == 'asgi':
+            from app.asgi import create_asgi_app
+
+            return create_asgi_app(config_overrides)
+        from app import create_app
+
+        return create_app(config_overrides)
+
+    options = build_server_options({
+        'INTERFACE': interface,
+        'BIND': f'127.0.0.1:{port}',
+        'WORKERS': 1,
+        'THREADS': threads,
+        'BACKLOG': 2048,
+        'KEEPALIVE': 30,
+        'TIMEOUT': 120,
+        'PRELOAD': True,
+    })
+    options['loglevel'] = 'warning'
+    run_production_server(options, app_factory=app_factory)
+
+
+def seed(database_path):
+    """
+    Create the schema and one account in the SQLite file.
+
+    :param database_path: SQLite file.
+    """
+    from app import create_app, db
+    from app.helpers.password_hasher import password_hasher
+    from app.models.user import User
+
+    application = create_app({
+        'SQLALCHEMY_DATABASE_URI': f'sqlite:///{database_path}',
+        'SQLALCHEMY_ENGINE_OPTIONS': {},
+        'LOG_FILE_PATH': os.path.join(os.path.dirname(database_path), 'seed.log'),
+    })
+    with application.app_context():
+        db.create_all()
+        User.create_if_absent('Benchmark User', SEED_EMAIL, password_hasher.hash(SEED_PASSWORD))
+
+
+def free_port():
+    """Return a port nothing listens on right now."""
+    with socket.socket() as probe:
+        probe.bind(('127.0.0.1', 0))
+        return probe.getsockname()[1]
+
+
+def wait_until_listening(port, server, timeout=60):
+    """Wait until the server accepts connections, failing early if its process died."""
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if not server.is_alive():
+            raise RuntimeError(f'Server exited with code {server.exitcode}')
+        try:
+            socket.create_connection(('127.0.0.1', port), timeout=1).close()
+            return
+        except OSError:
+            time.sleep(0.1)
+    raise RuntimeError('Server did not start listening in time')
+
+
+def run_interface(interface, database_path, latency, args):
+    """
+    Start one server, sign in, and drive `user/details`.
+
+    :return: Summary of the run, see `benchmarks.api.summarize`.
+    """
+    port = free_port()
+    context = multiprocessing.get_context('spawn')
+    server = context.Process(target=serve, args=(
+        interface, database_path, port, latency, args.threads, max(args.concurrency, 5),
+        os.path.join(os.path.dirname(database_path), f'{interface}.log')
+    ))
+    server.start()
+    try:
+        wait_until_listening(port, server)
+        status, body = Client(port).request('POST', 'user/signin', {'email': SEED_EMAIL, 'password': SEED_PASSWORD})
+        if status != 200:
+            raise RuntimeError(f'Sign-in failed on the {interface} server: {status} {body}')
+        token = body['data']['access_token']
+
+        # Warm up every client connection and the pools before measuring
+        warmup = [lambda client: client.request('GET', 'user/details', token=token)] * args.concurrency
+        run_endpoint(port, args.concurrency, warmup)
+
+        details = [lambda client: client.request('GET', 'user/details', token=token)] * args.requests
+        latencies, responses, elapsed = run_endpoint(port, args.concurrency, details)
+        return summarize(latencies, responses, elapsed, 200)
+    finally:
+        server.terminate()
+        server.join(timeout=30)
+        if server.is_alive():
+            server.kill()
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Compare the sync and async views at a given database latency.')
+    parser.add_argument('--latency-ms', type=float, nargs='+', default=[20.0], help='Database latency per statement.')
+    parser.add_argument('--requests', type=int, default=2000, help='Requests sent to each server.')
+    parser.add_argument('--concurrency', type=int, default=64, help='Concurrent clients.')
+    parser.add_argument('--threads', type=int, default=4, help='Threads of the sync worker.')
+    parser.add_argument('--output', help='Write the JSON result to this file.')
+    args = parser.parse_args()
+
+    runs = []
+    with tempfile.TemporaryDirectory() as temp_dir:
+        database_path = os.path.join(temp_dir, 'benchmark.db')
+        seed(database_path)
+        for latency_ms in args.latency_ms:
+            results = {
+                interface: run_interface(interface, database_path, latency_ms / 1000, args)
+                for interface in ('wsgi', 'asgi')
+            }
+            sync_rps, async_rps = results['wsgi']['throughput_rps'], results['asgi']['throughput_rps']
+            runs.append({
+                'latency_ms': latency_ms,
+                'wsgi': results['wsgi'],
+                'asgi': results['asgi'],
+                'throughput_ratio': round(async_rps / sync_rps, 2) if sync_rps else None,
+            })
+
+    result = {
+        'endpoint': 'user/details',
+        'requests': args.requests,
+        'concurrency': args.concurrency,
+        'threads': args.threads,
+        'python': sys.version.split()[0],
+        'runs': runs,
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(result, output_file, indent=2)
+
+
+if __name__ == '__main__':
+    main()
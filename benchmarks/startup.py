@@ -0,0 +1,119 @@
+"""
+Startup-time benchmark.
+
+Measures, in fresh interpreter processes, how long `import app` and `create_app()` take, and optionally fails
+when either regressed against a previous result file.
+
+Usage:
+    python -m benchmarks.startup --runs 10 --output startup.json
+    python -m benchmarks.startup --baseline startup.json --max-regression 0.2
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Executed in a child process so every sample pays the full, uncached import cost
+PROBE = '''
+import json, sys, time
+started = time.perf_counter()
+import app
+imported = time.perf_counter()
+app.create_app(json.loads(sys.argv[1]))
+created = time.perf_counter()
+print(json.dumps({"import_s": imported - started, "create_app_s": created - imported}))
+'''
+
+
+def run_probe(config_overrides):
+    """
+    Time one cold import and factory call.
+
+    :param config_overrides: Settings passed to `create_app()`.
+    :return: Dictionary with `import_s` and `create_app_s`.
+    """
+    output = subprocess.run(
+        [sys.executable, '-c', PROBE, json.dumps(config_overrides)],
+        cwd=BASE_DIR, check=True, capture_output=True, text=True
+    ).stdout
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def summarize(samples):
+    """
+    Reduce the samples of one measurement to median/min/max.
+
+    :param samples: List of durations in seconds.
+    :return: Dictionary of statistics in milliseconds.
+    """
+    return {
+        'median_ms': round(statistics.median(samples) * 1000, 3),
+        'min_ms': round(min(samples) * 1000, 3),
+        'max_ms': round(max(samples) * 1000, 3),
+    }
+
+
+def compare(result, baseline, max_regression):
+    """
+    Compare medians against a baseline result.
+
+    :param result: The current result.
+    :param baseline: A previous result.
+    :param max_regression: Allowed slowdown as a fraction (0.2 = 20%).
+    :return: List of human-readable regressions, empty if none.
+    """
+    regressions = []
+    for metric in ('import', 'create_app', 'total'):
+        current = result[metric]['median_ms']
+        previous = baseline[metric]['median_ms']
+        if previous and current > previous * (1 + max_regression):
+            regressions.append(f'{metric}: {previous} ms -> {current} ms (+{(current / previous - 1) * 100:.1f}%)')
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Measure app import and factory time.')
+    parser.add_argument('--runs', type=int, default=10, help='Number of fresh processes to sample.')
+    parser.add_argument('--database-uri', default='sqlite://', help='Database URI used by create_app().')
+    parser.add_argument('--output', help='Write the JSON result to this file.')
+    parser.add_argument('--baseline', help='Previous result to compare against.')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Allowed slowdown of a median (fraction).')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        config_overrides = {
+            'SQLALCHEMY_DATABASE_URI': args.database_uri,
+            'METRICS': {'ENABLED': False},
+            'LOG_FILE_PATH': os.path.join(temp_dir, 'app.log'),
+        }
+        samples = [run_probe(config_overrides) for _ in range(args.runs)]
+
+    result = {
+        'runs': args.runs,
+        'python': sys.version.split()[0],
+        'import': summarize([sample['import_s'] for sample in samples]),
+        'create_app': summarize([sample['create_app_s'] for sample in samples]),
+        'total': summarize([sample['import_s'] + sample['create_app_s'] for sample in samples]),
+    }
+
+    print(json.dumps(result, indent=2))
+    if args.output:
+        with open(args.output, 'w') as output_file:
+            json.dump(result, output_file, indent=2)
+
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            regressions = compare(result, json.load(baseline_file), args.max_regression)
+        if regressions:
+            print('Startup time regressed:\n  ' + '\n  '.join(regressions), file=sys.stderr)
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
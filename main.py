@@ -3,32 +3,122 @@ Main entry point for the Flask application.
 
 This script initializes the Flask application by calling `create_app` from the `app` module and runs it.
 It also sets up environment-specific configurations and ensures that the application runs with proper settings.
+
+With `FLASK_ENV=production` the app is served by gunicorn (multiple worker processes with threads, configured
+by the `SERVER` section of `config.yml`); any other environment uses the Flask development server.
+`SERVER.INTERFACE: asgi` serves the ASGI entry point (`app.asgi`) instead, on uvicorn workers in production and on
+a single uvicorn process otherwise.
 """
 
 import os
 import logging
-from app import create_app
+from app import create_app, load_config, post_fork, prepare_for_fork
 
 # Configure logging for the application startup
 logging.basicConfig(level=logging.INFO,
                     format='%(asctime)s - %(levelname)s - %(message)s')
 
+# `SERVER` config keys and the gunicorn settings they map to
+SERVER_SETTINGS = {
+    'BIND': 'bind',
+    'WORKERS': 'workers',
+    'THREADS': 'threads',
+    'BACKLOG': 'backlog',
+    'KEEPALIVE': 'keepalive',
+    'TIMEOUT': 'timeout',
+    'GRACEFUL_TIMEOUT': 'graceful_timeout',
+    'MAX_REQUESTS': 'max_requests',
+    'MAX_REQUESTS_JITTER': 'max_requests_jitter',
+    'PRELOAD': 'preload_app',
+}
+
+
+def build_server_options(server_config):
+    """
+    Translate the `SERVER` config section into gunicorn settings.
+
+    :param server_config: The `SERVER` section of the configuration.
+    :return: Dictionary of gunicorn settings, unset keys are left to gunicorn's defaults.
+    """
+    options = {
+        setting: server_config[key]
+        for key, setting in SERVER_SETTINGS.items()
+        if server_config.get(key) is not None
+    }
+    if server_config.get('INTERFACE', 'wsgi') == 'asgi':
+        # An event loop per worker; THREADS then only sizes the pool running the routes passed to Flask
+        options['worker_class'] = 'uvicorn.workers.UvicornWorker'
+    else:
+        # The threaded worker is what makes THREADS effective, and handles keep-alive connections
+        options['worker_class'] = 'gthread'
+    options['pre_fork'] = lambda server, worker: prepare_for_fork()
+    options['post_fork'] = lambda server, worker: post_fork()
+    return options
+
+
+def run_production_server(options, app_factory=create_app):
+    """
+    Serve the app with gunicorn.
+
+    The master supervises the workers: it replaces workers that die or reach `max_requests`, reloads them
+    gracefully on SIGHUP, and shuts down gracefully on SIGTERM. With `preload_app` the app is created once
+    in the master and shared copy-on-write, in which case SIGHUP restarts the workers but not the app code.
+
+    :param options: gunicorn settings, see `build_server_options`.
+    :param app_factory: Creates the served app, `create_app` or (for uvicorn workers) `app.asgi.create_asgi_app`.
+    """
+    from gunicorn.app.base import BaseApplication
+
+    class ProductionServer(BaseApplication):
+        """gunicorn application serving `app_factory()` with settings taken from `config.yml`."""
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app_factory()
+
+    ProductionServer().run()
+
+
 def main():
     """
     Main entry point to start the Flask application.
 
-    Reads environment variables to configure the application and starts the Flask development server.
+    Reads environment variables to configure the application and starts either the production server or the
+    Flask development server.
     """
     # Fetch the environment from environment variables or default to 'development'
     environment = os.environ.get('FLASK_ENV', 'development')
     logging.info(f'Starting application in {environment} mode')
 
-    # Create a Flask application instance
-    app = create_app()
-
     # Run the application
     try:
-        app.run(host='0.0.0.0', debug=(environment != 'production'))
+        server_config = load_config().get('SERVER') or {}
+        asgi = server_config.get('INTERFACE', 'wsgi') == 'asgi'
+        if environment == 'production':
+            options = build_server_options(server_config)
+            logging.info(
+                f'Serving on {options.get("bind")} with {options.get("workers")} {options["worker_class"]} workers '
+                f'x {options.get("threads")} threads'
+            )
+            if asgi:
+                from app.asgi import create_asgi_app
+
+                run_production_server(options, app_factory=create_asgi_app)
+            else:
+                run_production_server(options)
+        elif asgi:
+            import uvicorn
+
+            from app.asgi import create_asgi_app
+
+            uvicorn.run(create_asgi_app(), host='0.0.0.0', port=5000)
+        else:
+            # Create a Flask application instance
+            app = create_app()
+            app.run(host='0.0.0.0', debug=True)
     except Exception as e:
         logging.error(f'Application encountered an error: {e}')
         raise
@@ -0,0 +1,72 @@
+"""add_users_email_normalized
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 10:00:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Rows updated per backfill batch; each batch commits on its own so no long transaction holds row locks
+BACKFILL_BATCH_SIZE = 10000
+
+
+def backfill(connection):
+    """
+    Fill `email_normalized` where it is still NULL, batch by batch.
+
+    Normalized in Python with `str.strip().lower()`, as `User.normalize_email` did when this revision was
+    written: SQL `lower`/`trim` differ from it on non-ASCII letters and non-space whitespace, and rows normalized
+    differently could no longer be found by `User.get_by_email`. Inlined so the migration does not change with
+    the model. 0004 reuses this function.
+    """
+    pending = sa.text('SELECT id, email FROM users WHERE email_normalized IS NULL ORDER BY id LIMIT :batch_size')
+    update = sa.text('UPDATE users SET email_normalized = :email_normalized WHERE id = :id')
+    while True:
+        rows = connection.execute(pending, {'batch_size': BACKFILL_BATCH_SIZE}).all()
+        if not rows:
+            return
+        connection.execute(update, [{'id': row.id, 'email_normalized': row.email.strip().lower()} for row in rows])
+
+
+def upgrade():
+    # The column stays nullable until 0004: instances still running the previous release keep inserting
+    # users without it during the rolling deploy
+    op.add_column('users', sa.Column('email_normalized', sa.String(), nullable=True))
+
+    connection = op.get_bind()
+    is_postgresql = connection.dialect.name == 'postgresql'
+
+    with op.get_context().autocommit_block():
+        backfill(connection)
+
+        duplicates = connection.execute(sa.text(
+            'SELECT email_normalized, count(*) FROM users GROUP BY email_normalized HAVING count(*) > 1 LIMIT 20'
+        )).all()
+        if duplicates:
+            raise RuntimeError(
+                'Cannot add the unique index on users.email_normalized, these emails differ only in case or '
+                'whitespace and must be merged first: ' + ', '.join(f'{email} ({count})' for email, count in duplicates)
+            )
+
+        # Built without blocking writes on PostgreSQL (CONCURRENTLY has to run outside a transaction)
+        op.create_index(
+            op.f('ix_users_email_normalized'), 'users', ['email_normalized'],
+            unique=True, postgresql_concurrently=is_postgresql
+        )
+
+        # Catch rows written by instances still running the previous release during the backfill
+        backfill(connection)
+
+
+def downgrade():
+    op.drop_index(op.f('ix_users_email_normalized'), table_name='users')
+    op.drop_column('users', 'email_normalized')
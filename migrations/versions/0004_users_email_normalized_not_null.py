@@ -0,0 +1,36 @@
+"""users_email_normalized_not_null
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-18 11:00:00.000000
+
+Run once every instance runs a release that writes `email_normalized` (0003 and later code), so no old
+instance inserts a user without it after the final backfill.
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0004'
+down_revision = '0003'
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    context = op.get_context()
+    # The backfill of 0003, normalizing exactly like it did
+    backfill = context.script.get_revision('0003').module.backfill
+    with context.autocommit_block():
+        # Rows inserted by previous-release instances after 0003 ran
+        backfill(op.get_bind())
+
+    # A plain ALTER on PostgreSQL; SQLite cannot alter columns, so batch mode copies the table there
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('email_normalized', existing_type=sa.String(), nullable=False)
+
+
+def downgrade():
+    with op.batch_alter_table('users') as batch_op:
+        batch_op.alter_column('email_normalized', existing_type=sa.String(), nullable=True)
@@ -0,0 +1,76 @@
+"""
+Shared fixtures: apps built by `create_app()` against a temporary SQLite database.
+"""
+
+import os
+import sys
+
+import pytest
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, BASE_DIR)
+
+
+@pytest.fixture(scope='session')
+def log_dir(tmp_path_factory):
+    """Directory of the application log; handlers are attached once per process, by the first app."""
+    return tmp_path_factory.mktemp('logs')
+
+
+@pytest.fixture
+def make_app(tmp_path, log_dir):
+    """
+    Return a factory creating an app on a fresh SQLite file, with its tables created.
+
+    Password hashing is cheap and inline, and metrics and the last-login buffer are off, unless the keyword
+    arguments (config overrides) say otherwise.
+    """
+    from app import create_app, db
+
+    applications = []
+
+    def factory(**config_overrides):
+        application = create_app({
+            'SQLALCHEMY_DATABASE_URI': f'sqlite:///{tmp_path / "test.db"}',
+            'SQLALCHEMY_ENGINE_OPTIONS': {},
+            'LOG_FILE_PATH': str(log_dir / 'app.log'),
+            'METRICS': {'ENABLED': False},
+            'LAST_LOGIN_BUFFER': {'ENABLED': False},
+            'PASSWORD_HASHING': {'METHOD': 'pbkdf2:sha256:1000', 'WORKERS': 0},
+            **config_overrides,
+        })
+        with application.app_context():
+            # Only the primary: replica binds of apps created earlier in the process are still in `db.metadatas`
+            db.create_all(bind_key=None)
+        applications.append(application)
+        return application
+
+    yield factory
+
+    for application in applications:
+        with application.app_context():
+            for engine in db.engines.values():
+                engine.dispose()
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def sign_up(client):
+    """Return a function signing a user up and in through the API, returning its tokens and details."""
+    def factory(email='user@example.com', name='User', password='secret'):
+        response = client.post('/api/v1/user/signup', json={'name': name, 'email': email, 'password': password})
+        assert response.status_code == 201, response.get_json()
+        response = client.post('/api/v1/user/signin', json={'email': email, 'password': password})
+        assert response.status_code == 200, response.get_json()
+        return response.get_json()['data']
+
+    return factory
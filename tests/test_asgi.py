@@ -0,0 +1,153 @@
+"""
+Async views served through `AsgiApplication`: the Flask request hooks run around them, and nothing blocks the
+event loop on the shared rate limit backend.
+"""
+
+import asyncio
+import json
+import threading
+
+import pytest
+
+from app.helpers.rate_limit import LocalBackend
+
+SIGN_UP = {'name': 'Async', 'email': 'async@example.com', 'password': 'secret'}
+
+
+class ThreadRecordingBackend(LocalBackend):
+    """Stand-in for the shared backend, recording the threads it is called from."""
+
+    def __init__(self):
+        super().__init__()
+        self.threads = set()
+
+    def hit(self, key, limit, period, cost=1):
+        self.threads.add(threading.get_ident())
+        return super().hit(key, limit, period, cost)
+
+
+@pytest.fixture
+def make_asgi_app(make_app):
+    """Return a factory wrapping `make_app` apps in an `AsgiApplication` serving every async view."""
+    from app.asgi import AsgiApplication
+    from app.views import v1_async_routes
+
+    def factory(**config_overrides):
+        application = make_app(**config_overrides)
+        # Routed like `create_asgi_app` does
+        routes = {
+            (method, f'/api/v1/{rule}'): (f'v1.{endpoint}', view)
+            for endpoint, (method, rule, view) in v1_async_routes.items()
+        }
+        return AsgiApplication(application, routes, wsgi_threads=1)
+
+    return factory
+
+
+async def call(asgi_app, method, path, body=None, headers=None):
+    """Send one request to `asgi_app`; return the status, the headers (repeated ones as lists) and the JSON body."""
+    payload = json.dumps(body).encode('utf-8') if body is not None else b''
+    scope = {
+        'type': 'http',
+        'http_version': '1.1',
+        'method': method,
+        'scheme': 'http',
+        'path': path,
+        'root_path': '',
+        'query_string': b'',
+        'headers': [
+            (b'content-type', b'application/json'),
+            (b'content-length', str(len(payload)).encode('latin-1')),
+            *((name.lower().encode('latin-1'), value.encode('latin-1')) for name, value in (headers or {}).items()),
+        ],
+        'client': ('127.0.0.1', 50000),
+        'server': ('testserver', 80),
+    }
+    messages = [{'type': 'http.request', 'body': payload, 'more_body': False}]
+    sent = []
+
+    async def receive():
+        return messages.pop(0) if messages else {'type': 'http.disconnect'}
+
+    async def send(message):
+        sent.append(message)
+
+    await asgi_app(scope, receive, send)
+    response_headers = {}
+    for name, value in sent[0]['headers']:
+        response_headers.setdefault(name.decode('latin-1'), []).append(value.decode('latin-1'))
+    return sent[0]['status'], response_headers, json.loads(sent[1]['body'] or b'null')
+
+
+def serve(*requests):
+    """Run the `call` coroutines on one event loop, disposing the async engine before it closes."""
+    from app.helpers.async_db import async_db
+
+    async def run():
+        try:
+            return [await request for request in requests]
+        finally:
+            await async_db.dispose()
+
+    return asyncio.run(run())
+
+
+def test_request_id_is_taken_or_generated_and_echoed(make_asgi_app):
+    asgi_app = make_asgi_app()
+    (_, given, _), (_, generated, _) = serve(
+        call(asgi_app, 'POST', '/api/v1/user/signin', {'email': 'nobody@example.com', 'password': 'x'},
+             headers={'X-Request-ID': 'abc123'}),
+        call(asgi_app, 'POST', '/api/v1/user/signin', {'email': 'nobody@example.com', 'password': 'x'}),
+    )
+    assert given['x-request-id'] == ['abc123']
+    assert len(generated['x-request-id'][0]) == 32
+
+
+def test_async_requests_are_counted_in_the_metrics(make_asgi_app):
+    from app.helpers.metrics import request_metrics
+
+    asgi_app = make_asgi_app(METRICS={'ENABLED': True})
+    before = {tuple(key): count for *key, count in request_metrics.snapshot()['requests']}
+
+    [(status, _, _)] = serve(call(asgi_app, 'POST', '/api/v1/user/signup', SIGN_UP))
+
+    snapshot = request_metrics.snapshot()
+    after = {tuple(key): count for *key, count in snapshot['requests']}
+    key = ('v1.sign_up', 'POST', str(status))
+    assert status == 201
+    assert after[key] == before.get(key, 0) + 1
+    assert snapshot['in_flight']['v1.sign_up'] == 0
+    assert snapshot['latency']['v1.sign_up'][-1] > 0
+
+
+def test_async_write_starts_the_read_your_writes_window(make_asgi_app, tmp_path):
+    asgi_app = make_asgi_app(DATABASE_REPLICAS={
+        'URIS': {'replica_1': f'sqlite:///{tmp_path / "replica.db"}'},
+        'READ_YOUR_WRITES_COOKIE': 'db_primary_until',
+    })
+    (signup_status, signup_headers, _), (signin_status, signin_headers, _) = serve(
+        call(asgi_app, 'POST', '/api/v1/user/signup', SIGN_UP),
+        call(asgi_app, 'POST', '/api/v1/user/signin', {'email': 'nobody@example.com', 'password': 'x'}),
+    )
+    assert signup_status == 201
+    assert any(cookie.startswith('db_primary_until=') for cookie in signup_headers.get('set-cookie', []))
+    assert signin_status == 401
+    assert 'set-cookie' not in signin_headers
+
+
+def test_shared_rate_limit_backend_is_called_off_the_event_loop(make_asgi_app):
+    from app.helpers.rate_limit import rate_limiter
+
+    asgi_app = make_asgi_app(RATE_LIMITS={
+        'ENABLED': True,
+        'ENDPOINTS': {'sign_in': {'PER_EMAIL': {'LIMIT': 1, 'PERIOD': 60}}},
+    })
+    shared = rate_limiter.backend = ThreadRecordingBackend()
+    body = {'email': 'nobody@example.com', 'password': 'x'}
+
+    statuses = [status for status, _, _ in serve(
+        call(asgi_app, 'POST', '/api/v1/user/signin', body),
+        call(asgi_app, 'POST', '/api/v1/user/signin', body),
+    )]
+    assert statuses == [401, 429]
+    assert shared.threads and threading.get_ident() not in shared.threads
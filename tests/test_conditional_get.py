@@ -0,0 +1,68 @@
+"""
+Conditional GET of user/details: a matching `If-None-Match` gets an empty 304, and any change of the user
+changes the ETag.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def get_details(client, sign_up):
+    """Return a function fetching the signed-up user's details, with an optional `If-None-Match`."""
+    tokens = sign_up()
+
+    def fetch(if_none_match=None):
+        headers = {'Authorization': f'Bearer {tokens["access_token"]}'}
+        if if_none_match:
+            headers['If-None-Match'] = if_none_match
+        return client.get('/api/v1/user/details', headers=headers)
+
+    fetch.user_id = tokens['details']['id']
+    return fetch
+
+
+def test_matching_etag_gets_an_empty_304(get_details):
+    response = get_details()
+    assert response.status_code == 200
+    assert response.headers['Cache-Control'] == 'private, no-cache'
+    etag = response.headers['ETag']
+
+    # A client revalidating the compressed representation holds its weak ETag, and gets that one back
+    for if_none_match, expected in ((etag, etag), (f'W/{etag}', f'W/{etag}'), (f'"other", {etag}', etag), ('*', etag)):
+        revalidated = get_details(if_none_match)
+        assert revalidated.status_code == 304, if_none_match
+        assert revalidated.get_data() == b''
+        assert revalidated.headers['ETag'] == expected
+
+    assert get_details('"other"').status_code == 200
+
+
+def test_304_does_not_run_the_view(get_details, monkeypatch):
+    from app.views.v1 import user_view
+
+    etag = get_details().headers['ETag']
+    monkeypatch.setattr(user_view.User, 'user_to_dict', classmethod(lambda cls, user: pytest.fail('view ran')))
+
+    assert get_details(etag).status_code == 304
+
+
+def test_changing_the_user_changes_the_etag(app, get_details):
+    from app.models.user import User
+
+    etag = get_details().headers['ETag']
+    with app.app_context():
+        user = User.get_by_id(get_details.user_id)
+        user.name = 'Renamed'
+        user.save()
+
+    response = get_details(etag)
+    assert response.status_code == 200
+    assert response.get_json()['data']['name'] == 'Renamed'
+    assert response.headers['ETag'] != etag
+
+
+def test_errors_are_not_given_an_etag(client):
+    response = client.get('/api/v1/user/details', headers={'If-None-Match': '*'})
+
+    assert response.status_code == 401
+    assert 'ETag' not in response.headers
@@ -0,0 +1,86 @@
+"""
+A preloaded app forked into workers: no database connection may be shared between the processes.
+"""
+
+import os
+import traceback
+
+import pytest
+from sqlalchemy import text
+
+pytestmark = pytest.mark.skipif(not hasattr(os, 'fork'), reason='needs os.fork')
+
+
+def run_in_child(target):
+    """
+    Fork, run `target()` in the child and return the child's exit code: 0 when `target` returned True.
+    """
+    pid = os.fork()
+    if pid == 0:
+        code = 1
+        try:
+            code = 0 if target() else 1
+        except BaseException:
+            traceback.print_exc()
+        finally:
+            os._exit(code)
+    _, status = os.waitpid(pid, 0)
+    return os.waitstatus_to_exitcode(status)
+
+
+def checkout_connection(engine):
+    """Run a query and return the DBAPI connection that served it (back in the pool afterwards)."""
+    with engine.connect() as connection:
+        connection.execute(text('SELECT 1'))
+        return connection.connection.dbapi_connection
+
+
+def test_worker_opens_its_own_connections(app):
+    from app import db
+    from app.helpers.async_db import async_db
+    from main import build_server_options
+
+    post_fork_hook = build_server_options({})['post_fork']
+    with app.app_context():
+        engine = db.engine
+        parent_connection = checkout_connection(engine)
+        assert engine.pool.checkedin() == 1
+
+        def worker():
+            post_fork_hook(None, None)
+            with app.app_context():
+                return (
+                    db.engine.pool.checkedin() == 0
+                    and checkout_connection(db.engine) is not parent_connection
+                    and not async_db.stats()['connected']
+                )
+
+        assert run_in_child(worker) == 0
+
+        # The worker left the parent's connection open and pooled
+        assert checkout_connection(engine) is parent_connection
+
+
+def test_other_forked_children_do_not_run_post_fork(app):
+    from app import _fork_state, db
+
+    with app.app_context():
+        parent_connection = checkout_connection(db.engine)
+
+        def child():
+            # Without the worker hook the pool is inherited as is, which is why only server workers get it
+            return _fork_state['post_fork_pid'] != os.getpid() and db.engine.pool.checkedin() == 1
+
+        assert run_in_child(child) == 0
+        assert checkout_connection(db.engine) is parent_connection
+
+
+def test_hashing_pool_does_not_fork_the_worker(make_app):
+    from app.helpers.password_hasher import password_hasher
+
+    make_app(PASSWORD_HASHING={'METHOD': 'pbkdf2:sha256:1000', 'WORKERS': 1})
+    try:
+        assert password_hasher.start_method in ('forkserver', 'spawn')
+        assert password_hasher.verify(password_hasher.hash('secret'), 'secret')
+    finally:
+        password_hasher.shutdown()
@@ -0,0 +1,35 @@
+"""
+/metrics and /internal/stats: served to the allowed addresses only.
+"""
+
+import pytest
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(
+        METRICS={'ENABLED': True, 'ALLOWED_IPS': ['127.0.0.1']},
+        INTERNAL_STATS={'ENABLED': True, 'ALLOWED_IPS': ['127.0.0.1']},
+    )
+
+
+def test_metrics_are_served_to_allowed_addresses(client):
+    client.post('/api/v1/user/signin', json={'email': 'nobody@example.com', 'password': 'x'})
+
+    response = client.get('/metrics')
+    assert response.status_code == 200
+    assert response.mimetype == 'text/plain'
+    assert 'http_requests_total{endpoint="v1.sign_in",method="POST",status="401"}' in response.get_data(as_text=True)
+
+
+def test_stats_are_served_to_allowed_addresses(client):
+    response = client.get('/internal/stats')
+    assert response.status_code == 200
+    assert {'database_pools', 'rate_limits'} <= set(response.get_json()['data'])
+
+
+@pytest.mark.parametrize('path', ['/metrics', '/internal/stats'])
+def test_other_addresses_are_forbidden(client, path):
+    response = client.get(path, environ_base={'REMOTE_ADDR': '10.0.0.8'})
+    assert response.status_code == 403
+    assert response.get_json()['error'] == 'FORBIDDEN'
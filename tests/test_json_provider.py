@@ -0,0 +1,96 @@
+"""
+JSON provider: orjson and the standard library fallback write the same documents, with ISO 8601 datetimes and
+the keys in insertion order.
+"""
+
+import dataclasses
+import decimal
+import json
+import uuid
+from datetime import date, datetime, timezone
+
+import pytest
+
+USER_UUID = uuid.UUID('12345678-1234-5678-1234-567812345678')
+
+
+@dataclasses.dataclass
+class Point:
+    x: int
+    y: int
+
+
+PAYLOAD = {
+    'name': 'Zoë',
+    'uuid': USER_UUID,
+    'created_at': datetime(2024, 1, 2, 3, 4, 5, 678901),
+    'expires_at': datetime(2024, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    'birthday': date(2000, 2, 29),
+    'balance': decimal.Decimal('10.50'),
+    'point': Point(1, 2),
+    'a_last': None,
+    1: 'integer key',
+}
+
+EXPECTED = {
+    'name': 'Zoë',
+    'uuid': '12345678-1234-5678-1234-567812345678',
+    'created_at': '2024-01-02T03:04:05.678901',
+    'expires_at': '2024-01-02T03:04:05+00:00',
+    'birthday': '2000-02-29',
+    'balance': '10.50',
+    'point': {'x': 1, 'y': 2},
+    'a_last': None,
+    '1': 'integer key',
+}
+
+
+@pytest.fixture(params=['orjson', 'stdlib'])
+def provider(request, app, monkeypatch):
+    if request.param == 'stdlib':
+        monkeypatch.setattr('app.helpers.json_provider.orjson', None)
+    elif not app.json.fast:
+        pytest.skip('orjson is not installed')
+    return app.json
+
+
+def test_values_are_encoded_like_the_model_payloads_expect(provider):
+    document = provider.dumps_bytes(PAYLOAD)
+
+    assert json.loads(document) == EXPECTED
+    assert list(json.loads(document)) == list(EXPECTED)
+    assert 'Zoë'.encode('utf-8') in document
+    assert provider.loads(document) == provider.loads(provider.dumps(PAYLOAD)) == EXPECTED
+
+
+def test_both_encoders_write_the_same_document(app, monkeypatch):
+    if not app.json.fast:
+        pytest.skip('orjson is not installed')
+    fast = app.json.dumps_bytes(PAYLOAD)
+    monkeypatch.setattr('app.helpers.json_provider.orjson', None)
+
+    assert app.json.dumps_bytes(PAYLOAD) == fast
+
+
+def test_unsupported_values_still_raise(provider):
+    with pytest.raises(TypeError):
+        provider.dumps({'value': object()})
+
+
+def test_responses_are_compact_unless_debugging(app, provider):
+    with app.test_request_context():
+        response = provider.response(created_at=datetime(2024, 1, 2), uuid=USER_UUID)
+        assert response.mimetype == 'application/json'
+        assert response.get_data() == (
+            b'{"created_at":"2024-01-02T00:00:00","uuid":"12345678-1234-5678-1234-567812345678"}'
+        )
+
+        app.debug = True
+        assert b'\n  "created_at"' in provider.response(created_at=datetime(2024, 1, 2)).get_data()
+
+
+def test_model_payloads_are_encoded_in_responses(sign_up):
+    details = sign_up()['details']
+
+    uuid.UUID(details['uuid'])
+    datetime.fromisoformat(details['created_at'])
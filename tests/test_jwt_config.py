@@ -0,0 +1,39 @@
+"""
+JWT settings are read from the app's config, so overrides passed to `create_app` are honoured.
+"""
+
+import time
+
+import jwt
+import pytest
+
+from app import config_contents
+
+JWT_OVERRIDE = {'SECRET_KEY': 'override-secret', 'ACCESS_TOKEN_EXPIRE': 5, 'REFRESH_TOKEN_EXPIRE': 60}
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(JWT=JWT_OVERRIDE)
+
+
+def test_tokens_are_signed_with_the_overridden_secret_and_expiry(sign_up):
+    signed_in_at = time.time()
+    tokens = sign_up()
+
+    access = jwt.decode(tokens['access_token'], key='override-secret', algorithms=['HS256'])
+    refresh = jwt.decode(tokens['refresh_token'], key='override-secret', algorithms=['HS256'])
+    assert access['exp'] - signed_in_at == pytest.approx(5 * 60, abs=5)
+    assert refresh['exp'] - signed_in_at == pytest.approx(60 * 60, abs=5)
+
+
+def test_tokens_signed_with_the_file_secret_are_rejected(client, sign_up):
+    tokens = sign_up()
+    claims = jwt.decode(tokens['access_token'], key='override-secret', algorithms=['HS256'])
+    forged = jwt.encode(claims, key=config_contents['JWT']['SECRET_KEY'], algorithm='HS256')
+
+    def details(token):
+        return client.get('/api/v1/user/details', headers={'Authorization': f'Bearer {token}'}).status_code
+
+    assert details(tokens['access_token']) == 200
+    assert details(forged) == 401
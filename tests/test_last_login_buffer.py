@@ -0,0 +1,75 @@
+"""
+Write-behind `last_login_at`: logins are coalesced in memory and a flush never moves the timestamp backwards.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+
+LOGIN = datetime(2024, 1, 1, 12, 0)
+
+
+@pytest.fixture
+def buffered_app(make_app):
+    from app.helpers.write_behind import last_login_buffer
+
+    app = make_app(LAST_LOGIN_BUFFER={'ENABLED': True, 'FLUSH_INTERVAL_MS': 60000, 'MAX_ENTRIES': 1000})
+    yield app
+    last_login_buffer.shutdown()
+
+
+def create_user(email='login@example.com'):
+    from app.models.user import User
+
+    return User.create_if_absent('Login User', email, 'hash').id
+
+
+def last_login_at(user_id):
+    from app import db
+    from app.models.user import User
+
+    db.session.expire_all()
+    return db.session.get(User, user_id).last_login_at
+
+
+def test_bulk_update_never_moves_last_login_backwards(app):
+    from app.models.user import User
+
+    with app.app_context():
+        first, second = create_user('first@example.com'), create_user('second@example.com')
+
+        User.bulk_update_last_login([(first, LOGIN), (second, LOGIN)])
+        assert last_login_at(first) == LOGIN
+
+        # A batch from a worker that saw older logins, flushed after a newer one
+        User.bulk_update_last_login([(first, LOGIN - timedelta(minutes=5)), (second, LOGIN + timedelta(minutes=5))])
+        assert last_login_at(first) == LOGIN
+        assert last_login_at(second) == LOGIN + timedelta(minutes=5)
+
+
+def test_buffer_keeps_the_latest_login_per_user(buffered_app):
+    from app.helpers.write_behind import last_login_buffer
+
+    with buffered_app.app_context():
+        user_id = create_user()
+        for login in (LOGIN, LOGIN + timedelta(minutes=2), LOGIN + timedelta(minutes=1)):
+            last_login_buffer.record(user_id, login)
+        assert last_login_at(user_id) is None
+
+        assert last_login_buffer.flush() == 1
+        assert last_login_at(user_id) == LOGIN + timedelta(minutes=2)
+
+
+def test_sign_in_does_not_write_last_login_until_the_flush(buffered_app):
+    from app.helpers.write_behind import last_login_buffer
+
+    client = buffered_app.test_client()
+    client.post('/api/v1/user/signup', json={'name': 'Login User', 'email': 'login@example.com', 'password': 'secret'})
+    response = client.post('/api/v1/user/signin', json={'email': 'login@example.com', 'password': 'secret'})
+    assert response.status_code == 200
+    user_id = response.get_json()['data']['details']['id']
+
+    with buffered_app.app_context():
+        assert last_login_at(user_id) is None
+        last_login_buffer.flush()
+        assert last_login_at(user_id) is not None
@@ -0,0 +1,113 @@
+"""
+Rate limits on sign-in and sign-up: rejected before any password is verified, through the local backend or a
+shared one, with `LocalBackend` standing in for Redis.
+"""
+
+import pytest
+
+from app.helpers.rate_limit import LocalBackend
+
+SIGN_IN_LIMITS = {
+    'ENABLED': True,
+    'BACKEND': 'local',
+    'ENDPOINTS': {
+        'sign_in': {'PER_IP': {'LIMIT': 100, 'PERIOD': 60}, 'PER_EMAIL': {'LIMIT': 2, 'PERIOD': 60}},
+        'sign_up': {'PER_IP': {'LIMIT': 1, 'PERIOD': 60}},
+    },
+}
+
+
+class FailingBackend:
+    """A shared backend that is down."""
+
+    def hit(self, key, limit, period, cost=1):
+        raise ConnectionError('backend unavailable')
+
+    def size(self):
+        return None
+
+    def after_fork(self):
+        pass
+
+
+@pytest.fixture
+def limited_client(make_app, monkeypatch):
+    """Client of an app with the `SIGN_IN_LIMITS`, counting the password verifications."""
+    from app.helpers.password_hasher import password_hasher
+
+    app = make_app(RATE_LIMITS=SIGN_IN_LIMITS)
+    client = app.test_client()
+    client.post('/api/v1/user/signup', json={'name': 'Limited', 'email': 'limited@example.com', 'password': 'secret'})
+
+    verify = password_hasher.verify
+    calls = []
+
+    def counting_verify(*args, **kwargs):
+        calls.append(args)
+        return verify(*args, **kwargs)
+
+    monkeypatch.setattr(password_hasher, 'verify', counting_verify)
+    client.verify_calls = calls
+    return client
+
+
+def sign_in(client, email='limited@example.com', password='wrong'):
+    return client.post('/api/v1/user/signin', json={'email': email, 'password': password})
+
+
+def test_local_bucket_refills_over_time(monkeypatch):
+    clock = [1000.0]
+    monkeypatch.setattr('app.helpers.rate_limit.time.monotonic', lambda: clock[0])
+    backend = LocalBackend(shards=2)
+
+    assert [backend.hit('key', limit=2, period=10) for _ in range(2)] == [0.0, 0.0]
+    assert backend.hit('key', limit=2, period=10) == pytest.approx(5.0)
+
+    clock[0] += 5
+    assert backend.hit('key', limit=2, period=10) == 0.0
+
+
+def test_sign_in_is_rejected_before_the_password_is_verified(limited_client):
+    assert [sign_in(limited_client).status_code for _ in range(2)] == [401, 401]
+    assert len(limited_client.verify_calls) == 2
+
+    response = sign_in(limited_client, email=' LIMITED@example.com')
+    assert response.status_code == 429
+    assert int(response.headers['Retry-After']) >= 1
+    assert response.get_json()['error'] == 'RATE_LIMITED'
+    assert len(limited_client.verify_calls) == 2
+
+    # Another email still has its own bucket
+    assert sign_in(limited_client, email='other@example.com').status_code == 401
+
+
+def test_sign_up_is_limited_per_ip(limited_client):
+    # The fixture's sign-up used the only token of this address
+    response = limited_client.post(
+        '/api/v1/user/signup', json={'name': 'Second', 'email': 'second@example.com', 'password': 'secret'}
+    )
+    assert response.status_code == 429
+    assert 'Retry-After' in response.headers
+
+
+def test_shared_backend_holds_the_buckets(limited_client):
+    from app.helpers.rate_limit import rate_limiter
+
+    shared = LocalBackend()
+    rate_limiter.backend = shared
+    local_buckets = rate_limiter.local.size()
+
+    assert [sign_in(limited_client).status_code for _ in range(3)] == [401, 401, 429]
+    assert shared.size() == 2
+    assert rate_limiter.local.size() == local_buckets
+
+
+def test_failing_shared_backend_falls_back_to_local_limits(limited_client):
+    from app.helpers.rate_limit import rate_limiter
+
+    rate_limiter.backend = FailingBackend()
+    errors = rate_limiter.backend_errors
+
+    statuses = [sign_in(limited_client, email='fallback@example.com').status_code for _ in range(3)]
+    assert statuses == [401, 401, 429]
+    assert rate_limiter.backend_errors > errors
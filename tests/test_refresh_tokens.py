@@ -0,0 +1,85 @@
+"""
+Refresh token rotation: the rotation and its successor are committed together, and presenting a rotated token
+again revokes its whole family.
+"""
+
+import pytest
+from sqlalchemy.exc import IntegrityError
+
+ENGINE_OPTIONS = [{}, {'isolation_level': 'AUTOCOMMIT'}]
+
+
+@pytest.fixture(params=ENGINE_OPTIONS, ids=['transactional', 'autocommit'])
+def app(request, make_app):
+    return make_app(SQLALCHEMY_ENGINE_OPTIONS=request.param)
+
+
+@pytest.fixture
+def token(app):
+    from app import db
+    from app.models.refresh_token import RefreshToken
+    from app.models.user import User
+
+    with app.app_context():
+        user = User.create_if_absent('Token User', 'token@example.com', 'hash')
+        token = RefreshToken.issue(user.id, expiration_minutes=60)
+        db.session.remove()
+        return token
+
+
+def test_rotation_is_single_use(app, token):
+    from app.models.refresh_token import RefreshToken
+
+    with app.app_context():
+        successor = RefreshToken.rotate(token.jti, token.family_id, token.user_id, expiration_minutes=60)
+        assert successor is not None and successor.family_id == token.family_id
+        assert RefreshToken.rotate(token.jti, token.family_id, token.user_id, expiration_minutes=60) is None
+
+
+def test_failed_successor_insert_leaves_token_usable(app, token, monkeypatch):
+    from app.models.refresh_token import RefreshToken
+
+    new_token = RefreshToken._new_token
+    with app.app_context():
+        # A successor reusing the presented jti violates the primary key on INSERT
+        monkeypatch.setattr(RefreshToken, '_new_token', classmethod(
+            lambda cls, *args, **kwargs: RefreshToken(
+                jti=token.jti, family_id=token.family_id, user_id=token.user_id, expires_at=token.expires_at
+            )
+        ))
+        with pytest.raises(IntegrityError):
+            RefreshToken.rotate(token.jti, token.family_id, token.user_id, expiration_minutes=60)
+
+        monkeypatch.setattr(RefreshToken, '_new_token', new_token)
+        successor = RefreshToken.rotate(token.jti, token.family_id, token.user_id, expiration_minutes=60)
+        assert successor is not None
+
+
+def refresh(client, refresh_token):
+    return client.post('/api/v1/token/refresh-token', json={'refresh_token': refresh_token})
+
+
+def test_reusing_a_rotated_token_revokes_its_family(client, sign_up):
+    original = sign_up()['refresh_token']
+
+    response = refresh(client, original)
+    assert response.status_code == 200
+    successor = response.get_json()['data']['refresh_token']
+
+    reused = refresh(client, original)
+    assert (reused.status_code, reused.get_json()['error']) == (401, 'REVOKED_TOKEN')
+    # The legitimate holder's successor is revoked with the rest of the family
+    response = refresh(client, successor)
+    assert (response.status_code, response.get_json()['error']) == (401, 'REVOKED_TOKEN')
+
+
+def test_revoked_family_is_rejected_by_the_token_store_without_the_index(client, sign_up, monkeypatch):
+    from app.helpers.revocation_index import revocation_index
+
+    original = sign_up()['refresh_token']
+    successor = refresh(client, original).get_json()['data']['refresh_token']
+    assert refresh(client, original).status_code == 401
+
+    # As in a worker whose index has not seen the revocation yet
+    monkeypatch.setattr(revocation_index, 'is_revoked', lambda family_id: False)
+    assert refresh(client, successor).status_code == 401
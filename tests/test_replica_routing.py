@@ -0,0 +1,119 @@
+"""
+Read replicas: every replica engine gets its own pool, reported under its bind key, and model reads fall back to
+the primary when the replica misses or fails.
+"""
+
+import pytest
+from sqlalchemy import insert
+
+
+@pytest.fixture
+def replica_app(make_app, tmp_path):
+    return make_app(
+        SQLALCHEMY_ENGINE_OPTIONS={'pool_logging_name': 'configured'},
+        DATABASE_REPLICAS={'URIS': {
+            'replica_1': f'sqlite:///{tmp_path / "replica_1.db"}',
+            'replica_2': f'sqlite:///{tmp_path / "replica_2.db"}',
+        }},
+    )
+
+
+def test_replica_pools_have_distinct_names(replica_app):
+    from app import db
+
+    with replica_app.app_context():
+        pool_names = {bind_key: engine.pool.logging_name for bind_key, engine in db.engines.items()}
+
+    assert pool_names == {None: 'configured', 'replica_1': 'replica_1', 'replica_2': 'replica_2'}
+
+
+def test_replica_pools_are_reported_separately(replica_app):
+    from sqlalchemy import text
+
+    from app import db
+    from app.helpers.pool_instrumentation import pool_instrumentation
+
+    with replica_app.app_context():
+        for engine in db.engines.values():
+            with engine.connect() as connection:
+                connection.execute(text('SELECT 1'))
+
+    assert {'configured', 'replica_1', 'replica_2'} <= set(pool_instrumentation.snapshot())
+
+
+def test_replica_bind_key_cannot_reuse_a_pool_name(make_app, tmp_path):
+    with pytest.raises(ValueError):
+        make_app(DATABASE_REPLICAS={'URIS': {'primary': f'sqlite:///{tmp_path / "replica.db"}'}})
+
+
+@pytest.fixture
+def single_replica_app(make_app, tmp_path):
+    return make_app(DATABASE_REPLICAS={'URIS': {'replica_1': f'sqlite:///{tmp_path / "replica_1.db"}'}})
+
+
+def create_replica_tables(app):
+    from app import db
+
+    with app.app_context():
+        db.metadata.create_all(db.engines['replica_1'])
+
+
+def create_user(app, name, email):
+    from app import db
+    from app.models.user import User
+
+    with app.app_context():
+        User.create_if_absent(name, email, 'hash')
+        # A new session: one that wrote stays on the primary
+        db.session.remove()
+
+
+def test_model_reads_are_served_by_the_replica(single_replica_app):
+    from app import db
+    from app.helpers.replica_routing import replica_router
+    from app.models.user import User
+
+    create_replica_tables(single_replica_app)
+    create_user(single_replica_app, 'Primary', 'user@example.com')
+    with single_replica_app.app_context():
+        with db.engines['replica_1'].begin() as connection:
+            connection.execute(insert(User).values(User._creation_values('Replica', 'user@example.com', 'hash')))
+
+        assert User.get_by_email('user@example.com').name == 'Replica'
+        assert replica_router.stats()['replicas']['replica_1']['reads'] == 1
+
+
+def test_a_replica_miss_is_asked_again_on_the_primary(single_replica_app):
+    from app.helpers.replica_routing import replica_router
+    from app.models.user import User
+
+    create_replica_tables(single_replica_app)
+    # Not replicated yet
+    create_user(single_replica_app, 'Fresh', 'fresh@example.com')
+    fallbacks = replica_router.fallbacks
+
+    with single_replica_app.app_context():
+        assert User.get_by_email('fresh@example.com').name == 'Fresh'
+        assert User.get_by_email('nobody@example.com') is None
+
+    stats = replica_router.stats()
+    assert stats['fallbacks'] == fallbacks + 2
+    assert stats['replicas']['replica_1']['healthy']
+
+
+def test_a_failing_replica_is_skipped_until_its_next_health_check(single_replica_app):
+    from app.helpers.replica_routing import replica_router
+    from app.models.user import User
+
+    # The replica has no tables, so its queries fail
+    create_user(single_replica_app, 'Primary', 'user@example.com')
+
+    with single_replica_app.app_context():
+        assert User.get_by_email('user@example.com').name == 'Primary'
+        replica = replica_router.stats()['replicas']['replica_1']
+        assert not replica['healthy'] and replica['failures'] == 1 and 'no such table' in replica['last_error']
+
+        primary_reads = replica_router.primary_reads
+        assert User.get_by_email('user@example.com').name == 'Primary'
+        assert replica_router.stats()['replicas']['replica_1']['reads'] == 1
+        assert replica_router.primary_reads == primary_reads + 1
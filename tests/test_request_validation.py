@@ -0,0 +1,29 @@
+"""
+JSON body validation: emails are stripped before they are checked, the refresh endpoint keeps its error contract.
+"""
+
+from app.helpers.constants import ResponseErrorCodes, ResponseMessageKeys
+
+
+def test_email_with_surrounding_whitespace_is_accepted(client):
+    response = client.post(
+        '/api/v1/user/signup', json={'name': 'Spaced', 'email': ' Spaced@Example.com ', 'password': 'secret'}
+    )
+    assert response.status_code == 201
+
+    response = client.post('/api/v1/user/signin', json={'email': 'spaced@example.com\t', 'password': 'secret'})
+    assert response.status_code == 200
+
+
+def test_blank_email_is_missing(client):
+    response = client.post('/api/v1/user/signup', json={'name': 'Blank', 'email': '   ', 'password': 'secret'})
+    assert response.status_code == 400
+    assert response.get_json()['error'] == ResponseErrorCodes.INSUFFICIENT_DATA.value
+
+
+def test_refresh_without_token_keeps_its_error(client):
+    for body in ({}, {'refresh_token': ''}, {'refresh_token': 42}):
+        response = client.post('/api/v1/token/refresh-token', json=body)
+        assert response.status_code == 400
+        assert response.get_json()['error'] == ResponseErrorCodes.INVALID_TOKEN.value
+        assert response.get_json()['message'] == ResponseMessageKeys.INVALID_REFRESH_TOKEN.value
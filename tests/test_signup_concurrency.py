@@ -0,0 +1,60 @@
+"""
+Concurrent sign-ups with the same email: exactly one account is created, every other request gets EMAIL_EXISTS.
+Only a conflict on the email counts as a taken email.
+"""
+
+import threading
+import uuid
+
+import pytest
+from sqlalchemy import func, select
+from sqlalchemy.exc import IntegrityError
+
+CONCURRENT_SIGNUPS = 16
+
+
+def test_concurrent_signups_for_one_email_create_one_user(make_app):
+    from app import db
+    from app.models.user import User
+
+    app = make_app(RATE_LIMITS={'ENABLED': False})
+    barrier = threading.Barrier(CONCURRENT_SIGNUPS)
+    responses = [None] * CONCURRENT_SIGNUPS
+
+    def sign_up(index):
+        client = app.test_client()
+        barrier.wait()
+        response = client.post(
+            '/api/v1/user/signup',
+            json={'name': f'User {index}', 'email': 'Same@Example.com', 'password': 'secret'}
+        )
+        responses[index] = (response.status_code, response.get_json())
+
+    threads = [threading.Thread(target=sign_up, args=(index,)) for index in range(CONCURRENT_SIGNUPS)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    statuses = sorted(status for status, _ in responses)
+    assert statuses == [201] + [400] * (CONCURRENT_SIGNUPS - 1)
+    assert all(body['error'] == 'EMAIL_EXISTS' for status, body in responses if status == 400)
+
+    with app.app_context():
+        assert db.session.scalar(select(func.count()).select_from(User)) == 1
+
+
+def test_only_an_email_conflict_is_reported_as_a_taken_email(app, monkeypatch):
+    from app.models.user import User
+
+    creation_values = User._creation_values
+    same_uuid = uuid.uuid4()
+    monkeypatch.setattr(User, '_creation_values', classmethod(
+        lambda cls, *args: {**creation_values(*args), 'uuid': same_uuid}
+    ))
+
+    with app.app_context():
+        assert User.create_if_absent('First', 'first@example.com', 'hash') is not None
+        assert User.create_if_absent('Again', ' FIRST@example.com', 'hash') is None
+        with pytest.raises(IntegrityError):
+            User.create_if_absent('Second', 'second@example.com', 'hash')
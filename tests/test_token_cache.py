@@ -0,0 +1,70 @@
+"""
+Verified access tokens are cached with a snapshot of their user, dropped as soon as the user is saved or
+deactivated.
+"""
+
+import time
+
+from app.helpers.token_cache import TokenCache, UserSnapshot
+
+
+def details(client, tokens):
+    response = client.get('/api/v1/user/details', headers={'Authorization': f'Bearer {tokens["access_token"]}'})
+    assert response.status_code == 200, response.get_json()
+    return response.get_json()['data']
+
+
+def test_repeated_requests_are_served_from_the_cache(client, sign_up):
+    from app.helpers.token_cache import token_cache
+
+    tokens = sign_up()
+    details(client, tokens)
+    hits = token_cache.hits
+
+    assert details(client, tokens)['name'] == 'User'
+    assert token_cache.hits == hits + 1
+
+
+def test_saving_the_user_invalidates_its_cached_tokens(app, client, sign_up):
+    from app.models.user import User
+
+    tokens = sign_up()
+    details(client, tokens)
+
+    with app.app_context():
+        user = User.get_by_id(tokens['details']['id'])
+        user.name = 'Renamed'
+        user.save()
+
+    assert details(client, tokens)['name'] == 'Renamed'
+
+
+def test_deactivating_the_user_invalidates_its_cached_tokens(app, client, sign_up):
+    from app.models.user import User
+
+    tokens = sign_up()
+    assert details(client, tokens)['deactivated_at'] is None
+
+    with app.app_context():
+        User.get_by_id(tokens['details']['id']).deactivate()
+
+    assert details(client, tokens)['deactivated_at'] is not None
+
+
+def test_invalidation_only_drops_the_entries_of_that_user():
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.set('first-token', {'id': 1}, UserSnapshot(id=1, uuid=None, name='First', email='first@example.com'))
+    cache.set('second-token', {'id': 2}, UserSnapshot(id=2, uuid=None, name='Second', email='second@example.com'))
+
+    cache.invalidate_user(1)
+
+    assert cache.get('first-token') is None
+    assert cache.get('second-token')[1].name == 'Second'
+    assert cache.stats()['invalidations'] == 1
+
+
+def test_entries_never_outlive_the_token_expiry():
+    cache = TokenCache(max_size=10, ttl=60)
+    cache.set('expired-token', {'id': 1, 'exp': time.time() - 1}, UserSnapshot(id=1, uuid=None, name='U', email='u@x'))
+
+    assert cache.get('expired-token') is None
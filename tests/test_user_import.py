@@ -0,0 +1,101 @@
+"""
+Bulk user import: duplicates are reported per row, a conflicting batch falls back to row-by-row inserts, and
+the CLI command hashes on a pool of its own.
+"""
+
+import json
+
+import pytest
+from sqlalchemy import func, select
+
+
+def ndjson(*rows):
+    return [json.dumps(row).encode('utf-8') for row in rows]
+
+
+def user_row(index, email=None):
+    return {'name': f'User {index}', 'email': email or f'user{index}@example.com', 'password': 'secret'}
+
+
+@pytest.fixture
+def importer(app):
+    from app.helpers.password_hasher import PasswordHasher
+    from app.helpers.user_import import UserImporter
+    from app.views.v1.schemas import SIGN_UP_SCHEMA
+
+    with app.app_context():
+        yield UserImporter(SIGN_UP_SCHEMA, batch_size=10, hasher=PasswordHasher(method='pbkdf2:sha256:1000'))
+
+
+def user_count():
+    from app import db
+    from app.models.user import User
+
+    return db.session.scalar(select(func.count()).select_from(User))
+
+
+def test_duplicates_in_the_file_and_the_database_are_reported(importer):
+    from app.models.user import User
+
+    User.create_if_absent('Existing', 'existing@example.com', 'hash')
+    summary = importer.run(ndjson(
+        user_row(1),
+        user_row(2, email=' USER1@example.com'),
+        user_row(3, email='Existing@Example.com'),
+        user_row(4),
+    ))
+
+    assert (summary['total'], summary['created'], summary['failed']) == (4, 2, 2)
+    errors = [(error['line'], error['error']) for error in summary['errors']]
+    assert errors == [(2, 'EMAIL_EXISTS'), (3, 'EMAIL_EXISTS')]
+    assert user_count() == 3
+
+
+def test_invalid_lines_do_not_stop_the_import(importer):
+    summary = importer.run([b'not json', b'[1, 2]', *ndjson({'name': 'No email', 'password': 'x'}, user_row(1))])
+
+    assert (summary['created'], summary['failed']) == (1, 3)
+    assert [error['line'] for error in summary['errors']] == [1, 2, 3]
+
+
+def test_conflicting_batch_falls_back_to_row_by_row_inserts(importer, monkeypatch):
+    from app.models.user import User
+
+    User.create_if_absent('Taken', 'user2@example.com', 'hash')
+    # As if a concurrent sign-up took the email between the existence check and the INSERT
+    monkeypatch.setattr(type(importer), '_existing_emails', staticmethod(lambda emails: set()))
+
+    summary = importer.run(ndjson(user_row(1), user_row(2), user_row(3)))
+
+    assert (summary['created'], summary['failed']) == (2, 1)
+    assert summary['errors'][0]['line'] == 2 and summary['errors'][0]['error'] == 'EMAIL_EXISTS'
+    assert user_count() == 3
+
+
+def test_cli_import_hashes_on_its_own_pool(app, tmp_path):
+    source = tmp_path / 'users.ndjson'
+    source.write_bytes(b'\n'.join(ndjson(*(user_row(index) for index in range(5)))))
+
+    result = app.test_cli_runner().invoke(args=['users', 'import', str(source), '--workers', '2'])
+
+    assert result.exit_code == 0, result.output
+    assert json.loads(result.output)['created'] == 5
+    with app.app_context():
+        assert user_count() == 5
+
+
+def test_cli_reports_a_busy_hashing_pool_without_a_traceback(app, tmp_path, monkeypatch):
+    from app.helpers.password_hasher import HashingServiceBusy, PasswordHasher
+
+    def busy(self, passwords):
+        raise HashingServiceBusy('Password hashing queue is full.')
+
+    monkeypatch.setattr(PasswordHasher, 'hash_many', busy)
+    source = tmp_path / 'users.ndjson'
+    source.write_bytes(b'\n'.join(ndjson(user_row(1))))
+
+    result = app.test_cli_runner().invoke(args=['users', 'import', str(source), '--workers', '1'])
+
+    assert result.exit_code == 1
+    assert 'Error: Import stopped, password hashing did not keep up' in result.output
+    assert 'Traceback' not in result.output
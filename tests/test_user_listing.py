@@ -0,0 +1,112 @@
+"""
+User listing: keyset pages with their bounds and filters, served only to allowed addresses with an internal key.
+"""
+
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy import update
+
+API_KEY = 'listing-key'
+START = datetime(2024, 1, 1)
+
+
+@pytest.fixture
+def app(make_app):
+    return make_app(USER_LISTING={
+        'DEFAULT_PAGE_SIZE': 2,
+        'MAX_PAGE_SIZE': 3,
+        'ALLOWED_IPS': ['127.0.0.1'],
+        'API_KEYS': [API_KEY],
+        'YIELD_PER': 2,
+    })
+
+
+@pytest.fixture
+def user_ids(app):
+    """Five users created a day apart; the second logged in, the fourth is deactivated."""
+    from app import db
+    from app.models.user import User
+
+    with app.app_context():
+        ids = [User.create_if_absent(f'User {index}', f'user{index}@example.com', 'hash').id for index in range(5)]
+        for index, user_id in enumerate(ids):
+            db.session.execute(update(User).where(User.id == user_id).values(created_at=START + timedelta(days=index)))
+        db.session.execute(update(User).where(User.id == ids[1]).values(last_login_at=START))
+        db.session.execute(update(User).where(User.id == ids[3]).values(deactivated_at=START))
+        db.session.commit()
+        return ids
+
+
+def page_ids(app, **kwargs):
+    from app.models.user import User
+
+    with app.app_context():
+        return [row.id for row in User.iter_page(**kwargs)]
+
+
+def test_iter_page_bounds(app, user_ids):
+    assert page_ids(app, limit=10) == user_ids
+    assert page_ids(app, after_id=user_ids[1], limit=2) == user_ids[2:4]
+    assert page_ids(app, after_id=user_ids[-1]) == []
+
+
+def test_iter_page_filters(app, user_ids):
+    created = {'created_after': START + timedelta(days=1), 'created_before': START + timedelta(days=3)}
+    assert page_ids(app, filters=created) == user_ids[1:3]
+    assert page_ids(app, filters={'last_login_after': START}) == [user_ids[1]]
+    assert page_ids(app, filters={'deactivated': True}) == [user_ids[3]]
+    assert page_ids(app, filters={'deactivated': False}) == [user_ids[0], user_ids[1], user_ids[2], user_ids[4]]
+
+
+@pytest.fixture
+def listing_headers(sign_up, user_ids):
+    return {'Authorization': f'Bearer {sign_up()["access_token"]}', 'X-Internal-Key': API_KEY}
+
+
+def test_listing_follows_the_cursor_to_the_last_page(client, listing_headers, user_ids):
+    listed, cursor = [], 0
+    while cursor is not None:
+        body = client.get(f'/api/v1/users?after_id={cursor}', headers=listing_headers).get_json()
+        assert len(body['data']) <= 2
+        listed += [user['id'] for user in body['data']]
+        cursor = body['next_cursor']
+
+    # The signed-up caller is the sixth user
+    assert listed[:5] == user_ids and len(listed) == 6
+
+
+def test_listing_filters_and_validates_its_arguments(client, listing_headers, user_ids):
+    body = client.get('/api/v1/users?deactivated=true', headers=listing_headers).get_json()
+    assert [user['id'] for user in body['data']] == [user_ids[3]] and body['next_cursor'] is None
+
+    response = client.get('/api/v1/users?limit=4&created_after=yesterday', headers=listing_headers)
+    assert response.status_code == 400
+    assert set(response.get_json()['message']) == {'limit', 'created_after'}
+
+
+def test_listing_needs_an_allowed_address(client, listing_headers):
+    response = client.get('/api/v1/users', headers=listing_headers, environ_base={'REMOTE_ADDR': '10.0.0.8'})
+    assert response.status_code == 403
+    assert response.get_json()['error'] == 'FORBIDDEN'
+
+
+@pytest.mark.parametrize('key', [None, '', 'wrong-key'])
+def test_listing_needs_an_internal_key(client, listing_headers, key):
+    headers = {'Authorization': listing_headers['Authorization']}
+    if key is not None:
+        headers['X-Internal-Key'] = key
+    assert client.get('/api/v1/users', headers=headers).status_code == 403
+
+
+def test_listing_is_closed_without_configured_keys(make_app):
+    app = make_app(USER_LISTING={'ALLOWED_IPS': ['127.0.0.1'], 'API_KEYS': []})
+    client = app.test_client()
+    client.post('/api/v1/user/signup', json={'name': 'User', 'email': 'user@example.com', 'password': 'secret'})
+    token = client.post(
+        '/api/v1/user/signin', json={'email': 'user@example.com', 'password': 'secret'}
+    ).get_json()['data']['access_token']
+
+    for key in ('', 'anything'):
+        headers = {'Authorization': f'Bearer {token}', 'X-Internal-Key': key}
+        assert client.get('/api/v1/users', headers=headers).status_code == 403